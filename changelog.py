@@ -0,0 +1,221 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+from classes import User, Post
+from columnar import ColumnarStore
+from database import Database
+import snapshot
+
+
+class _Network:
+    """In-memory users and posts indexed by ID, with the log events applied to them."""
+    def __init__(self, users, posts):
+        self.users = users
+        self.posts = posts
+        self.users_by_id = {user.user_id: user for user in users}
+        self.posts_by_id = {post.post_id: post for post in posts if post.post_id is not None}
+        self.next_post_id = max((i for i in self.posts_by_id if isinstance(i, int)), default=-1) + 1
+        self.lock = threading.Lock()  # Serializes changes, log appends and log rotation
+
+    def _apply_add_user(self, user_id, kwargs):
+        user = User(user_id, **kwargs)
+        self.users.append(user)
+        self.users_by_id[user_id] = user
+        return user
+
+    def _apply_add_connection(self, user, connection_type, connected_user):
+        return user.add_connection(connection_type, connected_user)
+
+    def _apply_make_post(self, post_id, user, text, response_to, time_and_date):
+        post = Post(user, text, response_to, time_and_date, [], post_id)
+        user.authored_posts.append(post)
+        self.posts.append(post)
+        self.posts_by_id[post_id] = post
+        if isinstance(post_id, int):
+            self.next_post_id = max(self.next_post_id, post_id + 1)
+        return post
+
+    def _apply_add_view(self, post, user):
+        if not post.seen_by.add(user):
+            return False
+        user.read_posts.add(post)
+        return True
+
+    def replay(self, log_filename):
+        """Applies the events in a log file to the in-memory network.
+
+        Replay is idempotent: events already reflected in the saved network
+        (e.g. after a crash between writing a compacted file and removing the
+        old log) are skipped.
+        """
+        users = self.users_by_id
+        posts = self.posts_by_id
+        with self.lock, open(log_filename, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # Torn write at the end of the log
+                event = json.loads(line)
+                op = event.pop("op")
+                if op == "add_user":
+                    if event["user_id"] not in users:
+                        self._apply_add_user(event.pop("user_id"), event)
+                elif op == "add_connection":
+                    self._apply_add_connection(users[event["user"]], event["type"], users[event["connected_user"]])
+                elif op == "make_post":
+                    if event["post_id"] not in posts:
+                        self._apply_make_post(event["post_id"], users[event["creator"]], event["content"],
+                                              posts.get(event["responding_to"]),
+                                              datetime.fromisoformat(event["time_and_date"]))
+                elif op == "add_view":
+                    self._apply_add_view(posts[event["post_id"]], users[event["user"]])
+                elif op == "add_comment":
+                    post = posts[event["post_id"]]
+                    if len(post.comments) == event["index"]:
+                        post.add_comment(event["comment"])
+                else:
+                    raise ValueError(f"Unknown change log operation {op!r}")
+
+
+class ChangeLog(_Network):
+    """Append-only write-ahead log of changes on top of a saved network.
+
+    Each method applies one change to the in-memory users/posts and appends it
+    to the log as a JSON line, so persisting a change costs O(1) I/O instead of
+    rewriting the whole JSON file. compact() folds the log into a fresh
+    Database.save_data file; it can run periodically in a background thread.
+    If filename does not exist yet, the network given is saved there first.
+    """
+    def __init__(self, users, posts, filename="social_network.json", log_filename="social_network.log",
+                 snapshot_filename=None, sync=False):
+        if not os.path.exists(filename):
+            Database.save_data(users, posts, filename)  # compact() rebuilds from this file
+        super().__init__(users, posts)
+        self.filename = filename
+        self.log_filename = log_filename
+        self.snapshot_filename = snapshot_filename
+        self.sync = sync  # fsync after every event (slower, survives power loss)
+        self.compaction_lock = threading.Lock()  # One compaction at a time
+        self.log = open(log_filename, "a")
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def open(cls, filename="social_network.json", log_filename="social_network.log", **kwargs):
+        """Loads the last saved network, replays the log on top and returns a ChangeLog."""
+        users, posts = Database.load_data(filename)
+        log = cls(users, posts, filename, log_filename, **kwargs)
+        for name in (log_filename + ".compacting", log_filename):
+            if os.path.exists(name):
+                log.replay(name)
+        return log
+
+    def _append(self, event):
+        self.log.write(json.dumps(event) + "\n")
+        self.log.flush()
+        if self.sync:
+            os.fsync(self.log.fileno())
+
+    def add_user(self, user_id, **kwargs):
+        """Adds a new user and logs it. Returns the existing user if already present."""
+        with self.lock:
+            if user_id in self.users_by_id:
+                return self.users_by_id[user_id]
+            user = self._apply_add_user(user_id, kwargs)
+            self._append({"op": "add_user", "user_id": user_id, **kwargs})
+            return user
+
+    def add_connection(self, user, connection_type, connected_user):
+        """Adds a directed connection between two users and logs it."""
+        with self.lock:
+            if self._apply_add_connection(user, connection_type, connected_user):
+                self._append({"op": "add_connection", "user": user.user_id, "type": connection_type,
+                              "connected_user": connected_user.user_id})
+
+    def make_post(self, user, text, response_to=None, time_and_date=None):
+        """Creates a post by user and logs it. Returns the new Post."""
+        with self.lock:
+            post_id = self.next_post_id
+            time_and_date = time_and_date or datetime.now(timezone.utc)
+            post = self._apply_make_post(post_id, user, text, response_to, time_and_date)
+            self._append({"op": "make_post", "post_id": post_id, "creator": user.user_id, "content": text,
+                          "responding_to": response_to.post_id if response_to else None,
+                          "time_and_date": time_and_date.isoformat()})
+            return post
+
+    def add_view(self, post, user):
+        """Records that user has seen post and logs it."""
+        with self.lock:
+            if self._apply_add_view(post, user):
+                self._append({"op": "add_view", "post_id": post.post_id, "user": user.user_id})
+
+    def add_comment(self, post, comment):
+        """Adds a comment to post and logs it."""
+        with self.lock:
+            index = len(post.comments)
+            post.add_comment(comment)
+            self._append({"op": "add_comment", "post_id": post.post_id, "index": index, "comment": comment})
+
+    def compact(self):
+        """Rewrites the saved network (same format as Database.save_data) and truncates the log.
+
+        Compactions never overlap: a call made while another one runs (e.g.
+        from start_compaction) waits for it. Only the log rotation holds the
+        lock, so new changes are paused for O(1). The live users and posts
+        are never read: the new file (and snapshot) is built from a private
+        copy of the network, loaded from the last saved file with the rotated
+        log replayed on top, while new events keep being logged.
+        """
+        compacting = self.log_filename + ".compacting"
+        with self.compaction_lock:
+            with self.lock:
+                self.log.close()
+                if os.path.exists(compacting):
+                    # A previous compaction did not finish; fold its events into this one
+                    with open(compacting, "a") as old, open(self.log_filename, "r") as current:
+                        old.write(current.read())
+                    os.remove(self.log_filename)
+                else:
+                    os.replace(self.log_filename, compacting)
+                self.log = open(self.log_filename, "a")
+
+            network = _Network(*Database.load_data(self.filename))
+            network.replay(compacting)
+            data = {"users": [user.to_dict() for user in network.users],
+                    "posts": [post.to_dict() for post in network.posts]}
+
+            directory = os.path.dirname(os.path.abspath(self.filename))
+            fd, temp_filename = tempfile.mkstemp(prefix=os.path.basename(self.filename) + ".", suffix=".tmp",
+                                                 dir=directory)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(temp_filename, self.filename)
+            except BaseException:
+                os.remove(temp_filename)
+                raise
+            os.remove(compacting)
+            if self.snapshot_filename:
+                snapshot.save_snapshot(ColumnarStore.from_objects(network.users, network.posts),
+                                       self.snapshot_filename)
+
+    def start_compaction(self, interval=60):
+        """Starts a daemon thread that compacts the log every interval seconds."""
+        def run():
+            while not self._stop.wait(interval):
+                self.compact()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="changelog-compaction", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stops background compaction and closes the log file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self.lock:
+            self.log.close()
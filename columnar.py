@@ -0,0 +1,579 @@
+from array import array
+from datetime import datetime, timezone
+import math
+
+MISSING = -1  # Code stored in a column when the value is None
+MIN_MERGE = 1024  # Buffered edges always allowed before merging them into the CSR arrays
+
+
+def _zeros(typecode, n):
+    """Returns an array of n zeros."""
+    return array(typecode, bytes(array(typecode).itemsize * n))
+
+
+def _csr(n, sources, *columns):
+    """Groups parallel edge columns by source row (counting sort).
+
+    Returns the offsets array (length n + 1) and the reordered columns, so the
+    edges of row i are columns[k][offsets[i]:offsets[i + 1]].
+    """
+    offsets = _zeros('i', n + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    fill = array('i', offsets[:-1])
+    grouped = [_zeros(column.typecode, len(sources)) for column in columns]
+    for k, source in enumerate(sources):
+        slot = fill[source]
+        fill[source] += 1
+        for out, column in zip(grouped, columns):
+            out[slot] = column[k]
+    return offsets, grouped
+
+
+class StringTable:
+    """Interns repeated values (ids, names, countries...) as small integer codes.
+
+    values may be any sequence (e.g. one decoded lazily from a snapshot); the
+    reverse lookup dict is only built the first time a code is looked up.
+    """
+    def __init__(self, values=None):
+        self.values = [] if values is None else values
+        self._codes = None
+
+    @property
+    def codes(self):
+        if self._codes is None:
+            self._codes = {value: code for code, value in enumerate(self.values)}
+        return self._codes
+
+    def intern(self, value):
+        """Returns the code for a value, adding it to the table if needed."""
+        if value is None:
+            return MISSING
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def code(self, value):
+        """Returns the code for a value without adding it (MISSING if unknown)."""
+        if value is None:
+            return MISSING
+        return self.codes.get(value, MISSING)
+
+    def lookup(self, code):
+        """Returns the value stored under a code."""
+        return None if code == MISSING else self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ColumnarStore:
+    """Array-backed storage for users and posts.
+
+    Users and posts are addressed by integer row. Scalar attributes live in
+    typed columns, repeated strings are interned in a StringTable, and
+    connections and views are stored as CSR adjacency (offsets + targets).
+    New edges go into small per-row buffers that reads append to the CSR
+    rows. They are merged into the CSR arrays only once there are more than
+    an eighth of the stored edges (and at least MIN_MERGE), so a write
+    followed by a read costs amortized O(1) instead of a rebuild.
+    """
+    def __init__(self):
+        self.strings = StringTable()
+        self._rows = {}  # user_id -> user row, rebuilt lazily when None
+
+        # User columns
+        self.user_key = array('i')
+        self.user_name = array('i')
+        self.user_gender = array('i')
+        self.user_age = array('i')
+        self.user_country = array('i')
+        self.user_region = array('i')
+
+        # Post columns
+        self.post_creator = array('i')
+        self.post_content = []
+        self.post_parent = array('i')
+        self.post_time = array('d')
+
+        # CSR adjacency, with the edges added since the last _compact() buffered per row
+        self.conn_offsets = array('i', [0])
+        self.conn_targets = array('i')
+        self.conn_types = array('i')
+        self.view_offsets = array('i', [0])
+        self.view_targets = array('i')
+        self._new_connections = {}  # user row -> {(type code, target row): None}, in insertion order
+        self._new_views = {}  # post row -> {user row: None}
+        self._pending = 0  # Edges in _new_connections and _new_views
+        self._derived = None  # authored/read/reply adjacency, built lazily
+        self._new_derived = {"authored": {}, "read": {}, "replies": {}}  # Added since _derived was built
+        self._derived_pending = 0
+        self.key_rows = None  # string code -> user row (MISSING if not a user id), set by snapshots
+
+        # Object-model extras kept in memory only (not saved in snapshots)
+        self.post_listeners = {}  # user row -> callables given each Post made with User.make_post
+        self.post_comments = {}  # post row -> comments added with Post.add_comment
+        self.view_listeners = {}  # post row -> callables given (post, user, time) for each new viewer
+        self.comment_listeners = {}  # post row -> callables given (post, comment, time) for each comment
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            lookup = self.strings.lookup
+            self._rows = {lookup(key): row for row, key in enumerate(self.user_key)}
+        return self._rows
+
+    @property
+    def user_count(self):
+        return len(self.user_key)
+
+    @property
+    def post_count(self):
+        return len(self.post_creator)
+
+    def add_user(self, user_id, name=None, gender=None, age=None, country=None, region=None):
+        """Adds a user and returns its row. Existing users are left unchanged."""
+        row = self.rows.get(user_id)
+        if row is not None:
+            return row
+        row = self.user_count
+        self.rows[user_id] = row
+        self.user_key.append(self.strings.intern(user_id))
+        self.user_name.append(self.strings.intern(name))
+        self.user_gender.append(self.strings.intern(gender))
+        self.user_age.append(MISSING if age is None else age)
+        self.user_country.append(self.strings.intern(country))
+        self.user_region.append(self.strings.intern(region))
+        self._grow(self.conn_offsets)
+        return row
+
+    def add_connection(self, user_row, connection_type, connected_row):
+        """Adds a directed connection between two user rows; returns False if it already existed."""
+        type_code = self.strings.intern(connection_type)
+        start, end = self.conn_offsets[user_row], self.conn_offsets[user_row + 1]
+        targets = self.conn_targets[start:end]
+        if connected_row in targets and any(target == connected_row and t == type_code for t, target in
+                                            zip(self.conn_types[start:end], targets)):
+            return False
+        return self._append_connection(user_row, type_code, connected_row)
+
+    def _append_connection(self, user_row, type_code, connected_row):
+        """Buffers a connection that is not in the CSR arrays yet."""
+        new = self._new_connections.setdefault(user_row, {})
+        if (type_code, connected_row) in new:
+            return False
+        new[(type_code, connected_row)] = None
+        self._pending += 1
+        return True
+
+    def add_post(self, creator_row, content, responding_to=None, time_and_date=None):
+        """Adds a post and returns its row. responding_to is a post row or None."""
+        row = self.post_count
+        self.post_creator.append(creator_row)
+        self.post_content.append(content)
+        self.post_parent.append(MISSING if responding_to is None else responding_to)
+        self.post_time.append(time_and_date.timestamp() if time_and_date else math.nan)
+        self._grow(self.view_offsets)
+        self._add_derived("authored", creator_row, row)
+        if responding_to is not None:
+            self._add_derived("replies", responding_to, row)
+        return row
+
+    def add_view(self, post_row, user_row):
+        """Records that a user row has seen a post row; returns False if it already had.
+
+        The check scans the post's merged viewers as one array slice and looks
+        the buffered ones up in a dict, so views stay set-like as in classes.Post.
+        """
+        start, end = self.view_offsets[post_row], self.view_offsets[post_row + 1]
+        if user_row in self.view_targets[start:end]:
+            return False
+        return self._append_view(post_row, user_row)
+
+    def _append_view(self, post_row, user_row):
+        """Buffers a view that is not in the CSR arrays yet."""
+        new = self._new_views.setdefault(post_row, {})
+        if user_row in new:
+            return False
+        new[user_row] = None
+        self._pending += 1
+        self._add_derived("read", user_row, post_row)
+        return True
+
+    def _add_derived(self, name, row, target):
+        """Buffers an edge of a derived adjacency that has already been built."""
+        if self._derived is not None:
+            self._new_derived[name].setdefault(row, []).append(target)
+            self._derived_pending += 1
+
+    @staticmethod
+    def _grow(offsets):
+        """Appends an empty row to a CSR offsets array."""
+        offsets.append(offsets[-1])
+
+    @staticmethod
+    def _merge_threshold(edges):
+        return max(MIN_MERGE, edges // 8)
+
+    def _compact(self):
+        """Merges buffered connections and views into the CSR arrays."""
+        if self._new_connections:
+            sources = self._sources(self.conn_offsets)
+            targets = array('i', self.conn_targets)
+            types = array('i', self.conn_types)
+            for source, edges in self._new_connections.items():
+                for type_code, target in edges:
+                    sources.append(source)
+                    types.append(type_code)
+                    targets.append(target)
+            self._new_connections = {}
+            self.conn_offsets, (self.conn_targets, self.conn_types) = _csr(
+                self.user_count, sources, targets, types)
+        if self._new_views:
+            sources = self._sources(self.view_offsets)
+            targets = array('i', self.view_targets)
+            for post_row, user_rows in self._new_views.items():
+                sources.extend([post_row] * len(user_rows))
+                targets.extend(user_rows)
+            self._new_views = {}
+            self.view_offsets, (self.view_targets,) = _csr(self.post_count, sources, targets)
+        self._pending = 0
+
+    def _compact_if_large(self):
+        """Merges the buffered edges once a read through them would get slow."""
+        if self._pending > self._merge_threshold(len(self.conn_targets) + len(self.view_targets)):
+            self._compact()
+
+    @staticmethod
+    def _row(offsets, targets, row, extra):
+        """Returns a CSR row followed by its buffered edges."""
+        if row + 1 < len(offsets):
+            base = targets[offsets[row]:offsets[row + 1]]
+        else:
+            base = targets[0:0]  # Row added after the CSR arrays were built
+        if not extra:
+            return base
+        rows = array('i', base)
+        rows.extend(extra)
+        return rows
+
+    @staticmethod
+    def _sources(offsets):
+        """Expands CSR offsets back into one source row per edge."""
+        sources = array('i')
+        for row in range(len(offsets) - 1):
+            sources.extend([row] * (offsets[row + 1] - offsets[row]))
+        return sources
+
+    def _adjacency(self, merge=False):
+        """Returns the authored, read and reply CSR adjacency (built lazily).
+
+        Posts and views added afterwards are buffered in _new_derived until
+        there are too many of them (or any, with merge=True), which rebuilds
+        all three.
+        """
+        threshold = 0 if merge else self._merge_threshold(self.post_count + len(self.view_targets))
+        if self._derived is None or self._derived_pending > threshold:
+            self._compact()
+            posts = array('i', range(self.post_count))
+            viewers = array('i', self.view_targets)
+            self._derived = {
+                "authored": _csr(self.user_count, self.post_creator, posts),
+                "read": _csr(self.user_count, viewers, self._sources(self.view_offsets)),
+                "replies": _csr(
+                    self.post_count,
+                    array('i', (p for p in self.post_parent if p != MISSING)),
+                    array('i', (r for r, p in enumerate(self.post_parent) if p != MISSING))),
+            }
+            self._new_derived = {name: {} for name in self._derived}
+            self._derived_pending = 0
+        return self._derived
+
+    def _neighbours(self, name, row):
+        """Returns the rows adjacent to row in one of the derived adjacencies."""
+        offsets, (targets,) = self._adjacency()[name]
+        return self._row(offsets, targets, row, self._new_derived[name].get(row))
+
+    def connection_rows(self, user_row, connection_type=None):
+        """Returns (type code, target row) pairs for a user's connections."""
+        self._compact_if_large()
+        start, end = self.conn_offsets[user_row], self.conn_offsets[user_row + 1]
+        pairs = list(zip(self.conn_types[start:end], self.conn_targets[start:end]))
+        pairs.extend(self._new_connections.get(user_row, ()))
+        if connection_type is None:
+            return pairs
+        type_code = self.strings.code(connection_type)
+        return [(t, target) for t, target in pairs if t == type_code]
+
+    def viewer_rows(self, post_row):
+        """Returns the user rows that have seen a post."""
+        self._compact_if_large()
+        return self._row(self.view_offsets, self.view_targets, post_row, self._new_views.get(post_row))
+
+    def filter_user_rows(self, gender=None, country=None, region=None, min_age=None, max_age=None):
+        """Returns user rows matching all given criteria using integer comparisons."""
+        checks = []
+        for column, value in ((self.user_gender, gender), (self.user_country, country),
+                              (self.user_region, region)):
+            if value is not None:
+                checks.append((column, self.strings.code(value)))
+        rows = []
+        for row in range(self.user_count):
+            if any(column[row] != code for column, code in checks):
+                continue
+            age = self.user_age[row]
+            if min_age is not None and (age == MISSING or age < min_age):
+                continue
+            if max_age is not None and (age == MISSING or age > max_age):
+                continue
+            rows.append(row)
+        return rows
+
+    def user(self, row):
+        return User(self, row)
+
+    def post(self, row):
+        return Post(self, row)
+
+    def users(self):
+        return [User(self, row) for row in range(self.user_count)]
+
+    def posts(self):
+        return [Post(self, row) for row in range(self.post_count)]
+
+    def get_user(self, user_id):
+        """Returns the view for a user_id, or None."""
+        row = self._user_row(user_id)
+        return None if row is None else User(self, row)
+
+    def _user_row(self, user_id):
+        """Returns the row of a user_id, or None.
+
+        Snapshots carry key_rows, so a loaded store answers through the string
+        index instead of building the rows dict over every user.
+        """
+        if self._rows is None and self.key_rows is not None:
+            code = self.strings.code(user_id)
+            row = MISSING if code == MISSING else self.key_rows[code]
+            return None if row == MISSING else row
+        return self.rows.get(user_id)
+
+    @classmethod
+    def from_objects(cls, users, posts):
+        """Builds a store from existing classes.User / classes.Post objects."""
+        store = cls()
+        for user in users:
+            store.add_user(user.user_id, user.name, user.gender, user.age, user.country, user.region)
+        post_rows = {}
+        for post in posts:
+            creator = post.creator
+            if creator.user_id not in store.rows:
+                store.add_user(creator.user_id, creator.name, creator.gender, creator.age,
+                               creator.country, creator.region)
+            post_rows[id(post)] = store.add_post(store.rows[creator.user_id], post.content,
+                                                 time_and_date=post.time_and_date)
+        for post in posts:
+            row = post_rows[id(post)]
+            if post.responding_to is not None and id(post.responding_to) in post_rows:
+                store.post_parent[row] = post_rows[id(post.responding_to)]
+            for viewer in post.seen_by:
+                viewer_id = getattr(viewer, "user_id", viewer)  # seen_by may hold ids or users
+                if viewer_id in store.rows:
+                    store._append_view(row, store.rows[viewer_id])  # seen_by has no duplicates
+        for user in users:
+            for conn in user.connections:
+                target = store.rows.get(conn["user"].user_id)
+                if target is not None:
+                    store._append_connection(store.rows[user.user_id], store.strings.intern(conn["type"]), target)
+        store._compact()
+        return store
+
+
+class User:
+    """Thin view of one user row in a ColumnarStore.
+
+    Exposes the same attributes and methods as classes.User, so code written
+    against the object model works unchanged on top of the store.
+    """
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __eq__(self, other):
+        return isinstance(other, User) and other._store is self._store and other._row == self._row
+
+    def __hash__(self):
+        return hash((id(self._store), self._row))
+
+    def __repr__(self):
+        return f"User({self.user_id!r})"
+
+    def _string(self, column):
+        return self._store.strings.lookup(column[self._row])
+
+    @property
+    def user_id(self):
+        return self._string(self._store.user_key)
+
+    @property
+    def name(self):
+        return self._string(self._store.user_name)
+
+    @property
+    def gender(self):
+        return self._string(self._store.user_gender)
+
+    @property
+    def age(self):
+        age = self._store.user_age[self._row]
+        return None if age == MISSING else age
+
+    @property
+    def country(self):
+        return self._string(self._store.user_country)
+
+    @property
+    def region(self):
+        return self._string(self._store.user_region)
+
+    @property
+    def connections(self):
+        return self.connections_by_type()
+
+    @property
+    def authored_posts(self):
+        return [Post(self._store, row) for row in self._store._neighbours("authored", self._row)]
+
+    @property
+    def read_posts(self):
+        return [Post(self._store, row) for row in self._store._neighbours("read", self._row)]
+
+    @property
+    def comments(self):
+        return [post for post in self.authored_posts if post.responding_to is not None]
+
+    @property
+    def post_listeners(self):
+        """Callables given each Post the user makes with make_post (kept by the store)."""
+        return self._store.post_listeners.setdefault(self._row, [])
+
+    def add_connection(self, connection_type, connected_user):
+        """Adds a connection to another user; returns False if it already existed."""
+        return self._store.add_connection(self._row, connection_type, connected_user._row)
+
+    def connections_by_type(self, connection_type=None):
+        """Returns connections filtered by type if specified."""
+        lookup = self._store.strings.lookup
+        return [{"type": lookup(type_code), "user": User(self._store, target)}
+                for type_code, target in self._store.connection_rows(self._row, connection_type)]
+
+    def add_read_post(self, post):
+        """Adds a post to the list of read posts."""
+        post.add_view(self)
+
+    def make_post(self, text, response_to=None):
+        parent = None if response_to is None else response_to._row
+        post = Post(self._store, self._store.add_post(self._row, text, parent, datetime.now(timezone.utc)))
+        for listener in self._store.post_listeners.get(self._row, ()):
+            listener(post)
+        return post
+
+
+class Post:
+    """Thin view of one post row in a ColumnarStore."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __eq__(self, other):
+        return isinstance(other, Post) and other._store is self._store and other._row == self._row
+
+    def __hash__(self):
+        return hash((id(self._store), self._row))
+
+    def __repr__(self):
+        return f"Post({self._row})"
+
+    @property
+    def creator(self):
+        return User(self._store, self._store.post_creator[self._row])
+
+    @property
+    def content(self):
+        return self._store.post_content[self._row]
+
+    @property
+    def responding_to(self):
+        parent = self._store.post_parent[self._row]
+        return None if parent == MISSING else Post(self._store, parent)
+
+    @property
+    def time_and_date(self):
+        timestamp = self._store.post_time[self._row]
+        return None if math.isnan(timestamp) else datetime.fromtimestamp(timestamp, timezone.utc)
+
+    @property
+    def seen_by(self):
+        return [User(self._store, row) for row in self._store.viewer_rows(self._row)]
+
+    @property
+    def replies(self):
+        return [Post(self._store, row) for row in self._store._neighbours("replies", self._row)]
+
+    @property
+    def comments(self):
+        """Replies to the post, followed by the comments added with add_comment."""
+        return self.replies + self._store.post_comments.get(self._row, [])
+
+    @property
+    def view_listeners(self):
+        """Callables given (post, user, time) for each new viewer (kept by the store)."""
+        return self._store.view_listeners.setdefault(self._row, [])
+
+    @property
+    def comment_listeners(self):
+        """Callables given (post, comment, time) for each comment (kept by the store)."""
+        return self._store.comment_listeners.setdefault(self._row, [])
+
+    def add_view(self, user, time=None):
+        """Adds a user's view to the post; returns False if they had already seen it."""
+        if not self._store.add_view(self._row, user._row):
+            return False
+        for listener in self._store.view_listeners.get(self._row, ()):
+            listener(self, user, time)
+        return True
+
+    def add_views(self, users, time=None):
+        """Adds many users' views at once; returns the number of new viewers."""
+        return sum(self.add_view(user, time) for user in users)
+
+    def add_comment(self, comment, time=None):
+        """Adds a comment to the post."""
+        self._store.post_comments.setdefault(self._row, []).append(comment)
+        for listener in self._store.comment_listeners.get(self._row, ()):
+            listener(self, comment, time)
+
+    def seen_by_age(self, min, max):
+        ages = self._store.user_age
+        return [User(self._store, row) for row in self._store.viewer_rows(self._row)
+                if ages[row] != MISSING and min <= ages[row] <= max]
+
+    def seen_by_country_or_region(self, country, region=None):
+        if region is None:
+            column, code = self._store.user_country, self._store.strings.code(country)
+        else:
+            column, code = self._store.user_region, self._store.strings.code(region)
+        if code == MISSING:
+            return []
+        return [User(self._store, row) for row in self._store.viewer_rows(self._row)
+                if column[row] == code]
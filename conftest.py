@@ -0,0 +1,46 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_modules = {}  # directory -> {name: module} imported while collecting its tests
+
+
+def _is_repo_module(name, module):
+    filename = getattr(module, "__file__", None)
+    if not filename or name == "conftest":
+        return None
+    folder = os.path.dirname(os.path.abspath(filename))
+    return folder if folder == ROOT or os.path.dirname(folder) == ROOT else None
+
+
+def _use_directory(directory):
+    """Makes `from classes import ...` in the modules of directory resolve to its own copies.
+
+    Each folder is a self-contained set of scripts sharing module names
+    (classes, layout_cache, ...), so modules imported from another folder
+    are dropped from sys.modules, and the ones this folder imported before
+    are put back, whenever tests of another folder are collected or run.
+    Worker processes pickle functions by module name, so the test and
+    sys.modules must agree on which copy is which.
+    """
+    if sys.path[0] != directory:
+        if directory in sys.path:
+            sys.path.remove(directory)
+        sys.path.insert(0, directory)
+    for name, module in list(sys.modules.items()):
+        folder = _is_repo_module(name, module)
+        if folder is not None and folder != directory:
+            _modules.setdefault(folder, {})[name] = module
+            del sys.modules[name]
+    sys.modules.update(_modules.get(directory, {}))
+
+
+def pytest_collectstart(collector):
+    path = getattr(collector, "path", None)
+    if path is not None and path.suffix == ".py":
+        _use_directory(str(path.parent))
+
+
+def pytest_runtest_setup(item):
+    _use_directory(str(item.path.parent))
@@ -1,22 +1,179 @@
 import json
+from datetime import datetime
 from classes import User, Post
+from columnar import ColumnarStore
+import snapshot
+
+CHUNK_SIZE = 1 << 16  # Characters read from the file at a time while streaming
+NUMBER_PARTS = "0123456789.eE+-"  # Characters that can only follow a value if it is a cut-off number
+
+
+def _iter_records(f, chunk_size=CHUNK_SIZE):
+    """Streams (section, record) pairs from a {"users": [...], "posts": [...]} file.
+
+    Only the current record and one chunk of text are held in memory at a
+    time. Top-level values that are not arrays are yielded as a single record.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        # Drops consumed text and reads another chunk; returns False at EOF.
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+        return bool(chunk)
+
+    def peek():
+        # Skips whitespace and commas and returns the next significant character.
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return ""
+
+    def value():
+        # Decodes one JSON value, reading more text until it is complete.
+        nonlocal pos
+        while True:
+            try:
+                result, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not fill():
+                    raise
+                continue
+            if (end == len(buffer) or buffer[end] in NUMBER_PARTS) and fill():
+                continue  # A number may continue in the next chunk ("1." + "25")
+            pos = end
+            return result
+
+    if peek() != "{":
+        raise ValueError("Expected a JSON object at the top level")
+    pos += 1
+    while peek() not in ("}", ""):
+        section = value()
+        if peek() != ":":
+            raise ValueError(f"Expected ':' after key {section!r}")
+        pos += 1
+        if peek() != "[":
+            yield section, value()
+            continue
+        pos += 1
+        while peek() not in ("]", ""):
+            yield section, value()
+        pos += 1
+
 
 class Database:
+  def iter_load(filename="social_network.json"):
+      """Loads the network incrementally, yielding ("user", User) and ("post", Post).
+
+      Records are built as soon as they are parsed. References that point
+      forward in the file (connections to later users, replies to later posts,
+      viewers or creators saved after the post) are resolved in a second pass
+      once the whole file has been read, so objects yielded early may gain
+      those links later.
+      """
+      users = {}
+      posts = {}
+      pending_connections = []  # (user, type, user_id)
+      pending_posts = []  # (post, creator_id, responding_to_id, unresolved seen_by ids)
+
+      with open(filename, "r") as f:
+          for section, record in _iter_records(f):
+              if section == "users":
+                  connections = record.pop("connections", [])
+                  user = User(**record)
+                  users[user.user_id] = user
+                  pending_connections.extend((user, conn["type"], conn["user"]) for conn in connections)
+                  yield "user", user
+              elif section == "posts":
+                  time_and_date = record.get("time_and_date")
+                  post = Post(
+                      users.get(record["creator"]),
+                      record["content"],
+                      posts.get(record.get("responding_to")),
+                      datetime.fromisoformat(time_and_date) if time_and_date else None,
+                      [],
+                      record.get("post_id")
+                  )
+                  post.comments = record.get("comments", [])
+                  if post.post_id is not None:
+                      posts[post.post_id] = post
+                  if post.creator is not None:
+                      post.creator.authored_posts.append(post)
+                  unresolved = []
+                  for user_id in record.get("seen_by", []):
+                      if user_id in users:
+                          post.seen_by.append(users[user_id])
+                          users[user_id].read_posts.append(post)
+                      else:
+                          unresolved.append(user_id)
+                  pending_posts.append((post, record["creator"], record.get("responding_to"), unresolved))
+                  yield "post", post
+
+      # Second pass: resolve references by ID now that every record is known
+      for user, connection_type, user_id in pending_connections:
+          if user_id in users:
+              user.add_connection(connection_type, users[user_id])
+      for post, creator_id, responding_to_id, seen_by_ids in pending_posts:
+          if post.creator is None and creator_id in users:
+              post.creator = users[creator_id]
+              post.creator.authored_posts.append(post)
+          if post.responding_to is None and responding_to_id is not None:
+              post.responding_to = posts.get(responding_to_id)
+          for user_id in seen_by_ids:
+              if user_id in users:
+                  post.seen_by.append(users[user_id])
+                  users[user_id].read_posts.append(post)
+
+  def iter_posts(filename="social_network.json"):
+      """Yields posts as soon as they are parsed (see iter_load)."""
+      for kind, obj in Database.iter_load(filename):
+          if kind == "post":
+              yield obj
+
   def load_data(filename="social_network.json"):
       try:
-          with open(filename, "r") as f:
-              data = json.load(f)
-          users = [User(**user) for user in data["users"]]
-          posts = [Post(**post) for post in data["posts"]]
+          users = []
+          posts = []
+          for kind, obj in Database.iter_load(filename):
+              (users if kind == "user" else posts).append(obj)
           return users, posts
       except FileNotFoundError:
           return [], []
 
-  def save_data(users, posts, filename="social_network.json"):
+  def load_snapshot(filename="social_network.snapshot"):
+      """Memory-maps a binary snapshot written by save_data.
+
+      Returns a read-only ColumnarStore; use store.users(), store.posts() or
+      store.get_user(user_id) for User/Post views.
+      """
+      return snapshot.load_snapshot(filename)
+
+  def save_data(users, posts, filename="social_network.json", snapshot_filename=None):
+      # Posts are referenced by post_id, so make sure every post has one
+      taken = {post.post_id for post in posts}
+      next_id = 0
+      for post in posts:
+          while post.post_id is None:
+              if next_id not in taken:
+                  post.post_id = next_id
+              next_id += 1
       data = {
           "users": [user.to_dict() for user in users],
           "posts": [post.to_dict() for post in posts]
       }
       with open(filename, "w") as f:
           json.dump(data, f)
-
+      if snapshot_filename:
+          snapshot.save_snapshot(ColumnarStore.from_objects(users, posts), snapshot_filename)
@@ -0,0 +1,68 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import networkx as nx
+from matplotlib.figure import Figure
+
+
+def _use_agg():
+    """Worker initializer: renders without a display."""
+    matplotlib.use("Agg")
+
+
+def save_network_image(G, pos, filepath, highlight_users=None):
+    """Draws G at the given positions into filepath (PNG, SVG, ... from the extension).
+
+    Uses a standalone Figure rather than pyplot, so it needs no display and
+    can run in several processes at once.
+    """
+    figure = Figure(figsize=(12, 8))
+    axes = figure.add_subplot()
+    nx.draw(G, pos, ax=axes, with_labels=True, node_size=500, node_color="lightblue")
+    if highlight_users:
+        nx.draw_networkx_nodes(G, pos, ax=axes, nodelist=highlight_users, node_color="orange", node_size=700)
+    figure.savefig(filepath)
+
+
+def _render_job(nodes, edges, pos, filepath):
+    start = time.perf_counter()
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
+    save_network_image(G, pos, filepath)
+    return filepath, time.perf_counter() - start
+
+
+def render_networks(visualizer, jobs, workers=None):
+    """Exports a batch of network images in a process pool.
+
+    Each job is a (filters, output path) pair, where filters are the keyword
+    arguments of SocialMediaGraph.filter_users (e.g. {"country": "UK"}); the
+    image shows the matching users and the connections among them, or the
+    whole network for empty filters. The layout of the whole network is
+    computed (or taken from the visualizer's LayoutCache) once, so every
+    image places a user at the same spot. Drawing runs in the workers on
+    the Agg backend (workers defaults to the CPU count; 1 renders
+    in-process).
+
+    Returns a list of (output path, seconds) tuples in job order.
+    """
+    projection = visualizer.graph.projection()
+    G = projection.graph
+    pos = visualizer.layouts.layout(G, projection.version)
+    tasks = []
+    for filters, filepath in jobs:
+        if filters:
+            sub = G.subgraph(user.user_id for user in visualizer.graph.filter_users(**filters))
+        else:
+            sub = G
+        tasks.append((list(sub.nodes), list(sub.edges), {node: pos[node] for node in sub}, filepath))
+
+    if workers == 1 or len(tasks) <= 1:
+        return [_render_job(*task) for task in tasks]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_use_agg) as pool:
+        futures = [pool.submit(_render_job, *task) for task in tasks]
+        return [future.result() for future in futures]
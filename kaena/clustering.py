@@ -0,0 +1,143 @@
+class UnionFind:
+    """Disjoint sets over hashable items with path compression and union by size."""
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, item):
+        """Adds item as its own set if it is not known yet."""
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        """Returns the representative of item's set (path halving, no recursion)."""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Merges the sets of a and b; returns False if they were already joined."""
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size.pop(root_b)
+        return True
+
+
+def strongly_connected(users, connection_type=None):
+    """Returns the strongly connected components of the connection graph.
+
+    users maps user_id to User. Uses an iterative version of Tarjan's
+    algorithm so long follower chains do not hit the recursion limit.
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for start in users.values():
+        if start.user_id in index:
+            continue
+        work = [(start, iter(start.connections.users(connection_type)))]
+        index[start.user_id] = lowlink[start.user_id] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start.user_id)
+        while work:
+            user, neighbours = work[-1]
+            advanced = False
+            for neighbour in neighbours:
+                if neighbour.user_id not in index:
+                    index[neighbour.user_id] = lowlink[neighbour.user_id] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack.add(neighbour.user_id)
+                    work.append((neighbour, iter(neighbour.connections.users(connection_type))))
+                    advanced = True
+                    break
+                if neighbour.user_id in on_stack:
+                    lowlink[user.user_id] = min(lowlink[user.user_id], index[neighbour.user_id])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent.user_id] = min(lowlink[parent.user_id], lowlink[user.user_id])
+            if lowlink[user.user_id] == index[user.user_id]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member.user_id)
+                    component.append(member)
+                    if member is user:
+                        break
+                components.append(component[::-1])
+    return components
+
+
+class ClusterEngine:
+    """Keeps user clusters for one connection type up to date as edges are added.
+
+    Weak clusters (connections treated as undirected) are maintained
+    incrementally with union-find, so same_cluster and cluster_of cost
+    O(alpha(n)). Strong clusters need the edge directions and are recomputed
+    lazily, only when asked for after the graph changed.
+    """
+    def __init__(self, users, connection_type=None):
+        self.users = users  # user_id -> User, shared with the SocialMediaGraph
+        self.connection_type = connection_type
+        self.weak = UnionFind()
+        self._strong = None  # user_id -> component index, None when stale
+        self._strong_components = None
+        for user in users.values():
+            self.add_user(user.user_id)
+        for user in users.values():
+            for connected_user in user.connections.users(connection_type):
+                self.weak.union(user.user_id, connected_user.user_id)
+
+    def add_user(self, user_id):
+        self.weak.add(user_id)
+        self._strong = None
+
+    def add_connection(self, user_id_1, user_id_2, connection_type):
+        """Updates the clusters for a new connection (ignored if of another type)."""
+        if self.connection_type is not None and connection_type != self.connection_type:
+            return
+        self.weak.union(user_id_1, user_id_2)
+        self._strong = None
+
+    def _strongly_connected(self):
+        if self._strong is None:
+            self._strong_components = strongly_connected(self.users, self.connection_type)
+            self._strong = {user.user_id: i for i, component in enumerate(self._strong_components)
+                            for user in component}
+        return self._strong
+
+    def cluster_of(self, user_id, strongly=False):
+        """Returns an identifier of the cluster containing user_id."""
+        if strongly:
+            return self._strongly_connected()[user_id]
+        return self.weak.find(user_id)
+
+    def same_cluster(self, user_id_1, user_id_2, strongly=False):
+        """Returns True if both users are in the same cluster."""
+        return self.cluster_of(user_id_1, strongly) == self.cluster_of(user_id_2, strongly)
+
+    def clusters(self, strongly=False):
+        """Returns the clusters as lists of users, in the order users were added."""
+        if strongly:
+            self._strongly_connected()
+            return [list(component) for component in self._strong_components]
+        groups = {}
+        for user_id, user in self.users.items():
+            groups.setdefault(self.weak.find(user_id), []).append(user)
+        return list(groups.values())
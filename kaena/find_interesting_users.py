@@ -1,81 +1,197 @@
+import heapq
 from datetime import datetime, timezone
 from classes import User, Post
+from clustering import ClusterEngine
+from graph_cache import GraphProjection
+from paths import shortest_path, k_hop, hop_distribution
+from ranking import RankingEngine
+from recommendations import Recommender
+from layout_cache import LayoutCache
+from batch_render import save_network_image
+from user_index import UserIndex
 import networkx as nx
 import matplotlib.pyplot as plt
 
 class SocialMediaGraph:
-    def __init__(self):
+    def __init__(self, database=None):
         self.users = {} #  Dictionary to store users by user_id
+        self.database = database # Optional SQLiteDatabase that every change is written to
+        self.post_ids = {} # Post -> its post id in the database
+        self.cluster_engines = {} # ClusterEngine per connection type, created on first use
+        self.ranking_engines = {} # RankingEngine per connection type, created on first use
+        self.index = UserIndex() # Bitmap index used by filter_users
+        self._projection = None # GraphProjection, created on first use
 
     def add_user(self, user_id, **kwargs):
         """Adds a new user to the graph"""
         if user_id not in self.users:
             self.users[user_id] = User(user_id, **kwargs)
+            if self.database is not None:
+                self.database.add_user(user_id, **kwargs)
+                self.users[user_id].post_listeners.append(self._save_post)
+            self.users[user_id].post_listeners.append(self.index.add_post)  # Keeps filter_users current
+            self.index.add_user(self.users[user_id])
+            for engine in (*self.cluster_engines.values(), *self.ranking_engines.values()):
+                engine.add_user(user_id)
+            if self._projection is not None:
+                self._projection.add_user(user_id)
 
     def add_connections(self, user_id_1, user_id_2, connection_type):
         """Adds a direction connection between two users."""
         user1 = self.users.get(user_id_1)
         user2 = self.users.get(user_id_2)
-        if user1 and user2:
-            user1.add_connection(connection_type, user2)
-
-    def filter_users(self, min_posts=None, max_posts=None, gender=None, country=None):
-        """Filters users based on the specified criteria."""
-        filtered_users = []
-        for user in self.users.values():
-            if min_posts is not None and len(user.authored_posts) < min_posts:
-                continue
-            if max_posts is not None and len(user.authored_posts) > max_posts:
-                continue
-            if gender and user.gender != gender:
-                continue
-            if country and user.country != country:
-                continue
-            filtered_users.append(user)
-        return filtered_users
-    
-    def cluster_users(self, connection_type):
-        """Clusters users based on a specific connection type."""
-        visited = set()
-        clusters = []
-
-        def dfs(user, cluster):
-            visited.add(user.user_id)
-            cluster.append(user)
-            for conn in user.connections_by_type(connection_type):
-                connected_user = conn["user"]
-                if connected_user.user_id not in visited:
-                    dfs(connected_user, cluster)
-
-        for user in self.users.values():
-            if user.user_id not in visited:
-                cluster = []
-                dfs(user, cluster)
-                clusters.append(cluster)
-
-        return clusters
+        if user1 and user2 and user1.add_connection(connection_type, user2):
+            if self.database is not None:
+                self.database.add_connection(user_id_1, user_id_2, connection_type)
+            for engine in (*self.cluster_engines.values(), *self.ranking_engines.values()):
+                engine.add_connection(user_id_1, user_id_2, connection_type)
+            if self._projection is not None:
+                self._projection.add_connection(user_id_1, user_id_2, connection_type)
+
+    def make_post(self, user_id, text, response_to=None):
+        """Creates a post by a user and returns it."""
+        user = self.users[user_id]
+        user.make_post(text, response_to)
+        return user.authored_posts[-1]
+
+    def _save_post(self, post):
+        """Writes a new post to the database (a User.post_listeners callback)."""
+        self.post_ids[post] = self.database.make_post(
+            post.creator.user_id, post.content, self.post_ids.get(post.responding_to), post.time_and_date)
+
+    def filter_users(self, min_posts=None, max_posts=None, gender=None, country=None, region=None,
+                     min_age=None, max_age=None):
+        """Filters users based on the specified criteria.
+
+        Answered with SQL when the graph writes to a database, otherwise from
+        the bitmap index, which User.make_post keeps up to date for the users
+        of this graph.
+        """
+        if self.database is not None:
+            return [self.users[user.user_id] for user in self.database.filter_users(
+                min_posts, max_posts, gender, country, region, min_age, max_age) if user.user_id in self.users]
+        return self.index.query(min_posts, max_posts, gender, country, region, min_age, max_age)
+
+    def cluster_engine(self, connection_type=None):
+        """Returns the incrementally maintained ClusterEngine for a connection type."""
+        if connection_type not in self.cluster_engines:
+            self.cluster_engines[connection_type] = ClusterEngine(self.users, connection_type)
+        return self.cluster_engines[connection_type]
+
+    def projection(self):
+        """Returns the incrementally maintained GraphProjection of the network."""
+        if self._projection is None:
+            self._projection = GraphProjection(self.users)
+        return self._projection
+
+    def cluster_users(self, connection_type, strongly=False):
+        """Clusters users based on a specific connection type.
+
+        Clusters are weakly connected by default; pass strongly=True to only
+        group users that can reach each other along connection directions.
+        """
+        return self.cluster_engine(connection_type).clusters(strongly)
+
+    def same_cluster(self, user_id_1, user_id_2, connection_type=None, strongly=False):
+        """Returns True if both users are in the same cluster."""
+        return self.cluster_engine(connection_type).same_cluster(user_id_1, user_id_2, strongly)
+
+    def cluster_of(self, user_id, connection_type=None, strongly=False):
+        """Returns an identifier of the cluster containing the user."""
+        return self.cluster_engine(connection_type).cluster_of(user_id, strongly)
+
+    def ranking_engine(self, connection_type=None):
+        """Returns the incrementally maintained RankingEngine for a connection type."""
+        if connection_type not in self.ranking_engines:
+            self.ranking_engines[connection_type] = RankingEngine(self.users, connection_type)
+        return self.ranking_engines[connection_type]
+
+    def influential_users(self, top=10, method="pagerank", connection_type=None, **options):
+        """Returns the top (User, score) pairs by "pagerank", "eigenvector" or "in_degree".
+
+        options go to the ranking, e.g. personalization={user_id: 1} for a
+        personalized PageRank.
+        """
+        if method not in ("pagerank", "eigenvector", "in_degree"):
+            raise ValueError(f"Unknown ranking method {method!r}")
+        scores = getattr(self.ranking_engine(connection_type), method)(**options)
+        best = heapq.nlargest(top, scores.items(), key=lambda item: item[1])
+        return [(self.users[user_id], score) for user_id, score in best]
+
+    def recommender(self, connection_type=None, max_fan_out=None):
+        """Returns a Recommender over the ranking engine's connection matrix."""
+        matrix = self.ranking_engine(connection_type).matrix
+        return Recommender(matrix) if max_fan_out is None else Recommender(matrix, max_fan_out)
+
+    def recommend_users(self, user_id, top=10, method="adamic_adar", connection_type=None):
+        """Returns up to top (User, score) pairs the user might want to connect to.
+
+        method is "mutual", "jaccard", "adamic_adar" or "read_posts" (see Recommender).
+        """
+        if user_id not in self.users:
+            return []
+        suggestions = self.recommender(connection_type).recommend(user_id, top, method)
+        return [(self.users[suggested], score) for suggested, score in suggestions]
+
+    def shortest_path(self, user_id_1, user_id_2, connection_type=None, directed=False, max_depth=6):
+        """Returns the users on a shortest chain of connections between two users, or None.
+
+        Connections count both ways unless directed; chains longer than
+        max_depth are not searched.
+        """
+        user1 = self.users.get(user_id_1)
+        user2 = self.users.get(user_id_2)
+        if not (user1 and user2):
+            return None
+        return shortest_path(user1, user2, connection_type, directed, max_depth)
+
+    def degrees_of_separation(self, user_id_1, user_id_2, connection_type=None, directed=False, max_depth=6):
+        """Returns the number of connections between two users, or None if more than max_depth."""
+        path = self.shortest_path(user_id_1, user_id_2, connection_type, directed, max_depth)
+        return None if path is None else len(path) - 1
+
+    def neighbourhood(self, user_id, hops=3, connection_type=None, directed=False, limit=None):
+        """Returns {User: hops} for the users within hops connections of a user.
+
+        At most limit users are returned, the closest ones first.
+        """
+        user = self.users.get(user_id)
+        return k_hop(user, hops, connection_type, directed, limit) if user else {}
+
+    def hop_distribution(self, user_id, hops=6, connection_type=None, directed=False, limit=None):
+        """Returns {hops: number of users at exactly that distance} from a user."""
+        user = self.users.get(user_id)
+        return hop_distribution(user, hops, connection_type, directed, limit) if user else {}
+
+    def follower_count(self, user_id, connection_type="follows"):
+        """Returns how many users have a connection of the given type to this user."""
+        user = self.users.get(user_id)
+        return user.incoming.count(connection_type) if user else 0
+
+    def mutual_connections(self, user_id_1, user_id_2, connection_type=None):
+        """Returns users both users are connected to (optionally of one type)."""
+        user1 = self.users.get(user_id_1)
+        user2 = self.users.get(user_id_2)
+        if not (user1 and user2):
+            return []
+        first = user1.connections.users(connection_type)
+        second = set(user2.connections.users(connection_type))
+        return [user for user in dict.fromkeys(first) if user in second]
     
 class SocialMediaVisualizer:
     def __init__(self, graph):
         self.graph = graph
+        self.layouts = LayoutCache() # Positions reused while the network is unchanged
 
     def draw_network(self, highlight_users=None, layout="spring"):
         """Draws the social network graph."""
-        G = nx.DiGraph()
-
-        # Add users and their connections
-        for user in self.graph.users.values():
-            G.add_node(user.user_id)
-            for conn in user.connections:
-                G.add_edge(user.user_id, conn["user"].user_id)
+        projection = self.graph.projection()
+        G = projection.graph
 
         # Apply layout
-        if layout == "spring":
-            pos = nx.spring_layout(G)
-        elif layout == "circular":
-            pos = nx.circular_layout(G)
-        else:
-            pos = nx.random_layout(G)
+        if layout not in ("spring", "circular"):
+            layout = "random"
+        pos = self.layouts.layout(G, projection.version, layout)
 
         # Draw the graph
         plt.figure(figsize=(12, 8))
@@ -99,36 +215,31 @@ class SocialMediaVisualizer:
         plt.show()
 
     def export_network(self, filepath="network.png"):
-        """Exports the current graph visualization to a file."""
-        G = nx.DiGraph()
-        for user in self.graph.users.values():
-            G.add_node(user.user_id)
-            for conn in user.connections:
-                G.add_edge(user.user_id, conn["user"].user_id)
-
-        pos = nx.spring_layout(G)
-        plt.figure(figsize=(12, 8))
-        nx.draw(G, pos, with_labels=True, node_size=500, node_color="lightblue")
-        plt.savefig(filepath)
+        """Exports the current graph visualization to a file (no display needed)."""
+        projection = self.graph.projection()
+        G = projection.graph
+        pos = self.layouts.layout(G, projection.version)
+        save_network_image(G, pos, filepath)
         print(f"Graph exported to {filepath}")
 
 """Example Usage"""
-# Initialize graph
-social_graph = SocialMediaGraph()
-
-# Add users
-social_graph.add_user("u1", name="Alice", gender="F", age=30, country="USA")
-social_graph.add_user("u2", name="Bob", gender="M", age=25, country="USA")
-social_graph.add_user("u3", name="Charlie", gender="M", age=35, country="UK")
-
-# Filter users
-filtered_users = social_graph.filter_users(min_post=0, gender="M")
-print("Filtered Users:", [user.name for user in filtered_users])
-
-# Cluster users
-clusters = social_graph.cluster_users("follows")
-print("Clusters:", [[user.name for user in cluster] for cluster in clusters])
-
-# Visualize the network
-visualizer = SocialMediaVisualizer(social_graph)
-visualizer.draw_network()
\ No newline at end of file
+if __name__ == "__main__":
+    # Initialize graph
+    social_graph = SocialMediaGraph()
+
+    # Add users
+    social_graph.add_user("u1", name="Alice", gender="F", age=30, country="USA")
+    social_graph.add_user("u2", name="Bob", gender="M", age=25, country="USA")
+    social_graph.add_user("u3", name="Charlie", gender="M", age=35, country="UK")
+
+    # Filter users
+    filtered_users = social_graph.filter_users(min_posts=0, gender="M")
+    print("Filtered Users:", [user.name for user in filtered_users])
+
+    # Cluster users
+    clusters = social_graph.cluster_users("follows")
+    print("Clusters:", [[user.name for user in cluster] for cluster in clusters])
+
+    # Visualize the network
+    visualizer = SocialMediaVisualizer(social_graph)
+    visualizer.draw_network()
\ No newline at end of file
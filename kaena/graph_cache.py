@@ -0,0 +1,34 @@
+import networkx as nx
+
+
+class GraphProjection:
+    """networkx DiGraph of users and their connections, kept up to date as they change.
+
+    Built once from the users and then updated through add_user and
+    add_connection (SocialMediaGraph calls them), so drawing or exporting
+    the network no longer rebuilds the graph. Each edge records the
+    connection types between the two users in its "types" attribute.
+    version increases with every change, so layouts can be cached per version.
+    """
+    def __init__(self, users):
+        self.users = users  # user_id -> User, shared with the SocialMediaGraph
+        self.graph = nx.DiGraph()
+        self.version = 0
+        for user in users.values():
+            self.add_user(user.user_id)
+        for user in users.values():
+            for conn in user.connections:
+                self.add_connection(user.user_id, conn["user"].user_id, conn["type"])
+
+    def add_user(self, user_id):
+        if user_id not in self.graph:
+            self.graph.add_node(user_id)
+            self.version += 1
+
+    def add_connection(self, user_id_1, user_id_2, connection_type):
+        """Adds the edge for a new connection (or its type to an existing edge)."""
+        if self.graph.has_edge(user_id_1, user_id_2):
+            self.graph.edges[user_id_1, user_id_2]["types"].add(connection_type)
+            return
+        self.graph.add_edge(user_id_1, user_id_2, types={connection_type})
+        self.version += 1
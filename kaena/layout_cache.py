@@ -0,0 +1,128 @@
+import networkx as nx
+import numpy as np
+
+FAST_THRESHOLD = 1000  # Above this many nodes, layouts use the multilevel approximation
+COARSEST_SIZE = 200  # Multilevel layouts run the full spring layout at this size
+
+
+def multilevel_layout(graph, seed=None, coarsest_size=COARSEST_SIZE, smoothing=3):
+    """Approximate force-directed layout for large graphs.
+
+    The graph is repeatedly coarsened by merging matched neighbours (and
+    pairing up whatever is left unmatched) until it has at most
+    coarsest_size nodes, which get a regular spring layout. Each finer level
+    then starts from the position of its merged node and is smoothed towards
+    the mean of its neighbours, which costs O(edges) per level instead of
+    the O(nodes^2) of every spring_layout iteration.
+    """
+    nodes = list(graph)
+    if len(nodes) <= coarsest_size:
+        return nx.spring_layout(graph, seed=seed)
+    rng = np.random.default_rng(seed)
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in graph.edges() if u != v], dtype=np.int64).reshape(-1, 2)
+
+    levels = []  # (fine edges, fine -> coarse mapping) from finest to coarsest
+    size = len(nodes)
+    while size > coarsest_size:
+        mapping = _match(size, edges, rng)
+        levels.append((edges, mapping))
+        edges = np.unique(mapping[edges], axis=0)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        size = int(mapping.max()) + 1
+
+    coarsest = nx.Graph()
+    coarsest.add_nodes_from(range(size))
+    coarsest.add_edges_from(edges.tolist())
+    layout = nx.spring_layout(coarsest, seed=seed)
+    pos = np.array([layout[i] for i in range(size)])
+
+    for fine_edges, mapping in reversed(levels):
+        spread = 0.5 / np.sqrt(len(mapping))
+        pos = pos[mapping] + rng.uniform(-spread, spread, (len(mapping), 2))
+        pos = _smooth(pos, fine_edges, smoothing)
+    pos = nx.rescale_layout(pos)
+    return dict(zip(nodes, pos))
+
+
+def _match(size, edges, rng):
+    """Returns a fine -> coarse node mapping that merges nodes in pairs."""
+    partner = np.full(size, -1, dtype=np.int64)
+    for u, v in edges[rng.permutation(len(edges))].tolist():
+        if partner[u] < 0 and partner[v] < 0:
+            partner[u] = v
+            partner[v] = u
+    unmatched = np.flatnonzero(partner < 0)
+    partner[unmatched[0:-1:2]] = unmatched[1::2]  # Also merges isolated and leftover nodes
+    partner[unmatched[1::2]] = unmatched[0:-1:2]
+    representative = np.where(partner >= 0, np.minimum(np.arange(size), partner), np.arange(size))
+    _, mapping = np.unique(representative, return_inverse=True)
+    return mapping
+
+
+def _smooth(pos, edges, sweeps):
+    """Moves every node halfway towards the mean position of its neighbours."""
+    if not len(edges):
+        return pos
+    both = np.concatenate([edges, edges[:, ::-1]])
+    degree = np.bincount(both[:, 0], minlength=len(pos))[:, None]
+    connected = degree[:, 0] > 0
+    for _ in range(sweeps):
+        total = np.zeros_like(pos)
+        np.add.at(total, both[:, 0], pos[both[:, 1]])
+        pos[connected] = 0.5 * pos[connected] + 0.5 * total[connected] / degree[connected]
+    return pos
+
+
+class LayoutCache:
+    """Node positions cached per graph version and warm-started on change.
+
+    layout() returns the cached positions while the graph version is
+    unchanged. After a change, the spring layout starts from the previous
+    positions (new nodes are placed next to their neighbours) and only runs
+    warm_iterations, so small changes are quick and the picture stays put.
+    Graphs above fast_threshold nodes get the multilevel approximation the
+    first time, and only have their new nodes placed afterwards.
+    """
+    def __init__(self, k=None, iterations=50, warm_iterations=10, fast_threshold=FAST_THRESHOLD, seed=None):
+        self.k = k
+        self.iterations = iterations
+        self.warm_iterations = warm_iterations
+        self.fast_threshold = fast_threshold
+        self.seed = seed
+        self.layouts = {}  # method -> (version, positions)
+
+    def layout(self, graph, version, method="spring"):
+        """Returns {node: position} for graph at version ("spring", "circular" or "random")."""
+        cached = self.layouts.get(method)
+        if cached is not None and cached[0] == version and len(cached[1]) == len(graph):
+            return cached[1]
+        previous = cached[1] if cached is not None else None
+        if method == "circular":
+            pos = nx.circular_layout(graph)
+        elif method == "random":
+            pos = nx.random_layout(graph, seed=self.seed)
+        elif previous is None:
+            if len(graph) > self.fast_threshold:
+                pos = multilevel_layout(graph, seed=self.seed)
+            else:
+                pos = nx.spring_layout(graph, k=self.k, iterations=self.iterations, seed=self.seed)
+        else:
+            pos = self._place_new_nodes(graph, previous)
+            if len(graph) <= self.fast_threshold:
+                pos = nx.spring_layout(graph, k=self.k, pos=pos, iterations=self.warm_iterations, seed=self.seed)
+        self.layouts[method] = (version, pos)
+        return pos
+
+    def _place_new_nodes(self, graph, previous):
+        """Keeps known positions and puts new nodes near their positioned neighbours."""
+        rng = np.random.default_rng(self.seed)
+        pos = {node: previous[node] for node in graph if node in previous}
+        jitter = 0.5 / np.sqrt(len(graph))
+        for node in graph:
+            if node in pos:
+                continue
+            neighbours = [pos[n] for n in nx.all_neighbors(graph, node) if n in pos]
+            centre = np.mean(neighbours, axis=0) if neighbours else rng.uniform(-1, 1, 2)
+            pos[node] = centre + rng.uniform(-jitter, jitter, 2)
+        return pos
@@ -0,0 +1,94 @@
+def neighbours(user, connection_type=None, directed=False, reverse=False):
+    """Returns the users next to user along connections.
+
+    Connections are followed in their direction if directed (against it if
+    also reverse), otherwise both ways.
+    """
+    if directed:
+        connections = user.incoming if reverse else user.connections
+        return connections.users(connection_type)
+    return [*user.connections.users(connection_type), *user.incoming.users(connection_type)]
+
+
+def shortest_path(source, target, connection_type=None, directed=False, max_depth=6):
+    """Returns a shortest list of users from source to target, or None.
+
+    Bidirectional BFS: the smaller of the two frontiers is expanded one
+    level at a time (the target side along incoming connections when
+    directed), so only about the square root of the nodes a plain BFS would
+    visit are touched. Paths longer than max_depth connections are not
+    searched.
+    """
+    if source is target:
+        return [source]
+    parents = ({source: None}, {target: None})  # Forward and backward search trees
+    frontiers = ([source], [target])
+    depth = 0
+    while frontiers[0] and frontiers[1] and depth < max_depth:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        visited, other = parents[side], parents[1 - side]
+        next_frontier = []
+        meeting = None
+        for user in frontiers[side]:
+            for neighbour in neighbours(user, connection_type, directed, reverse=side == 1):
+                if neighbour in visited:
+                    continue
+                visited[neighbour] = user
+                if neighbour in other:
+                    meeting = neighbour
+                    break
+                next_frontier.append(neighbour)
+            if meeting is not None:
+                break
+        depth += 1
+        if meeting is not None:
+            return _join(parents, meeting)
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+    return None
+
+
+def _join(parents, meeting):
+    """Builds the path through the user where both searches met."""
+    path = []
+    user = meeting
+    while user is not None:
+        path.append(user)
+        user = parents[0][user]
+    path.reverse()
+    user = parents[1][meeting]
+    while user is not None:
+        path.append(user)
+        user = parents[1][user]
+    return path
+
+
+def k_hop(source, hops=3, connection_type=None, directed=False, limit=None):
+    """Returns {user: hops} for users within hops connections of source (source excluded).
+
+    Breadth-first, so when limit stops the search early the closest users
+    are the ones returned.
+    """
+    distances = {source: 0}
+    frontier = [source]
+    for depth in range(1, hops + 1):
+        next_frontier = []
+        for user in frontier:
+            for neighbour in neighbours(user, connection_type, directed):
+                if neighbour in distances:
+                    continue
+                distances[neighbour] = depth
+                next_frontier.append(neighbour)
+                if limit is not None and len(distances) > limit:
+                    del distances[source]
+                    return distances
+        frontier = next_frontier
+    del distances[source]
+    return distances
+
+
+def hop_distribution(source, hops=6, connection_type=None, directed=False, limit=None):
+    """Returns {hops: number of users at exactly that distance from source}."""
+    counts = {}
+    for depth in k_hop(source, hops, connection_type, directed, limit).values():
+        counts[depth] = counts.get(depth, 0) + 1
+    return counts
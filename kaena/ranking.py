@@ -0,0 +1,192 @@
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+
+WARM_STARTS = 16  # Score vectors kept for warm starts, least recently used dropped first
+
+
+class ConnectionMatrix:
+    """Sparse adjacency matrix of the connections of one type (or all types).
+
+    Users get consecutive positions in the order they were added; edges are
+    kept in two growing arrays and turned into a SciPy CSR matrix only when
+    asked for after a change. Several connection types between the same two
+    users count as one edge.
+    """
+    def __init__(self, users, connection_type=None):
+        self.users = users  # user_id -> User, shared with the SocialMediaGraph
+        self.connection_type = connection_type
+        self.user_ids = []  # position -> user_id
+        self.positions = {}  # user_id -> position
+        self.sources = array('q')
+        self.targets = array('q')
+        self._csr = None  # None when stale
+        for user in users.values():
+            self.add_user(user.user_id)
+        for user in users.values():
+            for connected_user in set(user.connections.users(connection_type)):
+                self._add_edge(user.user_id, connected_user.user_id)
+
+    def add_user(self, user_id):
+        if user_id not in self.positions:
+            self.positions[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self._csr = None
+
+    def add_connection(self, user_id_1, user_id_2, connection_type):
+        """Adds the edge for a new connection (ignored if of another type)."""
+        if self.connection_type is not None and connection_type != self.connection_type:
+            return
+        self._add_edge(user_id_1, user_id_2)
+
+    def _add_edge(self, user_id_1, user_id_2):
+        self.add_user(user_id_1)
+        self.add_user(user_id_2)
+        self.sources.append(self.positions[user_id_1])
+        self.targets.append(self.positions[user_id_2])
+        self._csr = None
+
+    def csr(self):
+        """Returns the n x n CSR matrix with a 1 at [i, j] if user i is connected to user j."""
+        if self._csr is None:
+            n = len(self.user_ids)
+            sources = np.frombuffer(self.sources, dtype=np.int64)
+            targets = np.frombuffer(self.targets, dtype=np.int64)
+            matrix = sp.csr_matrix((np.ones(len(sources)), (sources, targets)), shape=(n, n))
+            matrix.sum_duplicates()
+            matrix.data[:] = 1.0
+            self._csr = matrix
+        return self._csr
+
+    def to_dict(self, values):
+        """Maps a vector indexed by position back to {user_id: value}."""
+        return dict(zip(self.user_ids, values.tolist()))
+
+
+class RankingEngine:
+    """Influence rankings over the connection graph with sparse power iteration.
+
+    Wraps a ConnectionMatrix that SocialMediaGraph keeps up to date. Each
+    power iteration is one sparse matrix-vector product, and the last result
+    of every ranking is kept, so after a few new connections the iteration
+    starts from it (a warm start) and converges in a handful of steps.
+    Only the warm_starts most recently used rankings are kept, so asking for
+    many different personalizations does not grow memory without bound.
+    """
+    def __init__(self, users, connection_type=None, warm_starts=WARM_STARTS):
+        self.matrix = ConnectionMatrix(users, connection_type)
+        self.warm_starts = warm_starts
+        self._previous = OrderedDict()  # ranking key -> last score vector, least recently used first
+
+    def add_user(self, user_id):
+        self.matrix.add_user(user_id)
+
+    def add_connection(self, user_id_1, user_id_2, connection_type):
+        self.matrix.add_connection(user_id_1, user_id_2, connection_type)
+
+    def _start(self, key, n):
+        """Returns the previous result for key, extended to n users, or a uniform vector."""
+        previous = self._previous.get(key)
+        if previous is None:
+            return np.full(n, 1.0 / n)
+        self._previous.move_to_end(key)
+        start = np.empty(n)
+        start[:len(previous)] = previous
+        start[len(previous):] = 1.0 / n
+        return start / start.sum()
+
+    def _remember(self, key, scores):
+        """Keeps scores as the warm start for key, dropping the least recently used ones."""
+        self._previous[key] = scores
+        self._previous.move_to_end(key)
+        while len(self._previous) > self.warm_starts:
+            self._previous.popitem(last=False)
+
+    def pagerank(self, damping=0.85, personalization=None, tol=1e-6, max_iter=100):
+        """Returns {user_id: PageRank}, summing to 1.
+
+        With personalization ({user_id: weight}), random jumps (and the rank
+        of users without connections) go to those users only, which ranks
+        users by their influence as seen from them. Like networkx, the
+        iteration stops once the L1 change is below n * tol; on periodic
+        graphs (e.g. two users following each other) the error only shrinks
+        by damping per step, so a much smaller tol needs a larger max_iter.
+        Raises RuntimeError if it does not converge within max_iter steps.
+        """
+        matrix = self.matrix
+        n = len(matrix.user_ids)
+        if n == 0:
+            return {}
+        adjacency = matrix.csr()
+        out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+        dangling = out_degree == 0
+        inverse_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+        transition = (sp.diags(inverse_degree) @ adjacency).T.tocsr()
+
+        if personalization:
+            jump = np.zeros(n)
+            for user_id, weight in personalization.items():
+                jump[matrix.positions[user_id]] = weight
+            jump /= jump.sum()
+            key = ("pagerank", damping, frozenset(personalization.items()))
+        else:
+            jump = np.full(n, 1.0 / n)
+            key = ("pagerank", damping, None)
+
+        scores = self._start(key, n)
+        for _ in range(max_iter):
+            previous = scores
+            scores = damping * (transition @ previous + previous[dangling].sum() * jump) + (1 - damping) * jump
+            if np.abs(scores - previous).sum() < n * tol:
+                self._remember(key, scores)
+                return matrix.to_dict(scores)
+        raise RuntimeError(f"PageRank did not converge in {max_iter} iterations")
+
+    def eigenvector(self, tol=1e-6, max_iter=100):
+        """Returns {user_id: eigenvector centrality} over incoming connections (unit length).
+
+        Iterates x <- x + A^T x like networkx, which also converges on
+        graphs with periodic structure. Raises RuntimeError if it does not
+        converge within max_iter steps.
+        """
+        matrix = self.matrix
+        n = len(matrix.user_ids)
+        if n == 0:
+            return {}
+        incoming = matrix.csr().T.tocsr()
+        scores = self._start("eigenvector", n)
+        for _ in range(max_iter):
+            previous = scores
+            scores = previous + incoming @ previous
+            norm = np.linalg.norm(scores)
+            scores = scores / norm if norm else scores
+            if np.abs(scores - previous).sum() < n * tol:
+                self._remember("eigenvector", scores)
+                return matrix.to_dict(scores)
+        raise RuntimeError(f"Eigenvector centrality did not converge in {max_iter} iterations")
+
+    def in_degree(self):
+        """Returns {user_id: number of users connected to them}."""
+        matrix = self.matrix
+        counts = np.bincount(matrix.csr().indices, minlength=len(matrix.user_ids))
+        return matrix.to_dict(counts)
+
+
+# Example Usage
+if __name__ == "__main__":
+    from classes import User
+
+    # Users 0 and 1 follow each other (a 2-cycle), 2 and 3 follow 0
+    users = {user_id: User(user_id) for user_id in range(4)}
+    for source, target in [(0, 1), (1, 0), (2, 0), (3, 0)]:
+        users[source].add_connection("follows", users[target])
+    engine = RankingEngine(users, "follows")
+    print("PageRank:", engine.pagerank())
+
+    # Warm start after a new connection closes the path 2 -> 0 -> 1 -> 2
+    users[1].add_connection("follows", users[2])
+    engine.add_connection(1, 2, "follows")
+    print("PageRank after 1 -> 2:", engine.pagerank())
+    print("In-degree:", engine.in_degree())
@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+
+METHODS = ("mutual", "jaccard", "adamic_adar", "read_posts")
+MAX_FAN_OUT = 1000  # Users with more connections (or posts with more readers) are not used as a link
+CHUNK_SIZE = 2000  # Users per task in recommend_all
+
+_shared = None  # (left, right, row degrees, column degrees, exclude, method) in worker processes
+
+
+def _top_candidates(left, right, row_degrees, column_degrees, exclude, method, rows, top):
+    """Scores the candidates of a block of users with one sparse product.
+
+    left[rows] @ right counts (or weighs) the links from each user to every
+    other user; only users reachable through a link are ever looked at.
+    """
+    scores = (left[rows] @ right).tocsr()
+    results = []
+    for i, row in enumerate(rows):
+        start, end = scores.indptr[i], scores.indptr[i + 1]
+        candidates = scores.indices[start:end]
+        values = scores.data[start:end]
+        if method == "jaccard":
+            values = values / (row_degrees[row] + column_degrees[candidates] - values)
+        keep = candidates != row
+        if exclude is not None:
+            connected = exclude.indices[exclude.indptr[row]:exclude.indptr[row + 1]]
+            keep &= ~np.isin(candidates, connected)
+        candidates = candidates[keep]
+        values = values[keep]
+        if len(candidates) > top:
+            best = np.argpartition(-values, top - 1)[:top]
+            candidates = candidates[best]
+            values = values[best]
+        order = np.lexsort((candidates, -values))
+        results.append((row, candidates[order].tolist(), values[order].tolist()))
+    return results
+
+
+def _init_worker(shared):
+    global _shared
+    _shared = shared
+
+
+def _worker_chunk(rows, top):
+    return _top_candidates(*_shared, rows, top)
+
+
+class Recommender:
+    """Whom-to-follow suggestions from a ConnectionMatrix and the users' read posts.
+
+    Friends of friends (users C with X -> B -> C) are scored for user X by:
+      mutual       - number of X's connections B that are connected to C
+      jaccard      - those B / users X is connected to or connected to C
+                     (both counted over links within max_fan_out)
+      adamic_adar  - those B, each weighted by 1 / log(connections of B), so
+                     a selective account counts more than one following everybody
+    and, with read_posts, users who read the same posts by the number of
+    posts both have read. Accounts with more than max_fan_out connections
+    (and posts with more readers) are skipped as links: they would reach a
+    huge number of candidates while saying little about any of them. Users
+    already connected are never suggested.
+    """
+    def __init__(self, matrix, max_fan_out=MAX_FAN_OUT):
+        self.matrix = matrix  # ConnectionMatrix, shared with the RankingEngine
+        self.max_fan_out = max_fan_out
+
+    def _read_matrix(self):
+        """Builds the users x posts matrix of read_posts."""
+        matrix = self.matrix
+        post_positions = {}
+        rows = []
+        columns = []
+        for position, user_id in enumerate(matrix.user_ids):
+            for post in matrix.users[user_id].read_posts:
+                rows.append(position)
+                columns.append(post_positions.setdefault(post, len(post_positions)))
+        shape = (len(matrix.user_ids), len(post_positions))
+        return sp.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=shape)
+
+    def _operands(self, method):
+        """Returns (left, right, row degrees, column degrees, exclude) so that left @ right gives the scores."""
+        if method not in METHODS:
+            raise ValueError(f"Unknown recommendation method {method!r}")
+        adjacency = self.matrix.csr()
+        if method == "read_posts":
+            links = self._read_matrix()
+            right = links.T.tocsr()
+            fan_out = np.asarray(links.sum(axis=0)).ravel()  # Readers of each post
+        else:
+            links = adjacency
+            right = adjacency
+            fan_out = np.asarray(adjacency.sum(axis=1)).ravel()  # Connections of each middle user
+        usable = (fan_out <= self.max_fan_out).astype(float)
+        weights = usable
+        if method == "adamic_adar":
+            weights = np.divide(usable, np.log(np.maximum(fan_out, 2)), out=np.zeros(len(usable)), where=fan_out > 1)
+        left = (links @ sp.diags(weights)).tocsr()
+        # Degrees over usable links only, so Jaccard compares the same sets as its numerator
+        row_degrees = links @ usable
+        column_degrees = right.T @ usable
+        return left, right, row_degrees, column_degrees, adjacency
+
+    def recommend(self, user_id, top=10, method="adamic_adar"):
+        """Returns up to top (user_id, score) suggestions for one user, best first."""
+        row = self.matrix.positions[user_id]
+        (_, candidates, values), = _top_candidates(*self._operands(method), method, [row], top)
+        user_ids = self.matrix.user_ids
+        return [(user_ids[candidate], value) for candidate, value in zip(candidates, values)]
+
+    def recommend_all(self, top=10, method="adamic_adar", workers=None, chunk_size=CHUNK_SIZE):
+        """Precomputes suggestions for every user: {user_id: [(user_id, score), ...]}.
+
+        Users are scored in chunks, one sparse product per chunk, in a
+        process pool (workers defaults to the CPU count; 1, or a single
+        chunk, runs in-process).
+        """
+        shared = (*self._operands(method), method)
+        n = len(self.matrix.user_ids)
+        chunks = [range(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+        if workers == 1 or len(chunks) <= 1:
+            results = [_top_candidates(*shared, chunk, top) for chunk in chunks]
+        else:
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+                results = list(pool.map(_worker_chunk, chunks, [top] * len(chunks)))
+        user_ids = self.matrix.user_ids
+        return {user_ids[row]: [(user_ids[candidate], value) for candidate, value in zip(candidates, values)]
+                for chunk in results for row, candidates, values in chunk}
@@ -0,0 +1,52 @@
+import random
+
+import networkx as nx
+
+from classes import User
+from clustering import ClusterEngine, strongly_connected
+
+
+def random_users(rng, n=40, edges=45):
+    users = {i: User(i) for i in range(n)}
+    for _ in range(edges):
+        users[rng.randrange(n)].add_connection(rng.choice(["friend", "follows"]), users[rng.randrange(n)])
+    return users
+
+
+def as_networkx(users, connection_type=None):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(users)
+    for user in users.values():
+        graph.add_edges_from((user.user_id, other.user_id) for other in user.connections.users(connection_type))
+    return graph
+
+
+def ids(clusters):
+    return sorted(sorted(user.user_id for user in cluster) for cluster in clusters)
+
+
+def test_clusters_match_networkx_as_connections_are_added():
+    rng = random.Random(0)
+    users = random_users(rng)
+    engine, friends = ClusterEngine(users), ClusterEngine(users, "friend")
+    for _ in range(40):
+        user, other, connection_type = rng.randrange(40), rng.randrange(40), rng.choice(["friend", "follows"])
+        if users[user].add_connection(connection_type, users[other]):
+            for cluster_engine in (engine, friends):
+                cluster_engine.add_connection(user, other, connection_type)
+        for cluster_engine, connection_type in ((engine, None), (friends, "friend")):
+            graph = as_networkx(users, connection_type)
+            assert ids(cluster_engine.clusters()) == sorted(map(sorted, nx.weakly_connected_components(graph)))
+            assert ids(cluster_engine.clusters(strongly=True)) == \
+                sorted(map(sorted, nx.strongly_connected_components(graph)))
+            a, b = rng.randrange(40), rng.randrange(40)
+            assert cluster_engine.same_cluster(a, b) == nx.has_path(graph.to_undirected(), a, b)
+
+
+def test_long_chains_do_not_recurse():
+    users = {i: User(i) for i in range(20000)}
+    for i in range(19999):
+        users[i].add_connection("follows", users[i + 1])
+    users[19999].add_connection("follows", users[0])
+    assert len(strongly_connected(users)) == 1
+    assert ClusterEngine(users).same_cluster(0, 19999)
@@ -0,0 +1,35 @@
+import random
+
+from find_interesting_users import SocialMediaGraph
+from sqlite_database import SQLiteDatabase
+
+
+def build(graph, seed=0):
+    rng = random.Random(seed)
+    for i in range(30):
+        graph.add_user(i, age=rng.choice([None, 20, 40, 60]), country=rng.choice(["US", "FR"]),
+                       gender=rng.choice(["f", "m"]))
+    posts = []
+    for i in range(60):
+        creator = graph.users[rng.randrange(30)]
+        if i % 2:
+            posts.append(graph.make_post(creator.user_id, f"post {i}", rng.choice(posts) if posts else None))
+        else:
+            creator.make_post(f"direct post {i}")  # Reaches the database through post_listeners
+        graph.add_connections(rng.randrange(30), rng.randrange(30), rng.choice(["friend", "follows"]))
+    return graph
+
+
+def test_filter_users_with_a_database_matches_the_index():
+    db = SQLiteDatabase(":memory:")
+    with_db, without = build(SocialMediaGraph(db)), build(SocialMediaGraph())
+    for options in (dict(), dict(country="US"), dict(min_posts=2), dict(max_posts=0, gender="f"),
+                    dict(min_age=30, max_age=60), dict(min_posts=1, country="FR", min_age=20)):
+        assert [user.user_id for user in with_db.filter_users(**options)] == \
+            [user.user_id for user in without.filter_users(**options)]
+    assert db.connection.execute("SELECT COUNT(*) FROM posts").fetchone()[0] == 60
+    assert db.connection.execute("SELECT COUNT(*) FROM posts WHERE responding_to IS NOT NULL").fetchone()[0] == \
+        sum(post.responding_to is not None for user in with_db.users.values() for post in user.authored_posts)
+    assert db.connection.execute("SELECT COUNT(*) FROM connections").fetchone()[0] == \
+        sum(len(user.connections) for user in with_db.users.values())
+    db.close()
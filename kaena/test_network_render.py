@@ -0,0 +1,20 @@
+import random
+
+from batch_render import render_networks
+from find_interesting_users import SocialMediaGraph, SocialMediaVisualizer
+
+
+def test_network_images_are_written_in_process_and_in_a_pool(tmp_path):
+    rng = random.Random(0)
+    graph = SocialMediaGraph()
+    for i in range(12):
+        graph.add_user(i, country=rng.choice(["US", "UK"]))
+    for _ in range(20):
+        graph.add_connections(rng.randrange(12), rng.randrange(12), "friend")
+    visualizer = SocialMediaVisualizer(graph)
+    for workers in (1, 2):
+        jobs = [({}, tmp_path / f"all-{workers}.png"), ({"country": "UK"}, tmp_path / f"uk-{workers}.svg")]
+        results = render_networks(visualizer, jobs, workers=workers)
+        assert [path for path, _ in results] == [path for _, path in jobs]
+        assert all(path.stat().st_size > 0 for _, path in jobs)
+    assert (tmp_path / "uk-1.svg").read_text().startswith("<?xml")
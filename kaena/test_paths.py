@@ -0,0 +1,62 @@
+import random
+
+import networkx as nx
+import pytest
+
+from classes import User
+from paths import hop_distribution, k_hop, shortest_path
+
+
+def random_users(seed=0, n=60, edges=90):
+    rng = random.Random(seed)
+    users = [User(i) for i in range(n)]
+    for _ in range(edges):
+        rng.choice(users).add_connection(rng.choice(["friend", "follows"]), rng.choice(users))
+    return users
+
+
+def as_networkx(users, connection_type, directed):
+    graph = nx.DiGraph() if directed else nx.Graph()
+    graph.add_nodes_from(users)
+    for user in users:
+        graph.add_edges_from((user, other) for other in user.connections.users(connection_type) if other is not user)
+    return graph
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("connection_type", [None, "friend"])
+def test_paths_and_hops_match_networkx(directed, connection_type):
+    users = random_users()
+    graph = as_networkx(users, connection_type, directed)
+    rng = random.Random(1)
+    for _ in range(100):
+        source, target = rng.choice(users), rng.choice(users)
+        path = shortest_path(source, target, connection_type, directed)
+        try:
+            expected = nx.shortest_path_length(graph, source, target)
+        except nx.NetworkXNoPath:
+            expected = None
+        if expected is None or expected > 6:
+            assert path is None
+            continue
+        assert len(path) - 1 == expected and path[0] is source and path[-1] is target
+        assert all(graph.has_edge(a, b) for a, b in zip(path, path[1:]))
+    source = users[0]
+    distances = nx.single_source_shortest_path_length(graph, source, cutoff=3)
+    del distances[source]
+    assert k_hop(source, 3, connection_type, directed) == distances
+    counts = {}
+    for depth in nx.single_source_shortest_path_length(graph, source, cutoff=6).values():
+        counts[depth] = counts.get(depth, 0) + 1
+    del counts[0]
+    assert hop_distribution(source, 6, connection_type, directed) == counts
+
+
+def test_k_hop_limit_keeps_the_closest_users():
+    users = [User(i) for i in range(10)]
+    for a, b in zip(users, users[1:]):
+        a.add_connection("friend", b)
+    assert k_hop(users[0], hops=9, limit=3) == {users[1]: 1, users[2]: 2, users[3]: 3}
+    assert shortest_path(users[0], users[9], max_depth=8) is None
+    assert shortest_path(users[0], users[9], max_depth=9) == users
+    assert shortest_path(users[0], users[0]) == [users[0]]
@@ -0,0 +1,52 @@
+import random
+
+import networkx as nx
+import pytest
+
+from classes import User
+from ranking import RankingEngine
+
+
+def random_users(seed=0, n=30, edges=90):
+    rng = random.Random(seed)
+    users = {i: User(i) for i in range(n)}
+    for _ in range(edges):
+        users[rng.randrange(n)].add_connection(rng.choice(["friend", "follows"]), users[rng.randrange(n)])
+    return users
+
+
+def as_networkx(users, connection_type=None):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(users)
+    for user in users.values():
+        graph.add_edges_from((user.user_id, other.user_id) for other in user.connections.users(connection_type))
+    return graph
+
+
+@pytest.mark.parametrize("connection_type", [None, "follows"])
+def test_pagerank_matches_networkx_after_new_connections(connection_type):
+    users = random_users()
+    engine = RankingEngine(users, connection_type)
+    engine.pagerank()
+    rng = random.Random(1)
+    for _ in range(10):
+        user, other = users[rng.randrange(30)], users[rng.randrange(30)]
+        user.add_connection("follows", other)
+        engine.add_connection(user.user_id, other.user_id, "follows")
+    expected = nx.pagerank(as_networkx(users, connection_type), tol=1e-10)
+    scores = engine.pagerank(tol=1e-10, max_iter=1000)
+    assert scores == pytest.approx(expected, abs=1e-6)
+
+
+def test_warm_starts_are_bounded_to_the_most_recently_used():
+    engine = RankingEngine(random_users(), warm_starts=3)
+    engine.pagerank()
+    for user_id in range(5):
+        engine.pagerank(personalization={user_id: 1})
+    engine.eigenvector()
+    assert len(engine._previous) == 3
+    assert ("pagerank", 0.85, frozenset({4: 1}.items())) in engine._previous
+    engine.pagerank(personalization={3: 1})  # Used again, so it outlives 4
+    engine.pagerank()
+    assert list(engine._previous) == ["eigenvector", ("pagerank", 0.85, frozenset({3: 1}.items())),
+                                      ("pagerank", 0.85, None)]
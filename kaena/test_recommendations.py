@@ -0,0 +1,73 @@
+import math
+import random
+
+import pytest
+
+from classes import User, Post
+from ranking import ConnectionMatrix
+from recommendations import Recommender
+
+
+def random_users(seed=0, n=40, edges=160, reads=200):
+    rng = random.Random(seed)
+    users = {i: User(i) for i in range(n)}
+    for _ in range(edges):
+        users[rng.randrange(n)].add_connection(rng.choice(["friend", "follows"]), users[rng.randrange(n)])
+    posts = [Post(users[rng.randrange(n)], f"post {i}") for i in range(30)]
+    for _ in range(reads):
+        users[rng.randrange(n)].add_read_post(rng.choice(posts))
+    return users
+
+
+def brute_force(users, user_id, method, max_fan_out):
+    following = {user_id: {other.user_id for other in user.connections.users()} for user_id, user in users.items()}
+    readers = {}
+    for user in users.values():
+        for post in user.read_posts:
+            readers.setdefault(post, set()).add(user.user_id)
+    scores = {}
+    if method == "read_posts":
+        for post in users[user_id].read_posts:
+            if len(readers[post]) <= max_fan_out:
+                for other in readers[post]:
+                    scores[other] = scores.get(other, 0) + 1
+    else:
+        for middle in following[user_id]:
+            fan_out = len(following[middle])
+            if fan_out > max_fan_out:
+                continue
+            weight = 1 / math.log(fan_out) if method == "adamic_adar" and fan_out > 1 else \
+                (0 if method == "adamic_adar" else 1)
+            for other in following[middle]:
+                scores[other] = scores.get(other, 0) + weight
+        if method == "jaccard":
+            usable = {middle for middle in following if len(following[middle]) <= max_fan_out}
+            own = len(following[user_id] & usable)
+            for other, shared in scores.items():
+                followers = sum(1 for middle in usable if other in following[middle])
+                scores[other] = shared / (own + followers - shared)
+    return {other: score for other, score in scores.items()
+            if other != user_id and other not in following[user_id] and score > 0}
+
+
+@pytest.mark.parametrize("method", ["mutual", "jaccard", "adamic_adar", "read_posts"])
+def test_scores_match_a_brute_force_count(method):
+    users = random_users()
+    recommender = Recommender(ConnectionMatrix(users), max_fan_out=6)
+    for user_id in users:
+        expected = brute_force(users, user_id, method, 6)
+        suggestions = recommender.recommend(user_id, top=len(users), method=method)
+        assert {other: score for other, score in suggestions if score > 0} == pytest.approx(expected)
+        assert [score for _, score in suggestions] == sorted((score for _, score in suggestions), reverse=True)
+        top = recommender.recommend(user_id, top=3, method=method)
+        assert [score for _, score in top] == [score for _, score in suggestions[:3]]
+
+
+def test_recommend_all_matches_one_by_one():
+    users = random_users(seed=1)
+    recommender = Recommender(ConnectionMatrix(users))
+    expected = {user_id: recommender.recommend(user_id, top=5) for user_id in users}
+    assert recommender.recommend_all(top=5, workers=1, chunk_size=7) == expected
+    assert recommender.recommend_all(top=5, workers=2, chunk_size=7) == expected
+    with pytest.raises(ValueError):
+        recommender.recommend(0, method="unknown")
@@ -0,0 +1,28 @@
+import random
+
+from classes import User
+from user_index import UserIndex
+
+
+def test_queries_match_a_scan_as_posts_are_made():
+    rng = random.Random(0)
+    index = UserIndex()
+    users = []
+    for i in range(50):
+        user = User(i, gender=rng.choice(["f", "m", None]), age=rng.choice([None, 17, 25, 40, 70]),
+                    country=rng.choice(["US", "FR"]), region=rng.choice(["north", "south"]))
+        user.post_listeners.append(index.add_post)
+        index.add_user(user)
+        users.append(user)
+    for i in range(150):
+        rng.choice(users).make_post(f"post {i}")
+        options = rng.choice([dict(gender="f"), dict(country="US", region="north"), dict(min_posts=3),
+                              dict(min_posts=1, max_posts=2, min_age=20), dict(max_age=30, gender="m"),
+                              dict(country="nowhere"), dict()])
+        expected = [user for user in users
+                    if all(value is None or getattr(user, key) == value for key, value in options.items()
+                           if key in ("gender", "country", "region"))
+                    and options.get("min_posts", 0) <= len(user.authored_posts) <= options.get("max_posts", 1e9)
+                    and (("min_age" not in options and "max_age" not in options) or user.age is not None
+                         and options.get("min_age", 0) <= user.age <= options.get("max_age", 1e9))]
+        assert index.query(**options) == expected
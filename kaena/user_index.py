@@ -0,0 +1,142 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import compress
+
+_BINARY_DIGITS = bytes.maketrans(b"01", b"\x00\x01")  # "0"/"1" characters -> 0/1 bytes
+
+
+class UserIndex:
+    """Bitmap index over user attributes for fast multi-criteria filtering.
+
+    Every user gets a bit position. For each indexed attribute value the
+    index keeps a Bitmap of the users having it, so combined filters are
+    bitwise ANDs. Age and number of authored posts also keep their distinct
+    values sorted, so ranges are an OR over the matching bitmaps.
+    """
+    ATTRIBUTES = ("gender", "country", "region")
+
+    def __init__(self):
+        self.users = []  # bit position -> User
+        self.positions = {}  # user_id -> bit position
+        self.all = Bitmap()
+        self.bitmaps = {attribute: {} for attribute in self.ATTRIBUTES}
+        self.ages = _RangeBitmaps()
+        self.post_counts = _RangeBitmaps()
+        self.indexed_post_counts = []  # bit position -> post count currently indexed
+
+    def add_user(self, user):
+        """Indexes a new user."""
+        if user.user_id in self.positions:
+            return
+        position = len(self.users)
+        self.users.append(user)
+        self.positions[user.user_id] = position
+        self.all.set(position)
+        for attribute in self.ATTRIBUTES:
+            value = getattr(user, attribute)
+            bitmaps = self.bitmaps[attribute]
+            if value not in bitmaps:
+                bitmaps[value] = Bitmap()
+            bitmaps[value].set(position)
+        if user.age is not None:
+            self.ages.add(user.age, position)
+        count = len(user.authored_posts)
+        self.post_counts.add(count, position)
+        self.indexed_post_counts.append(count)
+
+    def add_post(self, post):
+        """Counts a new post of its creator (a User.post_listeners callback)."""
+        self.update_post_count(post.creator)
+
+    def update_post_count(self, user):
+        """Moves a user to its current number of authored posts."""
+        position = self.positions[user.user_id]
+        old = self.indexed_post_counts[position]
+        new = len(user.authored_posts)
+        if old != new:
+            self.post_counts.remove(old, position)
+            self.post_counts.add(new, position)
+            self.indexed_post_counts[position] = new
+
+    def query(self, min_posts=None, max_posts=None, gender=None, country=None, region=None,
+              min_age=None, max_age=None):
+        """Returns the users matching all given criteria, in insertion order."""
+        result = self.all.value
+        for attribute, value in (("gender", gender), ("country", country), ("region", region)):
+            if value:
+                bitmap = self.bitmaps[attribute].get(value)
+                result &= bitmap.value if bitmap else 0
+        if min_posts is not None or max_posts is not None:
+            result &= self.post_counts.between(min_posts, max_posts)
+        if min_age is not None or max_age is not None:
+            result &= self.ages.between(min_age, max_age)
+        return self.decode(result)
+
+    def decode(self, bitmap):
+        """Returns the users whose bits are set in bitmap."""
+        bits = bin(bitmap)[:1:-1].encode("ascii")  # Least significant bit first
+        return list(compress(self.users, bits.translate(_BINARY_DIGITS)))
+
+
+class Bitmap:
+    """Growable bitmap stored in a bytearray.
+
+    Setting and clearing a bit is O(1); value converts it to an int (cached
+    until the next change) so whole bitmaps combine with C-speed &, |.
+    """
+    __slots__ = ("bits", "count", "_value")
+
+    def __init__(self):
+        self.bits = bytearray()
+        self.count = 0  # Number of bits set
+        self._value = 0
+
+    def set(self, position):
+        byte, bit = divmod(position, 8)
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        if not self.bits[byte] & (1 << bit):
+            self.bits[byte] |= 1 << bit
+            self.count += 1
+            self._value = None
+
+    def clear(self, position):
+        byte, bit = divmod(position, 8)
+        if byte < len(self.bits) and self.bits[byte] & (1 << bit):
+            self.bits[byte] &= ~(1 << bit) & 0xFF
+            self.count -= 1
+            self._value = None
+
+    @property
+    def value(self):
+        if self._value is None:
+            self._value = int.from_bytes(self.bits, "little")
+        return self._value
+
+
+class _RangeBitmaps:
+    """Bitmaps keyed by a numeric value, with the values kept sorted for range ORs."""
+    def __init__(self):
+        self.keys = []
+        self.bitmaps = {}
+
+    def add(self, key, position):
+        if key not in self.bitmaps:
+            insort(self.keys, key)
+            self.bitmaps[key] = Bitmap()
+        self.bitmaps[key].set(position)
+
+    def remove(self, key, position):
+        bitmap = self.bitmaps[key]
+        bitmap.clear(position)
+        if not bitmap.count:
+            del self.bitmaps[key]
+            del self.keys[bisect_left(self.keys, key)]
+
+    def between(self, low=None, high=None):
+        """Returns the OR of the bitmaps with low <= key <= high (None = unbounded)."""
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        result = 0
+        for key in self.keys[start:end]:
+            result |= self.bitmaps[key].value
+        return result
@@ -0,0 +1,129 @@
+import numpy as np
+
+DEFAULT_AGE_EDGES = (0, 18, 25, 35, 50, 65, 200)
+
+
+class _Column:
+    """Preallocated NumPy array that doubles its capacity as values are appended."""
+    __slots__ = ("data", "size")
+
+    def __init__(self, values=(), dtype=np.int64):
+        values = np.asarray(values, dtype=dtype)
+        self.data = np.empty(max(8, 2 * len(values)), dtype=dtype)
+        self.data[:len(values)] = values
+        self.size = len(values)
+
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.empty(2 * len(self.data), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    @property
+    def values(self):
+        return self.data[:self.size]
+
+
+class AudienceIndex:
+    """NumPy columns of viewer attributes for batched audience breakdowns.
+
+    Built once from the users; every user gets an integer position and their
+    age, country and region are stored as arrays, so breaking down the
+    viewers of many posts is a handful of vectorized operations instead of a
+    Python loop per post (as Post.seen_by_age / seen_by_country_or_region do).
+    Columns grow in place as users are added, and each post's viewer
+    positions are collected the first time it is broken down and then kept
+    up to date through Post.view_listeners.
+    """
+    def __init__(self, users):
+        self.users = list(users)
+        self.positions = {user: i for i, user in enumerate(self.users)}
+        self._ages = _Column([np.nan if user.age is None else user.age for user in self.users], dtype=float)
+        self.locations = {}
+        self.location_codes = {}
+        self._codes = {}
+        for attribute in ("country", "region"):
+            values = [getattr(user, attribute) for user in self.users]
+            labels = list(dict.fromkeys(values))
+            lookup = {label: code for code, label in enumerate(labels)}
+            self.locations[attribute] = labels
+            self.location_codes[attribute] = lookup
+            self._codes[attribute] = _Column([lookup[value] for value in values])
+        self.viewers = {}  # post -> _Column of viewer positions
+
+    @property
+    def ages(self):
+        return self._ages.values
+
+    @property
+    def codes(self):
+        return {attribute: column.values for attribute, column in self._codes.items()}
+
+    def add_user(self, user):
+        """Adds a user that joined after the index was built; returns their position."""
+        position = self.positions.get(user)
+        if position is not None:
+            return position
+        position = self.positions[user] = len(self.users)
+        self.users.append(user)
+        self._ages.append(np.nan if user.age is None else user.age)
+        for attribute in ("country", "region"):
+            value = getattr(user, attribute)
+            lookup = self.location_codes[attribute]
+            if value not in lookup:
+                lookup[value] = len(self.locations[attribute])
+                self.locations[attribute].append(value)
+            self._codes[attribute].append(lookup[value])
+        return position
+
+    def _viewers(self, post):
+        """Returns the viewer positions column of post, tracking its new views from now on."""
+        column = self.viewers.get(post)
+        if column is None:
+            column = self.viewers[post] = _Column([self.add_user(user) for user in post.seen_by])
+            post.view_listeners.append(self._on_view)
+        return column
+
+    def _on_view(self, post, user, time):
+        self.viewers[post].append(self.add_user(user))
+
+    def viewer_positions(self, posts):
+        """Returns (viewers per post, viewer positions) arrays, CSR style, for posts."""
+        columns = [self._viewers(post) for post in posts]
+        lengths = np.array([column.size for column in columns], dtype=np.int64)
+        if not columns:
+            return lengths, np.empty(0, dtype=np.int64)
+        return lengths, np.concatenate([column.values for column in columns])
+
+    def breakdown(self, posts, age_edges=DEFAULT_AGE_EDGES, by="country", per_post=True):
+        """Counts the viewers of posts by age band and country (or region).
+
+        Age bands are [age_edges[i], age_edges[i + 1]); viewers without an
+        age or outside the edges are not counted. Returns (counts, locations)
+        where counts has shape (len(posts), bands, len(locations)), or
+        (bands, len(locations)) summed over all posts if per_post is False.
+        """
+        edges = np.asarray(age_edges, dtype=float)
+        bands = len(edges) - 1
+        locations = self.locations[by]
+        lengths, viewers = self.viewer_positions(posts)
+        post_count = len(lengths)
+        post_index = np.repeat(np.arange(post_count), lengths)
+
+        band = np.searchsorted(edges, self.ages[viewers], side="right") - 1
+        valid = (band >= 0) & (band < bands)  # NaN ages sort past the last edge
+        location = self._codes[by].values[viewers]
+        if per_post:
+            flat = (post_index * bands + band) * len(locations) + location
+            counts = np.bincount(flat[valid], minlength=post_count * bands * len(locations))
+            return counts.reshape(post_count, bands, len(locations)), locations
+        flat = band * len(locations) + location
+        counts = np.bincount(flat[valid], minlength=bands * len(locations))
+        return counts.reshape(bands, len(locations)), locations
+
+
+def audience_breakdown(users, posts, age_edges=DEFAULT_AGE_EDGES, by="country", per_post=True):
+    """Builds an AudienceIndex over users and breaks down the viewers of posts."""
+    return AudienceIndex(users).breakdown(posts, age_edges, by, per_post)
@@ -0,0 +1,156 @@
+from itertools import islice
+
+import networkx as nx
+
+
+def user_node(user):
+    return f"user_{user.user_id}"
+
+
+def post_node(number):
+    return f"post_{number}"  # Numbered in the order posts are added to a GraphProjection
+
+
+class GraphProjection:
+    """networkx graph of users, posts and views, built once and kept up to date.
+
+    Instead of clearing and rebuilding the graph on every call, the
+    projection follows the objects as they change: it listens for the new
+    posts of its users (User.post_listeners) and for the views and comments
+    of its posts (Post.view_listeners / comment_listeners). sync() only has
+    to add the users appended to the users list since the last call.
+    Importance is the only criteria-dependent attribute: changing the
+    criteria recomputes it for the post nodes, and new views, comments or
+    replies recompute it for the posts they affect. Changes made without the
+    mutators (e.g. post.comments.append) are picked up with update_post.
+    version increases whenever nodes or edges are added, so layouts can be
+    cached per version.
+    """
+    def __init__(self, users, importance, threads=None):
+        self.users = users  # List of User objects, shared with the visualizer
+        self.importance = importance  # (post, criteria) -> importance
+        self.threads = threads  # Optional ThreadIndex, fed with every new post
+        self.graph = nx.Graph()
+        self.criteria = None
+        self.version = 0
+        self._user_count = 0  # Users of self.users already followed
+        self._users_by_node = {}  # user node -> User
+        self._nodes = {}  # post -> post node
+        self._posts = {}  # post node -> post
+        self._comments = {}  # post node -> number of comments when importance was last computed
+
+    def add_user(self, user):
+        """Adds a user node; returns False if it was already there."""
+        node = user_node(user)
+        if node in self._users_by_node:
+            return False
+        self.graph.add_node(node,
+                            type='user',
+                            name=user.name,
+                            label=user.name or f"User {user.user_id}")
+        self._users_by_node[node] = user
+        self.version += 1
+        return True
+
+    def follow_user(self, user):
+        """Adds a user with their posts so far, and their future posts as they are made."""
+        self.add_user(user)
+        user.post_listeners.append(self.add_post)
+        for post in user.authored_posts:
+            self.add_post(post)
+
+    def add_post(self, post):
+        """Adds a post node, its authorship edge and its viewers, and follows its changes."""
+        if post in self._nodes:
+            return False
+        node = self._nodes[post] = post_node(len(self._nodes))
+        self._posts[node] = post
+        self._comments[node] = len(post.comments)
+        self.add_user(post.creator)
+        if self.threads is not None:
+            self.threads.add_post(post)
+        self.graph.add_node(node,
+                            type='post',
+                            content=post.content,
+                            importance=self._importance(post),
+                            label=post.content[:20] + "...")  # Truncated content as label
+        self.graph.add_edge(user_node(post.creator), node,
+                            relation='authored',
+                            weight=2)  # Higher weight for authorship
+        self.version += 1
+        for viewer in post.seen_by:
+            self._add_viewer(node, viewer)
+        post.view_listeners.append(self._on_view)
+        post.comment_listeners.append(self._on_comment)
+        if self.threads is not None:
+            # A reply can change the importance of the posts above it
+            for ancestor in self.threads.ancestors(post):
+                if ancestor in self._nodes:
+                    self.graph.nodes[self._nodes[ancestor]]['importance'] = self._importance(ancestor)
+        return True
+
+    def _add_viewer(self, node, viewer):
+        self.add_user(viewer)
+        viewer_node = user_node(viewer)
+        if not self.graph.has_edge(viewer_node, node):  # Keeps the authorship edge of a creator's own view
+            self.graph.add_edge(viewer_node, node,
+                                relation='viewed',
+                                weight=1)  # Lower weight for views
+            self.version += 1
+
+    def _on_view(self, post, user, time):
+        node = self._nodes[post]
+        self._add_viewer(node, user)
+        self.graph.nodes[node]['importance'] = self._importance(post)
+
+    def _on_comment(self, post, comment, time):
+        node = self._nodes[post]
+        self._comments[node] = len(post.comments)
+        self.graph.nodes[node]['importance'] = self._importance(post)
+
+    def user(self, node):
+        """Returns the User behind a user node."""
+        return self._users_by_node[node]
+
+    def post(self, node):
+        """Returns the Post behind a post node."""
+        return self._posts[node]
+
+    def node(self, post):
+        """Returns the node of a post in the graph, or None."""
+        return self._nodes.get(post)
+
+    def _importance(self, post):
+        return self.importance(post, self.criteria) if self.criteria is not None else 0
+
+    def update_post(self, post):
+        """Applies views and comments made on a post without its mutators."""
+        node = self._nodes.get(post)
+        if node is None:
+            return self.add_post(post)
+        version = self.version
+        for viewer in post.seen_by:
+            self._add_viewer(node, viewer)
+        if version != self.version or self._comments[node] != len(post.comments):
+            self._comments[node] = len(post.comments)
+            self.graph.nodes[node]['importance'] = self._importance(post)
+
+    def set_importance(self, criteria):
+        """Recomputes the importance attribute, only if the criteria changed."""
+        if criteria == self.criteria:
+            return
+        self.criteria = criteria
+        nodes = self.graph.nodes
+        for node, post in self._posts.items():
+            nodes[node]['importance'] = self._importance(post)
+
+    def sync(self):
+        """Follows the users appended to the users list since the last call.
+
+        Everything else reaches the graph through the listeners, so this
+        does not walk the users already followed or their posts.
+        """
+        for user in islice(self.users, self._user_count, None):
+            self.follow_user(user)
+        self._user_count = len(self.users)
+        return self.graph
@@ -0,0 +1,123 @@
+import heapq
+
+import networkx as nx
+
+from graph_cache import user_node
+
+OTHER = "cluster_other"  # Supernode for whatever does not fit in max_clusters
+
+
+def user_clusters(projection):
+    """Groups the user nodes of a projection by connected component of their connections.
+
+    Connections are treated as undirected. Returns {user node: cluster id},
+    where the cluster id is "cluster_" followed by its first user node.
+    """
+    users = {node: projection.user(node) for node, data in projection.graph.nodes(data=True)
+             if data['type'] == 'user'}
+    neighbours = {node: [] for node in users}
+    for node, user in users.items():
+        for conn in user.connections:
+            other = user_node(conn["user"])
+            if other in neighbours and other != node:
+                neighbours[node].append(other)
+                neighbours[other].append(node)
+    clusters = {}
+    for start in users:
+        if start in clusters:
+            continue
+        cluster = f"cluster_{start}"
+        clusters[start] = cluster
+        stack = [start]
+        while stack:
+            for other in neighbours[stack.pop()]:
+                if other not in clusters:
+                    clusters[other] = cluster
+                    stack.append(other)
+    return clusters
+
+
+class LevelOfDetail:
+    """Bounded-size summary of a GraphProjection for rendering large networks.
+
+    Only the max_nodes most important nodes are drawn individually: half of
+    the budget goes to the posts with the highest importance and half to the
+    users with the most (weighted) interactions. Everything else collapses
+    into one supernode per user cluster (a post belongs to its creator's
+    cluster), at most max_clusters of them plus a catch-all, and the edges
+    between collapsed nodes are merged, summing their weights. Clusters
+    passed in expanded are drawn node by node instead.
+    """
+    def __init__(self, projection, max_nodes=300, max_clusters=20):
+        self.projection = projection
+        self.max_nodes = max_nodes
+        self.max_clusters = max_clusters
+
+    def _kept_nodes(self):
+        graph = self.projection.graph
+        posts = []
+        users = []
+        for node, data in graph.nodes(data=True):
+            if data['type'] == 'post':
+                posts.append((data.get('importance', 0), graph.degree(node), node))
+            else:
+                users.append((graph.degree(node, weight='weight'), node))
+        kept = {node for *_, node in heapq.nlargest(self.max_nodes // 2, posts)}
+        kept.update(node for _, node in heapq.nlargest(self.max_nodes - len(kept), users))
+        return kept
+
+    def _groups(self):
+        """Returns {node: cluster id} for every node, with small clusters merged into OTHER."""
+        graph = self.projection.graph
+        clusters = user_clusters(self.projection)
+        for node, data in graph.nodes(data=True):
+            if data['type'] == 'post':
+                clusters[node] = clusters[user_node(self.projection.post(node).creator)]
+        sizes = {}
+        for cluster in clusters.values():
+            sizes[cluster] = sizes.get(cluster, 0) + 1
+        largest = set(heapq.nlargest(self.max_clusters, sizes, key=sizes.get))
+        return {node: cluster if cluster in largest else OTHER for node, cluster in clusters.items()}
+
+    def summary(self, expanded=()):
+        """Returns an nx.Graph with at most max_nodes nodes plus the cluster supernodes.
+
+        Supernodes have type 'cluster', the number of users and posts they
+        stand for, and a label; merged edges carry the summed weight and the
+        number of original edges in "count". Pass cluster ids (supernode
+        names) in expanded to show those clusters in full.
+        """
+        graph = self.projection.graph
+        expanded = set(expanded)
+        kept = self._kept_nodes()
+        groups = self._groups()
+
+        summary = nx.Graph()
+        mapping = {}
+        for node, data in graph.nodes(data=True):
+            group = groups[node]
+            if node in kept or group in expanded:
+                mapping[node] = node
+                summary.add_node(node, **data)
+                continue
+            mapping[node] = group
+            if group not in summary:
+                summary.add_node(group, type='cluster', users=0, posts=0)
+            summary.nodes[group]['users' if data['type'] == 'user' else 'posts'] += 1
+
+        for group, data in summary.nodes(data=True):
+            if data['type'] == 'cluster':
+                data['label'] = f"{data['users']} users, {data['posts']} posts"
+
+        for u, v, data in graph.edges(data=True):
+            a, b = mapping[u], mapping[v]
+            if a == b:
+                continue
+            weight = data.get('weight', 1)
+            if summary.has_edge(a, b):
+                edge = summary.edges[a, b]
+                edge['weight'] += weight
+                edge['count'] += 1
+            else:
+                summary.add_edge(a, b, relation=data.get('relation'), weight=weight, count=1)
+        return summary
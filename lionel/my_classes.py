@@ -1,3 +1,95 @@
+class OrderedSet:
+    """Insertion-ordered set backed by a dict: O(1) add and membership."""
+    __slots__ = ("_items",)
+
+    def __init__(self, items=()):
+        self._items = dict.fromkeys(items)
+
+    def add(self, item):
+        """Adds an item; returns False if it was already present."""
+        if item in self._items:
+            return False
+        self._items[item] = None
+        return True
+
+    append = add  # Lets code written for lists keep working
+
+    def update(self, items):
+        """Adds many items; returns how many were new."""
+        before = len(self._items)
+        self._items.update(dict.fromkeys(items))
+        return len(self._items) - before
+
+    def discard(self, item):
+        self._items.pop(item, None)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"OrderedSet({list(self._items)!r})"
+
+class ConnectionSet:
+    """Ordered, de-duplicated {"type", "user"} connection dicts keyed by (type, user).
+
+    Connections are also indexed by type, so the neighbours of one type and
+    the per-type counts are available without scanning every connection.
+    """
+    __slots__ = ("_connections", "_by_type")
+
+    def __init__(self):
+        self._connections = {}
+        self._by_type = {}  # type -> {user: connection dict}
+
+    def add(self, connection_type, connected_user):
+        """Adds a connection; returns False if it already existed."""
+        key = (connection_type, connected_user)
+        if key in self._connections:
+            return False
+        connection = {"type": connection_type, "user": connected_user}
+        self._connections[key] = connection
+        self._by_type.setdefault(connection_type, {})[connected_user] = connection
+        return True
+
+    def append(self, connection):
+        """Adds a {"type", "user"} dict, as code written for lists expects."""
+        return self.add(connection["type"], connection["user"])
+
+    def of_type(self, connection_type):
+        """Returns the connection dicts of one type."""
+        return list(self._by_type.get(connection_type, {}).values())
+
+    def users(self, connection_type=None):
+        """Returns the connected users, optionally of one type only."""
+        if connection_type is None:
+            return [connected_user for _, connected_user in self._connections]
+        return list(self._by_type.get(connection_type, {}))
+
+    def count(self, connection_type=None):
+        """Returns the number of connections, optionally of one type only."""
+        if connection_type is None:
+            return len(self._connections)
+        return len(self._by_type.get(connection_type, ()))
+
+    def counts(self):
+        """Returns a {type: count} dict."""
+        return {connection_type: len(users) for connection_type, users in self._by_type.items()}
+
+    def __contains__(self, connection):
+        return (connection["type"], connection["user"]) in self._connections
+
+    def __iter__(self):
+        return iter(self._connections.values())
+
+    def __len__(self):
+        return len(self._connections)
+
 class User:
     def __init__(self, user_id, name=None, gender=None, age=None, country=None, region=None):
         self.user_id = user_id
@@ -6,29 +98,25 @@ class User:
         self.age = age
         self.country = country
         self.region = region
-        self.connections = []  # List of other User objects representing connections
+        self.connections = ConnectionSet()  # Connections to other User objects
         self.authored_posts = []  # List of Post objects authored by the user
-        self.read_posts = []  # List of Post objects read by the user
+        self.read_posts = OrderedSet()  # Post objects read by the user
         self.comments = []  # List of strings representing comments made by the user
+        self.post_listeners = []  # Called with each new Post by the user, e.g. by a SocialNetworkVisualizer
 
     def add_connection(self, connection_type, connected_user):
         """Adds a connection to another user."""
-        self.connections.append({
-            "type": connection_type,
-            "user": connected_user
-        })
-        self.connections.sort()
+        self.connections.add(connection_type, connected_user)
 
     def connections_by_type(self, connection_type=None):
         """Returns connections filtered by type if specified."""
         if connection_type is None:
-            return self.connections
-        return [conn for conn in self.connections if conn["type"] == connection_type]
+            return list(self.connections)
+        return self.connections.of_type(connection_type)
 
     def add_read_post(self, post):
         """Adds a post to the list of read posts."""
-        if post not in self.read_posts:
-            self.read_posts.append(post)
+        if self.read_posts.add(post):
             post.add_view(self)
 
 class Post:
@@ -37,20 +125,38 @@ class Post:
         self.content = content  # String representing the post's text
         self.responding_to = responding_to  # Post object this post responds to
         self.time_and_date = time_and_date  # Time and date of creation
-        self.seen_by = []  # List of User objects who have seen the post
+        self.seen_by = OrderedSet()  # User objects who have seen the post
         self.comments = []  # List of comments on the post
+        self.replies = []  # Post objects responding to this post
+        self.view_listeners = []  # Called with (post, user, time) for each new viewer, e.g. by an AudienceIndex
+        self.comment_listeners = []  # Called with (post, comment, time) for each comment
         
         # Add this post to creator's authored posts
         creator.authored_posts.append(self)
+        if responding_to is not None:
+            responding_to.replies.append(self)
+        for listener in creator.post_listeners:
+            listener(self)
+
+    def add_view(self, user, time=None):
+        """Adds a user's view to the post; returns False if they had already seen it."""
+        if not self.seen_by.add(user):
+            return False
+        for listener in self.view_listeners:
+            listener(self, user, time)
+        return True
 
-    def add_view(self, user):
-        """Adds a user's view to the post."""
-        if user not in self.seen_by:
-            self.seen_by.append(user)
+    def add_views(self, users, time=None):
+        """Adds many users' views at once; returns the number of new viewers."""
+        if not self.view_listeners:
+            return self.seen_by.update(users)
+        return sum(self.add_view(user, time) for user in users)
 
-    def add_comment(self, comment):
+    def add_comment(self, comment, time=None):
         """Adds a comment to the post."""
         self.comments.append(comment)
+        for listener in self.comment_listeners:
+            listener(self, comment, time)
 
     def seen_by_age(self, min_age, max_age):
         """Returns list of users who have seen the post within the age range."""
@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+
+from audience import DEFAULT_AGE_EDGES, AudienceIndex
+from my_classes import User, Post
+
+
+def expected_breakdown(posts, locations, by="country"):
+    counts = np.zeros((len(posts), len(DEFAULT_AGE_EDGES) - 1, len(locations)), dtype=np.int64)
+    for i, post in enumerate(posts):
+        for user in post.seen_by:
+            if user.age is None:
+                continue
+            band = np.searchsorted(DEFAULT_AGE_EDGES, user.age, side="right") - 1
+            if 0 <= band < len(DEFAULT_AGE_EDGES) - 1:
+                counts[i, band, locations.index(getattr(user, by))] += 1
+    return counts
+
+
+def test_breakdown_follows_new_users_and_views():
+    rng = random.Random(0)
+    users = [User(i, age=rng.choice([None, 15, 30, 70]), country=rng.choice(["US", "FR"]),
+                  region=rng.choice(["north", "south"])) for i in range(30)]
+    posts = [Post(rng.choice(users), f"post {i}") for i in range(20)]
+    for _ in range(100):
+        rng.choice(users).add_read_post(rng.choice(posts))
+    index = AudienceIndex(users)
+    counts, locations = index.breakdown(posts)
+    assert (counts == expected_breakdown(posts, locations)).all()
+
+    for i in range(200):
+        if i % 10 == 0:
+            user = User(100 + i, age=40, country=rng.choice(["US", "DE", "JP"]), region="east")
+            index.add_user(user)
+            users.append(user)
+        rng.choice(users).add_read_post(rng.choice(posts))
+    counts, locations = index.breakdown(posts)
+    assert set(locations) == {"US", "FR", "DE", "JP"}
+    assert (counts == expected_breakdown(posts, locations)).all()
+    assert index.breakdown(posts, per_post=False)[0].tolist() == counts.sum(axis=0).tolist()
+    assert len(index.ages) == len(users) and len(index.codes["region"]) == len(users)
+    assert [index.viewers[post].size for post in posts] == [len(post.seen_by) for post in posts]
+
+
+def test_viewers_unknown_to_the_index_are_added():
+    alice, bob = User(1, age=20, country="US"), User(2, age=30, country="FR")
+    post = Post(alice, "hello")
+    index = AudienceIndex([alice])
+    assert index.breakdown([post])[0].sum() == 0
+    post.add_view(bob)
+    post.add_view(bob)
+    counts, locations = index.breakdown([post], by="country")
+    assert locations == ["US", "FR"] and counts.tolist() == [[[0] * 2, [0] * 2, [0, 1], [0] * 2, [0] * 2, [0] * 2]]
+    assert index.breakdown([])[0].shape == (0, len(DEFAULT_AGE_EDGES) - 1, 2)
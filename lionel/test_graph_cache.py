@@ -0,0 +1,92 @@
+import random
+
+import networkx as nx
+
+from columnar import ColumnarStore
+from graph_cache import GraphProjection
+from my_classes import User, Post
+
+
+def importance(post, criteria):
+    return len(post.seen_by) * 100 + len(post.comments)
+
+
+def described(projection):
+    """The graph with post nodes named by content, so projections can be compared."""
+    names = {node: projection.post(node).content for node in projection.graph
+             if projection.graph.nodes[node]['type'] == 'post'}
+    return nx.relabel_nodes(projection.graph, names)
+
+
+def assert_same_graph(projection, users):
+    fresh = GraphProjection(users, importance)
+    fresh.sync()
+    fresh.set_importance('views')
+    first, second = described(projection), described(fresh)
+    assert dict(first.nodes(data=True)) == dict(second.nodes(data=True))
+    assert {frozenset(edge): data for *edge, data in first.edges(data=True)} == \
+        {frozenset(edge): data for *edge, data in second.edges(data=True)}
+
+
+class CountingList(list):
+    """List that counts how often it is iterated from the start."""
+    walks = 0
+
+    def __iter__(self):
+        CountingList.walks += 1
+        return super().__iter__()
+
+
+def test_projection_follows_mutators_without_walking_the_users():
+    rng = random.Random(0)
+    users = [User(i, f"user{i}") for i in range(10)]
+    posts = [Post(rng.choice(users), f"post {i}") for i in range(10)]
+    projection = GraphProjection(users, importance)
+    projection.sync()
+    projection.set_importance('views')
+    for user in users:
+        user.authored_posts = CountingList(user.authored_posts)
+
+    for i in range(300):
+        action = rng.random()
+        if action < 0.2:
+            posts.append(Post(rng.choice(users), f"new post {i}", rng.choice(posts)))
+        elif action < 0.7:
+            rng.choice(users).add_read_post(rng.choice(posts))
+        elif action < 0.9:
+            rng.choice(posts).add_comment(f"comment {i}")
+        else:
+            users.append(User(100 + i, f"late{i}"))
+            Post(users[-1], f"late post {i}")
+        version = projection.version
+        projection.sync()
+        assert projection.version >= version
+    assert CountingList.walks == 0
+    assert_same_graph(projection, users)
+
+
+def test_changes_made_without_mutators_need_update_post():
+    alice, bob = User(1, "Alice"), User(2, "Bob")
+    post = Post(alice, "hello")
+    projection = GraphProjection([alice, bob], importance)
+    projection.sync()
+    projection.set_importance('views')
+    post.seen_by.add(bob)
+    post.comments.append("direct")
+    projection.update_post(post)
+    assert_same_graph(projection, [alice, bob])
+
+
+def test_columnar_views_of_the_same_post_share_a_node():
+    store = ColumnarStore()
+    for user_id in range(3):
+        store.add_user(user_id, f"user{user_id}")
+    projection = GraphProjection(store.users(), importance)
+    projection.sync()
+    projection.set_importance('views')
+    post = store.get_user(0).make_post("columnar")
+    store.get_user(1).add_read_post(store.post(0))
+    store.post(0).add_comment("nice")
+    assert projection.node(store.post(0)) == projection.node(post) is not None
+    assert projection.graph.nodes[projection.node(post)]['importance'] == 101
+    assert_same_graph(projection, store.users())
@@ -0,0 +1,32 @@
+import networkx as nx
+import numpy as np
+
+from layout_cache import LayoutCache, multilevel_layout
+
+
+def test_layouts_are_reused_and_warm_started():
+    graph = nx.path_graph(30)
+    cache = LayoutCache(seed=0)
+    first = cache.layout(graph, 1)
+    assert cache.layout(graph, 1) is first
+    graph.add_edge(29, 30)
+    second = cache.layout(graph, 2)
+    assert set(second) == set(graph)
+    moved = [np.linalg.norm(second[node] - first[node]) for node in first]
+    assert max(moved) < 1  # Warm start keeps the picture roughly in place
+    assert set(cache.layout(graph, 2, "circular")) == set(graph)
+    assert cache.layout(graph, 2) is second  # Other methods are cached separately
+
+
+def test_large_graphs_use_the_multilevel_layout():
+    graph = nx.barabasi_albert_graph(1500, 2, seed=0)
+    pos = multilevel_layout(graph, seed=0, coarsest_size=100)
+    assert set(pos) == set(graph)
+    points = np.array(list(pos.values()))
+    assert np.isfinite(points).all() and np.abs(points).max() <= 1 + 1e-9
+    cache = LayoutCache(seed=0, fast_threshold=1000)
+    first = cache.layout(graph, 1)
+    graph.add_edge(0, 1500)
+    second = cache.layout(graph, 2)
+    assert all((second[node] == first[node]).all() for node in first)  # Only the new node is placed
+    assert 1500 in second
@@ -0,0 +1,43 @@
+import random
+
+from graph_cache import GraphProjection
+from level_of_detail import LevelOfDetail
+from my_classes import User, Post
+
+
+def projection(seed=0):
+    rng = random.Random(seed)
+    users = [User(i, f"user{i}") for i in range(60)]
+    for _ in range(40):
+        rng.choice(users).add_connection("friend", rng.choice(users))
+    posts = [Post(rng.choice(users), f"post {i}") for i in range(80)]
+    for _ in range(200):
+        rng.choice(users).add_read_post(rng.choice(posts))
+    result = GraphProjection(users, lambda post, criteria: len(post.seen_by))
+    result.sync()
+    result.set_importance('views')
+    return result
+
+
+def test_summary_is_bounded_and_accounts_for_every_node():
+    full = projection()
+    summary = LevelOfDetail(full, max_nodes=30, max_clusters=5).summary()
+    clusters = [data for _, data in summary.nodes(data=True) if data['type'] == 'cluster']
+    kept = [node for node, data in summary.nodes(data=True) if data['type'] != 'cluster']
+    assert len(kept) <= 30 and len(clusters) <= 6
+    assert len(kept) + sum(data['users'] + data['posts'] for data in clusters) == len(full.graph)
+    merged = sum(data['count'] for *_, data in summary.edges(data=True))
+    assert merged <= full.graph.number_of_edges()
+    assert all(summary.nodes[node] == full.graph.nodes[node] for node in kept)
+
+
+def test_expanded_clusters_are_drawn_in_full():
+    full = projection(1)
+    lod = LevelOfDetail(full, max_nodes=10, max_clusters=3)
+    summary = lod.summary()
+    cluster = max((node for node, data in summary.nodes(data=True) if data['type'] == 'cluster'),
+                  key=lambda node: summary.nodes[node]['users'] + summary.nodes[node]['posts'])
+    size = summary.nodes[cluster]['users'] + summary.nodes[cluster]['posts']
+    expanded = lod.summary([cluster])
+    assert cluster not in expanded
+    assert len(expanded) == len(summary) - 1 + size
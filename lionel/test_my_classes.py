@@ -0,0 +1,32 @@
+import random
+
+from my_classes import User, Post
+
+
+def test_connections_by_type_answers_from_the_type_index():
+    rng = random.Random(0)
+    users = [User(i) for i in range(10)]
+    for _ in range(60):
+        rng.choice(users).add_connection(rng.choice(["friend", "follows", "blocks"]), rng.choice(users))
+    for user in users:
+        everything = user.connections_by_type()
+        assert isinstance(everything, list) and len(everything) == len(user.connections)
+        for connection_type in ("friend", "follows", "blocks", "unknown"):
+            expected = [conn for conn in everything if conn["type"] == connection_type]
+            assert user.connections_by_type(connection_type) == expected
+            assert user.connections.users(connection_type) == [conn["user"] for conn in expected]
+            assert user.connections.count(connection_type) == len(expected)
+        assert isinstance(user.connections.users(), list)
+
+
+def test_views_and_comments_reach_the_listeners():
+    alice, bob = User(1), User(2)
+    post = Post(alice, "hello")
+    events = []
+    post.view_listeners.append(lambda post, user, time: events.append(("view", user.user_id)))
+    post.comment_listeners.append(lambda post, comment, time: events.append(("comment", comment)))
+    bob.add_read_post(post)
+    bob.add_read_post(post)
+    assert post.add_views([alice, bob]) == 1
+    post.add_comment("nice")
+    assert events == [("view", 2), ("view", 1), ("comment", "nice")]
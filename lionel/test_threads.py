@@ -0,0 +1,45 @@
+import heapq
+import random
+
+from my_classes import User, Post
+from threads import ThreadIndex
+from visualizer import SocialNetworkVisualizer
+
+
+def test_statistics_match_a_walk_of_each_thread():
+    rng = random.Random(0)
+    users = [User(i) for i in range(5)]
+    posts = []
+    for _ in range(500):
+        posts.append(Post(rng.choice(users), "post", rng.choice(posts + [None] * 5) if posts else None))
+    index = ThreadIndex(posts)
+    for post in posts:
+        assert index.sizes[post] == len(index.thread(post))
+        assert index.depth(post) == len(list(index.ancestors(post)))
+    roots = [post for post in posts if post.responding_to is None]
+    expected = heapq.nlargest(10, roots, key=lambda post: len(index.thread(post)))
+    assert index.most_discussed(10) == expected
+    assert index.most_discussed(10) == expected  # The heap is left intact
+
+
+def test_visualizers_over_the_same_users_both_follow_new_posts():
+    users = [User(1, "Alice"), User(2, "Bob")]
+    first, second = SocialNetworkVisualizer(users), SocialNetworkVisualizer(users)
+    root = Post(users[0], "root")
+    Post(users[1], "reply", root)
+    quiet = Post(users[1], "quiet")
+    for visualizer in (first, second):
+        assert visualizer.most_discussed(2) == [root, quiet]
+        assert visualizer.threads.reply_count(root) == 1
+
+
+def test_reply_importance_comes_from_the_listener_fed_index():
+    alice = User(1, "Alice")
+    visualizer = SocialNetworkVisualizer([alice])
+    root = Post(alice, "root")
+    Post(alice, "reply", Post(alice, "reply", root))
+    graph = visualizer.create_graph('replies')
+    assert graph.nodes[visualizer.projection.node(root)]['importance'] == 200
+    indexed = len(visualizer.threads.sizes)
+    visualizer.calculate_importance(root, 'replies')
+    assert len(visualizer.threads.sizes) == indexed
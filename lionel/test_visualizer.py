@@ -0,0 +1,39 @@
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from columnar import ColumnarStore
+from visualizer import SocialNetworkVisualizer
+
+
+def columnar_network():
+    store = ColumnarStore()
+    for user_id, name in enumerate(["Alice", "Bob", "Charlie"]):
+        store.add_user(user_id, name)
+    alice, bob, charlie = store.users()
+    root = alice.make_post("Alice's first post about data science")
+    bob.make_post("Bob's thoughts on machine learning")
+    root.add_comment("Great post!")
+    for user in (alice, bob, charlie):
+        user.add_read_post(root)
+        user.add_read_post(root)
+    return store, root
+
+
+def test_visualizer_over_columnar_store(monkeypatch):
+    monkeypatch.setattr(plt, "show", lambda: None)
+    store, root = columnar_network()
+    visualizer = SocialNetworkVisualizer(store.users())
+    reply = store.get_user(2).make_post("Charlie replies", root)  # Reaches the thread index through post_listeners
+    assert visualizer.most_discussed(1) == [root]
+    assert visualizer.threads.reply_count(root) == 1
+
+    graph = visualizer.create_graph('views')
+    posts = {node: data for node, data in graph.nodes(data=True) if data['type'] == 'post'}
+    assert sorted(data['importance'] for data in posts.values()) == [0, 0, 300]  # Repeated reads count once
+    assert graph.number_of_nodes() == 6
+    visualizer.visualize('comments')
+    visualizer.visualize('replies', max_nodes=3)
+    plt.close('all')
+    assert reply.responding_to == root
@@ -0,0 +1,110 @@
+import heapq
+
+
+class ThreadIndex:
+    """Reply threads over Post.responding_to with per-post cached statistics.
+
+    Each indexed post keeps the size of its subtree (itself and all replies
+    below it), its depth (0 for a thread root) and the latest time_and_date
+    in its subtree. Adding a post walks up its parent chain once, so the
+    statistics are O(1) reads and adding is O(depth). A post's direct
+    replies are in Post.replies. Thread roots are also kept in a heap by
+    size whose outdated entries are skipped lazily, so most_discussed does
+    not scan every post.
+    """
+    def __init__(self, posts=()):
+        self.sizes = {}  # post -> number of posts in its subtree
+        self.depths = {}  # post -> replies between it and its thread root
+        self.latest = {}  # post -> latest time_and_date in its subtree
+        self.roots = []  # Thread roots in the order they were indexed
+        self._root_numbers = {}  # root -> position in self.roots
+        self._ranked = []  # (-size, root number, root), may hold outdated entries
+        for post in posts:
+            self.add_post(post)
+
+    def add_post(self, post):
+        """Indexes a new post (and any unindexed posts it responds to)."""
+        if post in self.sizes:
+            return False
+        chain = [post]
+        while chain[-1].responding_to is not None and chain[-1].responding_to not in self.sizes:
+            chain.append(chain[-1].responding_to)
+        for new_post in reversed(chain):  # Parents first, without recursion
+            self._index(new_post)
+        return True
+
+    def _index(self, post):
+        parent = post.responding_to
+        self.sizes[post] = 1
+        self.depths[post] = 0 if parent is None else self.depths[parent] + 1
+        self.latest[post] = post.time_and_date
+        root = post
+        for ancestor in self.ancestors(post):
+            self.sizes[ancestor] += 1
+            if post.time_and_date is not None and (self.latest[ancestor] is None or
+                                                   post.time_and_date > self.latest[ancestor]):
+                self.latest[ancestor] = post.time_and_date
+            root = ancestor
+        if parent is None:
+            self._root_numbers[post] = len(self.roots)
+            self.roots.append(post)
+        self._rank(root)
+
+    def _rank(self, root):
+        """Pushes the new size of a thread root, rebuilding the heap once it is mostly outdated."""
+        heapq.heappush(self._ranked, (-self.sizes[root], self._root_numbers[root], root))
+        if len(self._ranked) > 4 * len(self.roots):
+            self._ranked = [(-self.sizes[root], number, root) for number, root in enumerate(self.roots)]
+            heapq.heapify(self._ranked)
+
+    def ancestors(self, post):
+        """Yields the posts post responds to, from its parent up to the thread root."""
+        parent = post.responding_to
+        while parent is not None:
+            yield parent
+            parent = parent.responding_to
+
+    def root(self, post):
+        """Returns the post that started post's thread."""
+        while post.responding_to is not None:
+            post = post.responding_to
+        return post
+
+    def reply_count(self, post):
+        """Returns the number of replies anywhere below post."""
+        return self.sizes[post] - 1
+
+    def depth(self, post):
+        return self.depths[post]
+
+    def latest_activity(self, post):
+        """Returns the latest time_and_date in post's thread below it (None if unknown)."""
+        return self.latest[post]
+
+    def thread(self, post):
+        """Returns the posts in post's subtree, depth first, without scanning other posts."""
+        result = []
+        stack = [post]
+        while stack:
+            current = stack.pop()
+            result.append(current)
+            stack.extend(reversed(current.replies))
+        return result
+
+    def most_discussed(self, k=10, roots_only=True):
+        """Returns the k posts (thread roots by default) with the most replies.
+
+        Roots come from the heap in O(k log n) (plus the outdated entries it
+        drops); all posts are ranked with a scan.
+        """
+        if not roots_only:
+            return heapq.nlargest(k, self.sizes, key=self.sizes.__getitem__)
+        heap = self._ranked
+        current = []
+        while heap and len(current) < k:
+            entry = heapq.heappop(heap)
+            if -entry[0] == self.sizes[entry[2]]:  # Older entries of a root have a smaller size
+                current.append(entry)
+        for entry in current:
+            heapq.heappush(heap, entry)
+        return [root for _, _, root in current]
@@ -1,49 +1,33 @@
+from itertools import islice
+
 import networkx as nx
 import matplotlib.pyplot as plt
 from my_classes import User, Post
+from graph_cache import GraphProjection
+from layout_cache import LayoutCache
+from level_of_detail import LevelOfDetail
+from threads import ThreadIndex
 
 class SocialNetworkVisualizer:
     def __init__(self, users):
         self.users = users
-        self.G = nx.Graph()
+        self.threads = ThreadIndex()
+        self._hooked = 0  # Users of self.users whose posts feed self.threads
+        self._hook_users()
+        self.projection = GraphProjection(users, self.calculate_importance, self.threads)
+        self.G = self.projection.graph
+        self.layouts = LayoutCache(k=1, iterations=50)
+        self.summary_layouts = LayoutCache(k=1, iterations=50)
     
     def create_graph(self, importance_criteria='comments'):
-        """Creates a graph with users, posts, and interactions."""
-        self.G.clear()  # Clear existing graph
-        
-        # Add users as nodes
-        for user in self.users:
-            self.G.add_node(f"user_{user.user_id}", 
-                           type='user', 
-                           name=user.name,
-                           label=user.name or f"User {user.user_id}")
+        """Creates a graph with users, posts, and interactions.
 
-        # Add posts and their connections
-        for user in self.users:
-            for post in user.authored_posts:
-                post_id = f"post_{id(post)}"  # Unique identifier for post
-                
-                # Calculate importance
-                importance = self.calculate_importance(post, importance_criteria)
-                
-                # Add post node
-                self.G.add_node(post_id,
-                              type='post',
-                              content=post.content,
-                              importance=importance,
-                              label=post.content[:20] + "...")  # Truncated content as label
-                
-                # Add edge from author to post
-                self.G.add_edge(f"user_{user.user_id}", post_id, 
-                              relation='authored',
-                              weight=2)  # Higher weight for authorship
-                
-                # Add edges for viewers
-                for viewer in post.seen_by:
-                    self.G.add_edge(f"user_{viewer.user_id}", post_id,
-                                  relation='viewed',
-                                  weight=1)  # Lower weight for views
-        
+        The graph is kept between calls and only updated with what changed
+        since the last one (see GraphProjection).
+        """
+        self._hook_users()
+        self.projection.sync()
+        self.projection.set_importance(importance_criteria)
         return self.G
 
     def calculate_importance(self, post, criteria):
@@ -54,28 +38,63 @@ class SocialNetworkVisualizer:
             return len(post.seen_by) * 100
         elif criteria == 'combined':
             return (len(post.comments) + len(post.seen_by)) * 50
+        elif criteria == 'replies':
+            return self.threads.reply_count(post) * 100  # Replies anywhere in the thread below the post
         return 0
 
-    def visualize(self, importance_criteria='comments'):
-        """Visualizes the network with highlighted important posts."""
+    def _hook_users(self):
+        """Indexes the posts of users added since the last call and their future posts as they are created."""
+        for user in islice(self.users, self._hooked, None):
+            user.post_listeners.append(self.threads.add_post)
+            for post in user.authored_posts:
+                self.threads.add_post(post)
+        self._hooked = len(self.users)
+
+    def most_discussed(self, k=10):
+        """Returns the k thread-starting posts with the most replies.
+
+        The thread index is fed as posts are created, so this neither syncs
+        the graph nor scans the posts.
+        """
+        self._hook_users()
+        return self.threads.most_discussed(k)
+
+    def visualize(self, importance_criteria='comments', max_nodes=None, expand=()):
+        """Visualizes the network with highlighted important posts.
+
+        With max_nodes, a larger graph is drawn at a lower level of detail:
+        only the max_nodes most important users and posts, with the rest
+        collapsed into cluster supernodes (see LevelOfDetail). Supernode
+        names passed in expand are drawn in full.
+        """
         self.create_graph(importance_criteria)
+        G = self.G
         
-        # Set up the layout
-        pos = nx.spring_layout(self.G, k=1, iterations=50)
+        # Set up the layout (reused while the graph is unchanged)
+        if max_nodes is not None and len(G) > max_nodes:
+            G = LevelOfDetail(self.projection, max_nodes).summary(expand)
+            pos = self.summary_layouts.layout(
+                G, (self.projection.version, importance_criteria, max_nodes, frozenset(expand)))
+        else:
+            pos = self.layouts.layout(G, self.projection.version)
         
         # Prepare node attributes
         node_sizes = []
         node_colors = []
         labels = {}
         
-        for node in self.G.nodes():
-            node_data = self.G.nodes[node]
+        for node in G.nodes():
+            node_data = G.nodes[node]
             labels[node] = node_data.get('label', '')
             
             if node_data['type'] == 'post':
                 importance = node_data.get('importance', 0)
                 node_sizes.append(1000 + importance)  # Base size + importance
                 node_colors.append('lightblue')
+            elif node_data['type'] == 'cluster':
+                members = node_data['users'] + node_data['posts']
+                node_sizes.append(500 + 100 * members ** 0.5)  # Grows with the collapsed nodes
+                node_colors.append('lightgray')
             else:  # user node
                 node_sizes.append(500)  # Fixed size for users
                 node_colors.append('lightgreen')
@@ -83,16 +102,17 @@ class SocialNetworkVisualizer:
         # Create the visualization
         plt.figure(figsize=(12, 8))
         
-        # Draw edges
-        nx.draw_networkx_edges(self.G, pos, alpha=0.2)
+        # Draw edges (merged edges get thicker with the number they stand for)
+        widths = [1 + 0.5 * (data.get('count', 1) - 1) ** 0.5 for _, _, data in G.edges(data=True)]
+        nx.draw_networkx_edges(G, pos, alpha=0.2, width=widths)
         
         # Draw nodes
-        nx.draw_networkx_nodes(self.G, pos, 
+        nx.draw_networkx_nodes(G, pos, 
                              node_size=node_sizes,
                              node_color=node_colors)
         
         # Draw labels
-        nx.draw_networkx_labels(self.G, pos, labels, font_size=8)
+        nx.draw_networkx_labels(G, pos, labels, font_size=8)
         
         plt.title(f"Social Network Visualization\nPost Importance by {importance_criteria.capitalize()}")
         plt.axis('off')
@@ -0,0 +1,68 @@
+from word_frequency import tokenize
+
+
+class InvertedIndex:
+    """Inverted index from word to the posts containing it.
+
+    Posts are tokenized the same way as for the word cloud and get an
+    internal document number, so each posting list is a set of small ints.
+    Posts are keyed by the Post itself, so views that compare equal (such as
+    columnar.Post) are found again. watch(users) indexes the posts those
+    users make from then on; other new posts need an add_post call.
+    """
+    def __init__(self, posts=()):
+        self.posts = []  # document number -> Post
+        self.documents = {}  # Post -> document number
+        self.postings = {}  # word -> set of document numbers
+        for post in posts:
+            self.add_post(post)
+
+    def watch(self, users):
+        """Indexes every post the users create with make_post as it is created."""
+        for user in users:
+            user.post_listeners.append(self.add_post)
+
+    def add_post(self, post):
+        """Indexes a post; posts already indexed are ignored."""
+        if post in self.documents:
+            return
+        document = len(self.posts)
+        self.posts.append(post)
+        self.documents[post] = document
+        for word in set(tokenize(post.content)):
+            self.postings.setdefault(word, set()).add(document)
+
+    def matching(self, keyword):
+        """Returns the document numbers containing every word of keyword."""
+        words = tokenize(keyword)
+        if not words:
+            return set()
+        postings = sorted((self.postings.get(word, set()) for word in words), key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def query(self, all_of=(), any_of=(), none_of=(), within=None):
+        """Returns the posts matching every all_of keyword, at least one any_of
+        keyword (if given) and no none_of keyword, in the order they were added.
+
+        Keywords match whole words; a keyword of several words matches posts
+        containing all of them. With within (any iterable of posts, used as
+        is if it is a set), only the matching posts that are also in it are
+        returned; the matches are checked against it, so it is not scanned.
+        """
+        documents = None
+        for matches in sorted((self.matching(keyword) for keyword in all_of), key=len):
+            documents = matches if documents is None else documents & matches
+            if not documents:
+                return []
+        if any_of:
+            matches = set().union(*(self.matching(keyword) for keyword in any_of))
+            documents = matches if documents is None else documents & matches
+        if documents is None:
+            documents = set(range(len(self.posts)))
+        for keyword in none_of:
+            documents -= self.matching(keyword)
+        posts = [self.posts[document] for document in sorted(documents)]
+        if within is not None:
+            allowed = within if isinstance(within, (set, frozenset)) else set(within)
+            posts = [post for post in posts if post in allowed]
+        return posts
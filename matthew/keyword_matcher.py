@@ -0,0 +1,116 @@
+from collections import deque
+from functools import lru_cache
+
+INCLUDE = 1
+EXCLUDE = 2
+SMALL_KEYWORD_SET = 8  # Up to this many substring keywords, str.__contains__ is faster
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton matching many keywords in one pass over a text.
+
+    Each keyword carries a flag (INCLUDE or EXCLUDE), so an include list and
+    an exclude list are checked together. In whole_words mode a keyword only
+    matches when it is not part of a longer word.
+    """
+    def __init__(self, keywords, whole_words=False):
+        self.whole_words = whole_words
+        self.goto = [{}]  # state -> {character: next state}
+        self.fail = [0]
+        self.output = [[]]  # state -> [(keyword length, flag)] ending here
+        for keyword, flag in keywords:
+            self._add(keyword, flag)
+        self._build()
+
+    def _add(self, keyword, flag):
+        state = 0
+        for character in keyword:
+            next_state = self.goto[state].get(character)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][character] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append((len(keyword), flag))
+
+    def _build(self):
+        """Computes failure links breadth-first and merges their outputs."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and character not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(character, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def _is_word_boundary(self, text, start, end):
+        return ((start == 0 or not _is_word_character(text[start - 1])) and
+                (end == len(text) or not _is_word_character(text[end])))
+
+    def flags(self, text, stop=EXCLUDE):
+        """Returns the OR of the flags of keywords found in text.
+
+        Scanning stops early once every flag in stop has been found.
+        """
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        found = 0
+        state = 0
+        for position, character in enumerate(text):
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            for length, flag in output[state]:
+                if flag & found:
+                    continue
+                if self.whole_words and not self._is_word_boundary(text, position + 1 - length, position + 1):
+                    continue
+                found |= flag
+                if found & stop == stop:
+                    return found
+        return found
+
+
+def _is_word_character(character):
+    return character.isalnum() or character == "_"
+
+
+class KeywordFilter:
+    """Include/exclude keyword filter applied with a single scan per post."""
+    def __init__(self, include_keywords=(), exclude_keywords=(), whole_words=False):
+        self.include_keywords = list(include_keywords)
+        self.exclude_keywords = list(exclude_keywords)
+        self.stop = EXCLUDE if self.exclude_keywords else INCLUDE
+        self.matcher = None
+        if whole_words or len(self.include_keywords) + len(self.exclude_keywords) > SMALL_KEYWORD_SET:
+            self.matcher = KeywordMatcher(
+                [(keyword, INCLUDE) for keyword in self.include_keywords] +
+                [(keyword, EXCLUDE) for keyword in self.exclude_keywords],
+                whole_words)
+
+    def accepts(self, content):
+        """Returns True if content has an include keyword (if any) and no exclude keyword."""
+        if self.matcher is None:
+            if self.include_keywords and not any(keyword in content for keyword in self.include_keywords):
+                return False
+            return not any(keyword in content for keyword in self.exclude_keywords)
+        found = self.matcher.flags(content, stop=self.stop)
+        if found & EXCLUDE:
+            return False
+        return not self.include_keywords or bool(found & INCLUDE)
+
+
+@lru_cache(maxsize=64)
+def _cached_filter(include_keywords, exclude_keywords, whole_words):
+    return KeywordFilter(sorted(include_keywords), sorted(exclude_keywords), whole_words)
+
+
+def compile_filter(include_keywords=(), exclude_keywords=(), whole_words=False):
+    """Returns a KeywordFilter, reusing the automaton for a keyword set seen before."""
+    return _cached_filter(frozenset(include_keywords), frozenset(exclude_keywords), whole_words)
@@ -0,0 +1,202 @@
+import heapq
+import math
+from array import array
+from hashlib import blake2b
+from itertools import count
+
+from word_frequency import tokenize
+
+
+def post_key(post):
+    """Returns a key for post that stays the same across processes and after it is freed.
+
+    Saved posts are identified by post_id, others by creator, time and content.
+    """
+    post_id = getattr(post, "post_id", None)
+    if post_id is not None:
+        return post_id
+    return (getattr(post.creator, "user_id", None), str(post.time_and_date), post.content)
+
+
+def _hashes(key):
+    """Returns two independent 64-bit hashes of key, stable across processes."""
+    digest = blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+class CountMinSketch:
+    """Approximate counts in fixed memory.
+
+    Estimates never undercount and overcount by at most epsilon * total
+    with probability 1 - delta. Rows are indexed with double hashing, so each
+    update costs one hash computation.
+    """
+    def __init__(self, epsilon=0.001, delta=0.01):
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = array('d', bytes(8 * self.width * self.depth))
+        self.total = 0
+
+    def _cells(self, key):
+        h1, h2 = _hashes(key)
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, weight=1):
+        table = self.table
+        for cell in self._cells(key):
+            table[cell] += weight
+        self.total += weight
+
+    def estimate(self, key):
+        table = self.table
+        return min(table[cell] for cell in self._cells(key))
+
+
+class HyperLogLog:
+    """Approximate number of distinct items.
+
+    The relative standard error is about `error`. Registers start as a sparse
+    dict and switch to a dense bytearray once that becomes smaller, so the
+    many posts with few viewers stay cheap.
+    """
+    def __init__(self, error=0.02):
+        self.precision = max(4, math.ceil(math.log2((1.04 / error) ** 2)))
+        self.m = 1 << self.precision
+        self.registers = {}  # sparse: index -> rank, replaced by a bytearray when dense
+
+    def add(self, item):
+        h1, _ = _hashes(item)
+        index = h1 >> (64 - self.precision)
+        rest = h1 & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        registers = self.registers
+        if isinstance(registers, dict):
+            if rank > registers.get(index, 0):
+                registers[index] = rank
+                if len(registers) > self.m // 16:
+                    dense = bytearray(self.m)
+                    for i, r in registers.items():
+                        dense[i] = r
+                    self.registers = dense
+        elif rank > registers[index]:
+            registers[index] = rank
+
+    def count(self):
+        m = self.m
+        registers = self.registers
+        values = registers.values() if isinstance(registers, dict) else registers
+        zeros = m - sum(1 for rank in values if rank)
+        harmonic = zeros + sum(2.0 ** -rank for rank in values if rank)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / harmonic
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return round(estimate)
+
+
+class SpaceSaving:
+    """Heavy hitters in fixed memory (Space-Saving algorithm).
+
+    Tracks at most `capacity` keys; any key whose true count exceeds
+    total / capacity is guaranteed to be tracked. Each estimate overcounts
+    by at most the recorded error. An item (e.g. the Post behind a key) can
+    be kept with each tracked key and is reported instead of it.
+    """
+    def __init__(self, capacity=100):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.counts = {}  # key -> (count, error)
+        self.items = {}  # tracked key -> item given with it
+        self.heap = []  # (count, sequence, key), may hold outdated entries
+        self._sequence = count()
+
+    def add(self, key, weight=1, item=None):
+        counts = self.counts
+        if key in counts:
+            current, error = counts[key]
+            counts[key] = (current + weight, error)
+        elif len(counts) < self.capacity:
+            counts[key] = (weight, 0)
+        else:
+            lowest, lowest_key = self._minimum()
+            del counts[lowest_key]
+            self.items.pop(lowest_key, None)
+            counts[key] = (lowest + weight, lowest)
+        if item is not None:
+            self.items[key] = item
+        heapq.heappush(self.heap, (counts[key][0], next(self._sequence), key))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(c, next(self._sequence), k) for k, (c, _) in counts.items()]
+            heapq.heapify(self.heap)
+
+    def _minimum(self):
+        heap = self.heap
+        while True:
+            current, _, key = heap[0]
+            entry = self.counts.get(key)
+            if entry is not None and entry[0] == current:
+                return current, key
+            heapq.heappop(heap)
+
+    def top(self, k):
+        """Returns up to k (item or key, estimated count) pairs, highest first."""
+        return [(self.items.get(key, key), current) for key, (current, _) in
+                heapq.nlargest(k, self.counts.items(), key=lambda item: item[1][0])]
+
+
+class ApproximateTrending:
+    """Approximate trending statistics in memory that does not grow with traffic.
+
+    Views and comments feed a Count-Min Sketch (per-post counts), a
+    HyperLogLog per post and per tracked keyword (unique viewers), and
+    Space-Saving summaries of the top posts and words. record_view does not
+    touch Post.seen_by, so viewers need not be stored at all. Posts are
+    identified by post_key, so counts survive reloading the network; only
+    the heavy-hitter summary holds on to Post objects, to report them.
+    """
+    def __init__(self, epsilon=0.001, delta=0.01, unique_error=0.05, heavy_hitters=100,
+                 comment_weight=2.0, track_keywords=()):
+        self.counts = CountMinSketch(epsilon, delta)
+        self.unique_error = unique_error
+        self.comment_weight = comment_weight
+        self.viewers = {}  # post_key -> HyperLogLog
+        self.keyword_viewers = {keyword.lower(): HyperLogLog(unique_error) for keyword in track_keywords}
+        self.top_posts = SpaceSaving(heavy_hitters)
+        self.top_words = SpaceSaving(heavy_hitters)
+
+    def record_view(self, post, user):
+        key = post_key(post)
+        self.counts.add(key)
+        self.top_posts.add(key, item=post)
+        if key not in self.viewers:
+            self.viewers[key] = HyperLogLog(self.unique_error)
+        self.viewers[key].add(user.user_id)
+        for word in set(tokenize(post.content)):
+            self.top_words.add(word)
+            if word in self.keyword_viewers:
+                self.keyword_viewers[word].add(user.user_id)
+
+    def record_comment(self, post, comment=None):
+        key = post_key(post)
+        self.counts.add(key, self.comment_weight)
+        self.top_posts.add(key, self.comment_weight, post)
+
+    def score(self, post, now=None):
+        """Estimated views plus weighted comments (same interface as TrendingCounters.score)."""
+        return self.counts.estimate(post_key(post))
+
+    def unique_viewers(self, post):
+        hll = self.viewers.get(post_key(post))
+        return hll.count() if hll else 0
+
+    def unique_keyword_viewers(self, keyword):
+        return self.keyword_viewers[keyword.lower()].count()
+
+    def trending_posts(self, k=10):
+        """Returns up to k (Post, estimated score) pairs, like TrendingEngine ranks posts."""
+        return self.top_posts.top(k)
+
+    def trending_words(self, k=10):
+        """Returns up to k (word, estimated views) pairs."""
+        return self.top_words.top(k)
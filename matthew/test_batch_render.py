@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+from batch_render import render_wordclouds
+from classes import User, Post
+from word_rollups import FrequencyAggregator
+
+
+def test_word_clouds_are_written_in_process_and_in_a_pool(tmp_path):
+    time = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    aggregator = FrequencyAggregator()
+    for i, country in enumerate(["US", "FR", "US"]):
+        aggregator.add_post(Post(User(i, country=country, age=30), "cats dogs cats birds", time_and_date=time))
+    for workers in (1, 2):
+        jobs = [({}, tmp_path / f"all-{workers}.png"), ({"country": "FR"}, tmp_path / f"fr-{workers}.png"),
+                ({"country": "DE"}, tmp_path / f"de-{workers}.png")]
+        results = render_wordclouds(aggregator, jobs, workers=workers)
+        assert [(path, written) for path, _, written in results] == \
+            [(jobs[0][1], True), (jobs[1][1], True), (jobs[2][1], False)]
+        assert jobs[0][1].stat().st_size > 0 and not jobs[2][1].exists()
@@ -0,0 +1,78 @@
+import random
+
+import columnar
+import generate_wordcloud
+from classes import User, Post
+from content_index import InvertedIndex
+from keyword_matcher import compile_filter
+
+WORDS = ["social", "media", "tech", "news", "cats", "dogs", "music", "art"]
+
+
+def random_posts(n, seed=0):
+    rng = random.Random(seed)
+    users = [User(i, country=rng.choice(["US", "FR"])) for i in range(10)]
+    posts = [Post(rng.choice(users), " ".join(rng.choices(WORDS, k=4)) + rng.choice(["", " socialite"]))
+             for _ in range(n)]
+    return users, posts
+
+
+def test_query_matches_whole_word_scan():
+    _, posts = random_posts(300)
+    index = InvertedIndex(posts)
+    rng = random.Random(1)
+    for _ in range(50):
+        include, exclude = set(rng.sample(WORDS, 2)), set(rng.sample(WORDS, 1))
+        keyword_filter = compile_filter(include, exclude, whole_words=True)
+        expected = [post for post in posts if keyword_filter.accepts(post.content.lower())]
+        assert index.query(any_of=include, none_of=exclude) == expected
+
+
+def test_query_within_keeps_only_given_posts():
+    _, posts = random_posts(100)
+    index = InvertedIndex(posts)
+    given = posts[:30]
+    assert index.query(any_of=["cats"], within=given) == [post for post in given if "cats" in post.content.split()]
+    assert index.query(any_of=["cats"], within=iter(given)) == index.query(any_of=["cats"], within=set(given))
+
+
+def test_watch_indexes_new_posts():
+    author = User(1)
+    index = InvertedIndex()
+    index.watch([author])
+    post = author.make_post("breaking tech news")
+    assert index.query(any_of=["tech"]) == [post]
+
+
+def test_wordcloud_with_index_matches_scan(monkeypatch):
+    monkeypatch.setattr(generate_wordcloud, "render_wordcloud", lambda frequencies, output_path=None: frequencies)
+    users, posts = random_posts(200, seed=2)
+    index = InvertedIndex(posts)
+    subset = posts[::3]
+    for include, exclude in ((["tech"], []), (["cats", "art"], ["dogs"]), ([], ["social"])):
+        scanned = generate_wordcloud.generate_wordcloud(users, subset, include, exclude, whole_words=True, workers=1)
+        indexed = generate_wordcloud.generate_wordcloud(users, subset, include, exclude, whole_words=True, workers=1,
+                                                        index=index)
+        assert indexed == scanned
+
+
+def test_wordcloud_with_index_over_columnar_store(monkeypatch):
+    monkeypatch.setattr(generate_wordcloud, "render_wordcloud", lambda frequencies, output_path=None: frequencies)
+    users, posts = random_posts(50, seed=3)
+    store = columnar.ColumnarStore.from_objects(users, posts)
+    index = InvertedIndex(store.posts())
+    # Fresh views of the same rows are found in the index
+    scanned = generate_wordcloud.generate_wordcloud(store.users(), store.posts(), ["tech"], whole_words=True, workers=1)
+    indexed = generate_wordcloud.generate_wordcloud(store.users(), store.posts(), ["tech"], whole_words=True, workers=1,
+                                                    index=index)
+    assert indexed == scanned and indexed
+
+
+def test_index_requires_whole_words():
+    _, posts = random_posts(5)
+    try:
+        generate_wordcloud.generate_wordcloud([], posts, ["tech"], index=InvertedIndex(posts))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("substring keywords accepted with an index")
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from keyword_matcher import SMALL_KEYWORD_SET, KeywordFilter, compile_filter
+
+
+def contains(text, keyword, whole_words):
+    if not whole_words:
+        return keyword in text
+    start = text.find(keyword)
+    while start >= 0:
+        end = start + len(keyword)
+        if (start == 0 or not (text[start - 1].isalnum() or text[start - 1] == "_")) and \
+                (end == len(text) or not (text[end].isalnum() or text[end] == "_")):
+            return True
+        start = text.find(keyword, start + 1)
+    return False
+
+
+def accepts(text, include, exclude, whole_words):
+    if include and not any(contains(text, keyword, whole_words) for keyword in include):
+        return False
+    return not any(contains(text, keyword, whole_words) for keyword in exclude)
+
+
+@pytest.mark.parametrize("whole_words", [False, True])
+@pytest.mark.parametrize("keywords", [2, SMALL_KEYWORD_SET + 4])
+def test_filter_matches_a_naive_scan(whole_words, keywords):
+    rng = random.Random(keywords)
+    alphabet = "ab c_"
+    for _ in range(200):
+        words = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 3))) for _ in range(keywords)]
+        include, exclude = words[:keywords // 2], words[keywords // 2:]
+        keyword_filter = KeywordFilter(include, exclude, whole_words)
+        assert (keyword_filter.matcher is not None) == (whole_words or keywords > SMALL_KEYWORD_SET)
+        for _ in range(20):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 15)))
+            assert keyword_filter.accepts(text) == accepts(text, include, exclude, whole_words), (text, include, exclude)
+
+
+def test_compiled_filters_are_reused():
+    assert compile_filter(["a", "b"], ["c"]) is compile_filter(("b", "a"), {"c"})
+    assert compile_filter(["a"], whole_words=True) is not compile_filter(["a"])
+    assert compile_filter().accepts("anything")
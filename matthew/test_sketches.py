@@ -0,0 +1,74 @@
+import random
+from collections import Counter
+
+from classes import User, Post
+from sketches import ApproximateTrending, CountMinSketch, HyperLogLog, SpaceSaving, post_key
+
+
+def zipf_stream(n, keys, seed=0):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(keys)]
+    return rng.choices(range(keys), weights, k=n)
+
+
+def test_count_min_never_undercounts_and_stays_within_epsilon():
+    sketch = CountMinSketch(epsilon=0.01, delta=0.01)
+    stream = zipf_stream(20000, 2000)
+    for key in stream:
+        sketch.add(key)
+    exact = Counter(stream)
+    errors = [sketch.estimate(key) - count for key, count in exact.items()]
+    assert min(errors) >= 0
+    within = sum(error <= 0.01 * sketch.total for error in errors)
+    assert within >= 0.99 * len(errors)
+
+
+def test_hyperloglog_relative_error():
+    for distinct in (10, 1000, 50000):
+        hll = HyperLogLog(error=0.02)
+        for item in range(distinct):
+            hll.add(("user", item))
+            hll.add(("user", item))  # Repeats do not count
+        assert abs(hll.count() - distinct) <= max(1, 4 * 0.02 * distinct)
+
+
+def test_space_saving_tracks_heavy_hitters():
+    summary = SpaceSaving(capacity=50)
+    stream = zipf_stream(20000, 5000, seed=1)
+    for key in stream:
+        summary.add(key)
+    exact = Counter(stream)
+    for key, count in exact.items():
+        if count > len(stream) / summary.capacity:
+            assert key in summary.counts
+            estimate, error = summary.counts[key]
+            assert estimate - error <= count <= estimate
+
+
+def test_space_saving_rejects_empty_capacity():
+    try:
+        SpaceSaving(capacity=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("capacity=0 accepted")
+
+
+def test_trending_reports_posts_and_keeps_unsaved_posts_apart():
+    author = User(1)
+    viewers = [User(i) for i in range(2, 40)]
+    popular, quiet = Post(author, "popular post"), Post(author, "quiet post")
+    saved = Post(author, "saved post", post_id=7)
+    trending = ApproximateTrending(heavy_hitters=10)
+    for viewer in viewers:
+        trending.record_view(popular, viewer)
+    for viewer in viewers[:3]:
+        trending.record_view(quiet, viewer)
+        trending.record_view(saved, viewer)
+    trending.record_comment(saved)
+
+    assert trending.trending_posts(3) == [(popular, 38), (saved, 5), (quiet, 3)]
+    assert abs(trending.unique_viewers(popular) - 38) <= 4  # HyperLogLog estimate
+    # Keys do not depend on object addresses: a reloaded copy gets the same counts
+    assert trending.score(Post(author, "other", post_id=7)) == 5
+    assert post_key(Post(author, "popular post", time_and_date=popular.time_and_date)) == post_key(popular)
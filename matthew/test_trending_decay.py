@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from classes import User, Post
+from trending_decay import TrendingCounters
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_scores_halve_every_half_life_and_window_forgets():
+    counters = TrendingCounters(half_life=3600, window=3600, post_weight=0)
+    post = Post(User(1), "hello", time_and_date=START, post_id=1)
+    for minute in range(4):
+        counters.record_view(post, START + timedelta(minutes=minute))
+    counters.record_comment(post, START)
+    now = START + timedelta(hours=1)
+    expected = sum(0.5 ** ((60 - minute) / 60) for minute in range(4)) + 2 * 0.5
+    assert counters.score(post, now) == pytest.approx(expected)
+    assert counters.velocity(post, START + timedelta(minutes=5)) == 6
+    assert counters.velocity(post, START + timedelta(hours=3)) == 0
+
+
+def test_reads_do_not_store_counters_and_keys_are_stable():
+    counters = TrendingCounters()
+    author = User(1)
+    post = Post(author, "hello", time_and_date=START, post_id=7)
+    assert counters.score(post, START) == pytest.approx(1.0)  # The post itself
+    assert counters.counters == {}
+    counters.record_view(post, START)
+    reloaded = Post(author, "hello", time_and_date=START, post_id=7)
+    assert counters.score(reloaded, START) == pytest.approx(2.0)
+    assert list(counters.counters) == [7]
@@ -0,0 +1,74 @@
+import heapq
+import random
+
+import pytest
+
+import columnar
+from classes import User, Post
+from trending_engine import TopK, TrendingEngine, view_count
+
+
+def test_top_k_follows_views_from_every_entry_point():
+    rng = random.Random(0)
+    users = [User(i, country=rng.choice(["US", "FR"])) for i in range(30)]
+    posts = [Post(rng.choice(users), rng.choice(["cats", "dogs", "cats and dogs"]) + f" {i}") for i in range(60)]
+    engine = TrendingEngine(capacity=10)
+    engine.add_posts(posts)
+    engine.add_filter(["cats"])
+    for _ in range(800):
+        post, user = rng.choice(posts), rng.choice(users)
+        entry = rng.randrange(3)
+        if entry == 0:
+            post.add_view(user)
+        elif entry == 1:
+            user.add_read_post(post)
+        else:
+            engine.add_view(post, user)
+    expected = [view_count(post) for post in heapq.nlargest(10, posts, key=view_count)]
+    assert [view_count(post) for post in engine.top_k(10)] == expected
+    cats = [post for post in posts if "cats" in post.content]
+    assert [view_count(post) for post in engine.top_k(5, ["cats"])] == \
+        [view_count(post) for post in heapq.nlargest(5, cats, key=view_count)]
+    us = [post for post in posts if post.creator.country == "US"]
+    assert [view_count(post) for post in engine.top_k(5, user_attributes={"country": "US"})] == \
+        [view_count(post) for post in heapq.nlargest(5, us, key=view_count)]
+
+
+def test_repeated_views_count_once():
+    author, reader = User(1), User(2)
+    post = Post(author, "hello")
+    engine = TrendingEngine(capacity=3)
+    engine.add_post(post)
+    reader.add_read_post(post)
+    post.add_view(reader)
+    engine.add_view(post, reader)
+    assert engine.top.members[post][0] == 1
+
+
+def test_engine_over_columnar_posts():
+    store = columnar.ColumnarStore()
+    for user_id in range(3):
+        store.add_user(user_id)
+    first, second = store.users()[0].make_post("first"), store.users()[1].make_post("second")
+    engine = TrendingEngine(capacity=2)
+    engine.add_posts(store.posts())
+    for user in store.users():
+        user.add_read_post(store.post(1))  # Another view object of the same row
+    assert engine.top_k(2) == [second, first]
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        TopK(0)
+    with pytest.raises(ValueError):
+        TrendingEngine(capacity=0)
+
+
+def test_report_limit_is_capped_at_engine_capacity(monkeypatch):
+    import trending
+    monkeypatch.setattr(trending, "generate_wordcloud", lambda **kwargs: None)
+    author = User(1, name="Ann")
+    posts = [Post(author, f"post {i}") for i in range(20)]
+    engine = TrendingEngine(capacity=10)
+    engine.add_posts(posts)
+    trending.generate_trending_report(posts, engine=engine)  # limit defaults to 50
@@ -0,0 +1,22 @@
+import re
+from collections import Counter
+
+from word_frequency import tokenize, word_frequencies
+
+CONTENTS = ["Hello, world! Hello again.", "it's a dog-eat-dog world", "naïve café 42 times", "", "   ",
+            "under_score and ümlaut... WORLD"]
+
+
+def test_tokenize_matches_splitting_then_stripping():
+    for content in CONTENTS:
+        expected = [re.sub(r'\W+', '', word) for word in content.lower().split()]
+        assert tokenize(content) == [word for word in expected if word]
+
+
+def test_frequencies_are_the_same_in_process_and_in_a_pool():
+    contents = CONTENTS * 50
+    expected = dict(Counter(word for content in contents for word in tokenize(content)))
+    assert word_frequencies(iter(contents)) == expected
+    assert word_frequencies(iter(contents), workers=1, chunk_size=7) == expected
+    assert word_frequencies((content for content in contents), workers=2, chunk_size=7) == expected
+    assert word_frequencies([]) == {}
@@ -0,0 +1,44 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from classes import User, Post
+from word_frequency import tokenize
+from word_rollups import FrequencyAggregator
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def recount(posts, since=None, until=None, country=None, age=None):
+    counts = Counter()
+    for post in posts:
+        if since is not None and post.time_and_date < since.replace(minute=0, second=0):
+            continue
+        if until is not None and post.time_and_date >= until:
+            continue
+        if country is not None and post.creator.country != country:
+            continue
+        if age is not None and (post.creator.age is None or not age[0] <= post.creator.age <= age[1]):
+            continue
+        counts.update(tokenize(post.content))
+    return dict(counts)
+
+
+def test_queries_match_a_recount():
+    rng = random.Random(0)
+    users = [User(i, age=rng.choice([None, 20, 30, 50]), country=rng.choice(["US", "FR"])) for i in range(20)]
+    posts = [Post(rng.choice(users), rng.choice(["cats", "dogs and cats", "birds", ""]),
+                  time_and_date=START + timedelta(minutes=rng.randrange(600))) for _ in range(300)]
+    aggregator = FrequencyAggregator()
+    aggregator.add_posts(posts)
+    since, until = START + timedelta(hours=2, minutes=30), START + timedelta(hours=5)
+    for options in (dict(), dict(country="US"), dict(age=(18, 25)), dict(country="FR", age=(25, 60))):
+        assert aggregator.query(**options) == recount(posts, **options)
+        assert aggregator.query(since, until, **options) == recount(posts, since, until, **options)
+    with pytest.raises(ValueError):
+        aggregator.query(gender="f")
+
+    aggregator.expire(since)
+    assert aggregator.query() == recount(posts, since=since)
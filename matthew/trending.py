@@ -1,17 +1,52 @@
 from wordcloud import WordCloud
 from classes import User, Post
 from generate_wordcloud import generate_wordcloud
+from keyword_matcher import compile_filter
 import matplotlib.pyplot as plt
-import re
+import heapq
 
-def calculate_trending_score(post):
-    """Calculate a simple trending score based on views."""
+def calculate_trending_score(post, counters=None, now=None):
+    """Calculate a simple trending score based on views.
+
+    With TrendingCounters, returns the time-decayed score of recent views and
+    comments instead; with ApproximateTrending, the sketched view/comment count.
+    """
+    if counters is not None:
+        return counters.score(post, now)
     return len(post.seen_by)
 
-def generate_trending_report(posts, keywords=[], exclude_keywords=[], user_attributes=None):
-    """Generate a report of trending posts with filtering options."""
-    ranked_posts = sorted(posts, key=calculate_trending_score, reverse=True)
+def generate_trending_report(posts, keywords=[], exclude_keywords=[], user_attributes=None, index=None, engine=None, limit=50,
+                             counters=None, whole_words=False):
+    """Generate a report of the `limit` top trending posts with filtering options.
+
+    Only posts matching the keywords are ranked and passed on to the word
+    cloud. Keywords match substrings, or only whole words if whole_words is
+    True; an InvertedIndex then answers them without reading every post's
+    content (ValueError if given without whole_words). Pass TrendingCounters
+    to rank by time-decayed score.
+    If a TrendingEngine tracking the posts is given, the ranking (keywords
+    and user_attributes included) comes from its top-K instead, with limit
+    capped at the engine capacity; the engine matches substrings only.
+    """
+    if engine is not None:
+        if whole_words:
+            raise ValueError("A TrendingEngine only matches substrings; whole_words is not supported")
+        # The engine filters and ranks; the word cloud applies the keywords in its own pass
+        ranked_posts = engine.top_k(min(limit, engine.capacity), keywords, exclude_keywords, user_attributes)
+    else:
+        if keywords or exclude_keywords:
+            if index is not None:
+                if not whole_words:
+                    raise ValueError("An inverted index only matches whole words; pass whole_words=True")
+                posts = index.query(any_of=keywords, none_of=exclude_keywords, within=posts)
+            else:
+                keyword_filter = compile_filter({k.lower() for k in keywords}, {k.lower() for k in exclude_keywords},
+                                                whole_words)
+                posts = [post for post in posts if keyword_filter.accepts(post.content.lower())]
+            keywords = exclude_keywords = []
+        ranked_posts = heapq.nlargest(limit, posts, key=lambda post: calculate_trending_score(post, counters))
     for post in ranked_posts: 
-        print(f"Post ID: {post.id}, Content: {post.content}, Author: {post.author.name}")
+        print(f"Post ID: {post.post_id}, Content: {post.content}, Author: {post.creator.name}")
 
-    wordcloud = generate_wordcloud(posts=posts, keywords=keywords, exclude_keywords=exclude_keywords, user_attributes=user_attributes)
+    users = {post.creator for post in posts}
+    wordcloud = generate_wordcloud(users=users, posts=posts, include_keywords=keywords, exclude_keywords=exclude_keywords, user_attributes=user_attributes)
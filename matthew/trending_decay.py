@@ -0,0 +1,132 @@
+import math
+from datetime import datetime, timezone
+
+from sketches import post_key
+
+LN2 = math.log(2)
+
+
+def _timestamp(time_and_date=None):
+    if time_and_date is None:
+        time_and_date = datetime.now(timezone.utc)
+    return time_and_date.timestamp()
+
+
+def _log_add(a, b):
+    """Returns log(exp(a) + exp(b)) without overflow."""
+    if a < b:
+        a, b = b, a
+    if b == -math.inf:
+        return a
+    return a + math.log1p(math.exp(b - a))
+
+
+class DecayedCounter:
+    """Event count that halves every half_life seconds.
+
+    Uses forward decay: an event at time t is stored with weight
+    2 ** (t / half_life), kept as a logarithm so it never overflows. Adding an
+    event is O(1) and the decayed value is only computed when read. Because
+    every counter decays at the same rate, log_value orders counters the same
+    way as their decayed values at any moment.
+    """
+    __slots__ = ("half_life", "log_value")
+
+    def __init__(self, half_life):
+        self.half_life = half_life
+        self.log_value = -math.inf
+
+    def add(self, time, weight=1.0):
+        """Adds an event at time (epoch seconds)."""
+        self.log_value = _log_add(self.log_value, math.log(weight) + time * LN2 / self.half_life)
+
+    def value(self, now):
+        """Returns the decayed count at now (epoch seconds)."""
+        return math.exp(self.log_value - now * LN2 / self.half_life)
+
+
+class SlidingWindowCounter:
+    """Number of events in the last `window` seconds, kept in a ring of slots."""
+    __slots__ = ("slot_seconds", "counts", "slots")
+
+    def __init__(self, window, slots=12):
+        self.slot_seconds = window / slots
+        self.counts = [0.0] * slots
+        self.slots = [None] * slots  # slot number held in each position
+
+    def add(self, time, weight=1.0):
+        """Adds an event at time (epoch seconds)."""
+        slot = int(time // self.slot_seconds)
+        position = slot % len(self.counts)
+        if self.slots[position] != slot:
+            self.slots[position] = slot
+            self.counts[position] = 0.0
+        self.counts[position] += weight
+
+    def value(self, now):
+        """Returns the number of events in the window ending at now."""
+        current = int(now // self.slot_seconds)
+        return sum(count for slot, count in zip(self.slots, self.counts)
+                   if slot is not None and 0 <= current - slot < len(self.counts))
+
+
+class TrendingCounters:
+    """Time-decayed view/comment counters per post.
+
+    A post's creation (Post.time_and_date) counts as one event, views as one
+    and comments as comment_weight, all decaying with half_life. rank_key is
+    a time-independent key for TrendingEngine; score and velocity give the
+    decayed score and the events in the last `window` seconds at query time.
+    Posts are identified by post_key. Reading a post without recorded events
+    does not store anything.
+    """
+    def __init__(self, half_life=3600, window=3600, comment_weight=2.0, post_weight=1.0):
+        self.half_life = half_life
+        self.window = window
+        self.comment_weight = comment_weight
+        self.post_weight = post_weight
+        self.counters = {}  # post_key -> (DecayedCounter, SlidingWindowCounter)
+
+    def _new_counters(self, post):
+        counters = (DecayedCounter(self.half_life), SlidingWindowCounter(self.window))
+        if self.post_weight:
+            counters[0].add(_timestamp(post.time_and_date), self.post_weight)
+        return counters
+
+    def _counters(self, post):
+        """Returns the counters of post, creating them on its first event."""
+        key = post_key(post)
+        counters = self.counters.get(key)
+        if counters is None:
+            counters = self.counters[key] = self._new_counters(post)
+        return counters
+
+    def _peek(self, post):
+        """Returns the counters of post without storing new ones."""
+        return self.counters.get(post_key(post)) or self._new_counters(post)
+
+    def _record(self, post, weight, time):
+        time = _timestamp(time)
+        decayed, window = self._counters(post)
+        decayed.add(time, weight)
+        window.add(time, weight)
+
+    def record_view(self, post, time=None):
+        """Records a view of post at time (a datetime, default now)."""
+        self._record(post, 1.0, time)
+
+    def record_comment(self, post, time=None):
+        """Records a comment on post at time (a datetime, default now)."""
+        self._record(post, self.comment_weight, time)
+
+    def rank_key(self, post):
+        """Returns a key that orders posts by decayed score at any moment."""
+        return self._peek(post)[0].log_value
+
+    def score(self, post, now=None):
+        """Returns the decayed score of post at now (a datetime, default now)."""
+        return self._peek(post)[0].value(_timestamp(now))
+
+    def velocity(self, post, now=None):
+        """Returns the weighted events on post in the last window seconds."""
+        return self._peek(post)[1].value(_timestamp(now))
@@ -0,0 +1,154 @@
+import heapq
+from itertools import count
+
+from keyword_matcher import compile_filter
+
+
+def view_count(post):
+    """Default score: number of users who have seen the post."""
+    return len(post.seen_by)
+
+
+class TopK:
+    """Keeps the `capacity` highest-scoring items as scores change.
+
+    Scores may only grow (views and comments only ever add up), which is
+    what keeps the retained set exact: an item that falls out can only come
+    back through an update with a higher score. The minimum is found through
+    a heap whose outdated entries are skipped lazily.
+    """
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.members = {}  # key -> (score, item)
+        self.heap = []  # (score, sequence, key), may hold outdated entries
+        self._sequence = count()
+
+    def update(self, key, item, score):
+        """Records the new score of an item."""
+        if key not in self.members and len(self.members) >= self.capacity:
+            lowest, lowest_key = self._minimum()
+            if score <= lowest:
+                return
+            del self.members[lowest_key]
+        self.members[key] = (score, item)
+        heapq.heappush(self.heap, (score, next(self._sequence), key))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(score, next(self._sequence), key) for key, (score, _) in self.members.items()]
+            heapq.heapify(self.heap)
+
+    def _minimum(self):
+        heap = self.heap
+        while True:
+            score, _, key = heap[0]
+            member = self.members.get(key)
+            if member is not None and member[0] == score:
+                return score, key
+            heapq.heappop(heap)
+
+    def top(self, k):
+        """Returns the k highest-scoring items, best first, in O(capacity log k)."""
+        return [item for _, item in heapq.nlargest(k, self.members.values(), key=lambda member: member[0])]
+
+
+def _filter_key(include_keywords=None, exclude_keywords=None, user_attributes=None):
+    return (frozenset(k.lower() for k in include_keywords or ()),
+            frozenset(k.lower() for k in exclude_keywords or ()),
+            frozenset((user_attributes or {}).items()))
+
+
+class TrendingEngine:
+    """Incrementally maintained top-K trending posts.
+
+    Tracked posts report their new views and comments to the engine through
+    their view and comment listeners, whether they come from Post.add_view,
+    User.add_read_post or the engine's own add_view/add_comment, so each
+    event re-scores one post in O(log K) instead of sorting the whole corpus
+    on every report. Filtered rankings registered with
+    add_filter are kept the same way. With TrendingCounters, posts are ranked
+    by time-decayed views and comments instead of the plain view count.
+    """
+    def __init__(self, capacity=50, score=view_count, counters=None):
+        self.capacity = capacity
+        self.counters = counters
+        self.score = counters.rank_key if counters is not None else score
+        self.posts = {}  # Post -> Post (posts are hashable; store views compare by row)
+        self.top = TopK(capacity)
+        self.filters = {}  # filter key -> (KeywordFilter, user_attributes, TopK)
+
+    def add_post(self, post):
+        """Starts tracking a post and listening to its views and comments."""
+        if post in self.posts:
+            return
+        self.posts[post] = post
+        post.view_listeners.append(self._on_view)
+        post.comment_listeners.append(self._on_comment)
+        self._rescore(post)
+
+    def add_posts(self, posts):
+        for post in posts:
+            self.add_post(post)
+
+    def add_view(self, post, user, time=None):
+        """Adds a user's view to the post (tracking it if needed); the rankings follow."""
+        self.add_post(post)
+        post.add_view(user, time)
+
+    def add_comment(self, post, comment, time=None):
+        """Adds a comment to the post (tracking it if needed); the rankings follow."""
+        self.add_post(post)
+        post.add_comment(comment, time)
+
+    def _on_view(self, post, user, time):
+        if self.counters is not None:
+            self.counters.record_view(post, time)
+        self._rescore(post)
+
+    def _on_comment(self, post, comment, time):
+        if self.counters is not None:
+            self.counters.record_comment(post, time)
+        self._rescore(post)
+
+    def _rescore(self, post):
+        score = self.score(post)
+        self.top.update(post, post, score)
+        for keyword_filter, user_attributes, top in self.filters.values():
+            if self._accepts(post, keyword_filter, user_attributes):
+                top.update(post, post, score)
+
+    def _accepts(self, post, keyword_filter, user_attributes):
+        if any(getattr(post.creator, attr) != value for attr, value in user_attributes.items()):
+            return False
+        return keyword_filter.accepts(post.content.lower())
+
+    def add_filter(self, include_keywords=None, exclude_keywords=None, user_attributes=None):
+        """Registers a filtered ranking, kept up to date like the global one."""
+        key = _filter_key(include_keywords, exclude_keywords, user_attributes)
+        if key in self.filters:
+            return
+        keyword_filter = compile_filter(key[0], key[1])
+        top = TopK(self.capacity)
+        self.filters[key] = (keyword_filter, dict(key[2]), top)
+        for post in self.posts.values():
+            if self._accepts(post, keyword_filter, dict(key[2])):
+                top.update(post, post, self.score(post))
+
+    def top_k(self, k=None, include_keywords=None, exclude_keywords=None, user_attributes=None):
+        """Returns the k highest-scoring posts, optionally filtered.
+
+        Filters registered with add_filter are answered from their own top-K;
+        other filters fall back to one pass over the tracked posts.
+        """
+        k = self.capacity if k is None else k
+        if k > self.capacity:
+            raise ValueError(f"k={k} is larger than the engine capacity {self.capacity}")
+        key = _filter_key(include_keywords, exclude_keywords, user_attributes)
+        if key == _filter_key():
+            return self.top.top(k)
+        if key in self.filters:
+            return self.filters[key][2].top(k)
+        keyword_filter = compile_filter(key[0], key[1])
+        user_attributes = dict(key[2])
+        matching = (post for post in self.posts.values() if self._accepts(post, keyword_filter, user_attributes))
+        return heapq.nlargest(k, matching, key=self.score)
@@ -0,0 +1,92 @@
+import math
+from collections import Counter
+from datetime import datetime, timezone
+
+from word_frequency import tokenize
+
+
+class FrequencyAggregator:
+    """Word counts maintained incrementally per time bucket and user segment.
+
+    Each post is tokenized once, when it arrives, and its words are added to
+    the Counter of its time bucket (from Post.time_and_date) and of its
+    creator's segment (e.g. country and age). A query such as "last hour,
+    USA, age 18-25" then merges the few matching Counters instead of
+    recounting every post.
+    """
+    def __init__(self, bucket_seconds=3600, segment_by=("country", "age")):
+        self.bucket_seconds = bucket_seconds
+        self.segment_by = tuple(segment_by)
+        self.buckets = {}  # bucket -> {segment: Counter}
+        self.totals = {}  # bucket -> Counter over all segments
+
+    def _bucket(self, time_and_date):
+        if time_and_date is None:
+            time_and_date = datetime.now(timezone.utc)
+        return int(time_and_date.timestamp() // self.bucket_seconds)
+
+    def _last_bucket(self, until):
+        """Returns the last bucket starting before until."""
+        return math.ceil(until.timestamp() / self.bucket_seconds) - 1
+
+    def add_post(self, post):
+        """Counts the words of a new post."""
+        words = tokenize(post.content)
+        if not words:
+            return
+        bucket = self._bucket(post.time_and_date)
+        segment = tuple(getattr(post.creator, attribute) for attribute in self.segment_by)
+        segments = self.buckets.setdefault(bucket, {})
+        segments.setdefault(segment, Counter()).update(words)
+        self.totals.setdefault(bucket, Counter()).update(words)
+
+    def add_posts(self, posts):
+        for post in posts:
+            self.add_post(post)
+
+    def expire(self, before):
+        """Drops the buckets that end before the given datetime."""
+        cutoff = self._bucket(before)
+        for bucket in [bucket for bucket in self.buckets if bucket < cutoff]:
+            del self.buckets[bucket]
+            del self.totals[bucket]
+
+    def _matches(self, segment, filters):
+        for position, wanted in filters:
+            value = segment[position]
+            if isinstance(wanted, tuple):
+                low, high = wanted
+                if value is None or (low is not None and value < low) or (high is not None and value > high):
+                    return False
+            elif value != wanted:
+                return False
+        return True
+
+    def query(self, since=None, until=None, **filters):
+        """Returns the {word: count} dict for posts in [since, until) matching filters.
+
+        Filters are keyed by the segment_by attributes; a value matches
+        exactly and a (low, high) tuple matches an inclusive range, e.g.
+        query(since=hour_ago, country="USA", age=(18, 25)). Times are rounded
+        to whole buckets: since down to the start of its bucket and until up
+        to the end of its bucket, so the bucket holding until (e.g. the
+        current hour) is included.
+        """
+        unknown = set(filters) - set(self.segment_by)
+        if unknown:
+            raise ValueError(f"Not segmented by {', '.join(sorted(unknown))}")
+        filters = [(self.segment_by.index(attribute), wanted) for attribute, wanted in filters.items()]
+        first = None if since is None else self._bucket(since)
+        last = None if until is None else self._last_bucket(until)
+
+        total = Counter()
+        for bucket, segments in self.buckets.items():
+            if (first is not None and bucket < first) or (last is not None and bucket > last):
+                continue
+            if not filters:
+                total.update(self.totals[bucket])
+                continue
+            for segment, counts in segments.items():
+                if self._matches(segment, filters):
+                    total.update(counts)
+        return dict(total)
@@ -0,0 +1,195 @@
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+import json
+import mmap
+import struct
+import sys
+
+from columnar import MISSING, ColumnarStore, StringTable
+
+MAGIC = b"SMNSNAP2"
+BYTEORDER = {"little": 1, "big": 2}[sys.byteorder]
+
+# Section name -> item format. Sections are written in this order, each
+# aligned to 8 bytes, and located through the offset table in the header.
+SECTIONS = (
+    ("string_offsets", "q"),
+    ("string_blob", "B"),
+    ("user_key", "i"),
+    ("user_name", "i"),
+    ("user_gender", "i"),
+    ("user_age", "i"),
+    ("user_country", "i"),
+    ("user_region", "i"),
+    ("post_creator", "i"),
+    ("post_parent", "i"),
+    ("post_time", "d"),
+    ("content_offsets", "q"),
+    ("content_blob", "B"),
+    ("conn_offsets", "i"),
+    ("conn_targets", "i"),
+    ("conn_types", "i"),
+    ("view_offsets", "i"),
+    ("view_targets", "i"),
+    ("string_hashes", "q"),
+    ("string_codes", "i"),
+    ("key_rows", "i"),
+    ("authored_offsets", "i"),
+    ("authored_targets", "i"),
+    ("read_offsets", "i"),
+    ("read_targets", "i"),
+    ("replies_offsets", "i"),
+    ("replies_targets", "i"),
+)
+DERIVED = ("authored", "read", "replies")
+HEADER = struct.Struct(f"<8sBxxxxxxxqq{2 * len(SECTIONS)}q")  # magic, byte order, counts, (offset, length)*
+
+
+class _BlobColumn:
+    """Read-only sequence of values decoded on access from an offsets + bytes pair."""
+    def __init__(self, offsets, blob, decode):
+        self.offsets = offsets
+        self.blob = blob
+        self.decode = decode
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return self.decode(bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class _IndexedStringTable(StringTable):
+    """StringTable that finds codes through a hash index saved in the snapshot.
+
+    hashes is sorted and codes[i] is the code whose value hashes to
+    hashes[i], so a lookup is a binary search instead of decoding every
+    string into the codes dict.
+    """
+    def __init__(self, values, hashes, codes):
+        super().__init__(values)
+        self.hashes = hashes
+        self.hash_codes = codes
+
+    def code(self, value):
+        if value is None:
+            return MISSING
+        if self._codes is not None:
+            return self._codes.get(value, MISSING)
+        hashes = self.hashes
+        digest = _string_hash(_encode_string(value))
+        for i in range(bisect_left(hashes, digest), len(hashes)):
+            if hashes[i] != digest:
+                break
+            code = self.hash_codes[i]
+            if self.values[code] == value:
+                return code
+        return MISSING
+
+
+def _encode_string(value):
+    return json.dumps(value).encode("utf-8")  # keeps int vs str ids
+
+
+def _string_hash(data):
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "little", signed=True)
+
+
+def _pack_blob(values, encode):
+    """Returns (offsets, blob) arrays for a sequence of values."""
+    offsets = array('q', [0])
+    blob = bytearray()
+    for value in values:
+        blob += encode(value)
+        offsets.append(len(blob))
+    return offsets, blob
+
+
+def _decode_string(data):
+    return json.loads(data.decode("utf-8"))
+
+
+def save_snapshot(store, filename):
+    """Writes a ColumnarStore to a binary snapshot file."""
+    store._compact()
+    string_offsets, string_blob = _pack_blob(store.strings.values, _encode_string)
+    content_offsets, content_blob = _pack_blob(store.post_content, lambda text: text.encode("utf-8"))
+    hashes = sorted((_string_hash(string_blob[string_offsets[code]:string_offsets[code + 1]]), code)
+                    for code in range(len(store.strings)))
+    key_rows = array('i', [MISSING] * len(store.strings))
+    for row, code in enumerate(store.user_key):
+        if code != MISSING:
+            key_rows[code] = row
+    data = {
+        "string_offsets": string_offsets,
+        "string_blob": string_blob,
+        "content_offsets": content_offsets,
+        "content_blob": content_blob,
+        "string_hashes": array('q', (digest for digest, _ in hashes)),
+        "string_codes": array('i', (code for _, code in hashes)),
+        "key_rows": key_rows,
+    }
+    for name, (offsets, (targets,)) in store._adjacency(merge=True).items():
+        data[f"{name}_offsets"] = offsets
+        data[f"{name}_targets"] = targets
+    for name, _ in SECTIONS:
+        if name not in data:
+            data[name] = getattr(store, name)
+
+    table = []
+    position = HEADER.size
+    for name, _ in SECTIONS:
+        length = len(memoryview(data[name]).cast("B"))
+        position += -position % 8
+        table.extend((position, length))
+        position += length
+
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, BYTEORDER, store.user_count, store.post_count, *table))
+        for index, (name, _) in enumerate(SECTIONS):
+            f.write(b"\0" * (table[2 * index] - f.tell()))
+            f.write(memoryview(data[name]).cast("B"))
+
+
+def load_snapshot(filename):
+    """Memory-maps a snapshot and returns a read-only ColumnarStore over it.
+
+    Columns are memoryviews into the mapping, so nothing is copied or parsed
+    up front and processes loading the same file share its pages through the
+    OS page cache. Strings and post contents are decoded on access. The
+    authored/read/reply adjacency and the user id lookup are saved too, so
+    the first get_user or authored_posts does not rebuild them.
+    """
+    with open(filename, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, byteorder, user_count, post_count, *table = HEADER.unpack_from(mapping)
+    if magic != MAGIC:
+        raise ValueError(f"{filename} is not a social network snapshot")
+    if byteorder != BYTEORDER:
+        raise ValueError(f"{filename} was written on a machine with a different byte order")
+
+    buffer = memoryview(mapping)
+    sections = {}
+    for index, (name, fmt) in enumerate(SECTIONS):
+        offset, length = table[2 * index], table[2 * index + 1]
+        sections[name] = buffer[offset:offset + length].cast(fmt)
+
+    store = ColumnarStore()
+    store.strings = _IndexedStringTable(
+        _BlobColumn(sections.pop("string_offsets"), sections.pop("string_blob"), _decode_string),
+        sections.pop("string_hashes"), sections.pop("string_codes"))
+    store._derived = {name: (sections.pop(f"{name}_offsets"), [sections.pop(f"{name}_targets")])
+                      for name in DERIVED}
+    store.post_content = _BlobColumn(sections.pop("content_offsets"), sections.pop("content_blob"),
+                                     lambda data: data.decode("utf-8"))
+    for name, column in sections.items():
+        setattr(store, name, column)
+    store._rows = None
+    store.mapping = mapping  # Keeps the mapping open as long as the store is alive
+    return store
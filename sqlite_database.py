@@ -0,0 +1,333 @@
+import sqlite3
+from datetime import datetime, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    user_id UNIQUE NOT NULL,
+    name TEXT,
+    gender TEXT,
+    age INTEGER,
+    country TEXT,
+    region TEXT
+);
+CREATE TABLE IF NOT EXISTS connections (
+    user INTEGER NOT NULL REFERENCES users(id),
+    type TEXT NOT NULL,
+    connected_user INTEGER NOT NULL REFERENCES users(id),
+    PRIMARY KEY (user, type, connected_user)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    creator INTEGER NOT NULL REFERENCES users(id),
+    content TEXT,
+    responding_to INTEGER REFERENCES posts(id),
+    time_and_date REAL
+);
+CREATE TABLE IF NOT EXISTS views (
+    post INTEGER NOT NULL REFERENCES posts(id),
+    user INTEGER NOT NULL REFERENCES users(id),
+    PRIMARY KEY (post, user)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS comments (
+    post INTEGER NOT NULL REFERENCES posts(id),
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS users_country ON users(country);
+CREATE INDEX IF NOT EXISTS users_region ON users(region);
+CREATE INDEX IF NOT EXISTS users_age ON users(age);
+CREATE INDEX IF NOT EXISTS users_gender ON users(gender);
+CREATE INDEX IF NOT EXISTS posts_creator ON posts(creator);
+CREATE INDEX IF NOT EXISTS posts_time ON posts(time_and_date);
+CREATE INDEX IF NOT EXISTS posts_responding_to ON posts(responding_to);
+CREATE INDEX IF NOT EXISTS views_user ON views(user);
+CREATE INDEX IF NOT EXISTS comments_post ON comments(post);
+"""
+
+USER_COLUMNS = "users.id, users.user_id, users.name, users.gender, users.age, users.country, users.region"
+
+
+def _timestamp(time_and_date):
+    return time_and_date.timestamp() if time_and_date else None
+
+
+class SQLiteDatabase:
+    """Users, posts, connections and views stored in a local SQLite file.
+
+    Queries run against indexes and results are streamed back lazily from the
+    cursor as User/Post views, so the network never has to fit in memory.
+    Changes are written one at a time (add_user, add_connection, make_post,
+    add_view, add_comment or the same methods on the views), each in its own
+    transaction, so the file can back a live network as well as a bulk import.
+    """
+    def __init__(self, filename="social_network.db"):
+        self.connection = sqlite3.connect(filename)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def _row_id(self, user_id):
+        row = self.connection.execute("SELECT id FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            raise KeyError(user_id)
+        return row[0]
+
+    def add_user(self, user_id, name=None, gender=None, age=None, country=None, region=None):
+        """Adds a new user; existing users are left unchanged."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO users (user_id, name, gender, age, country, region) VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, name, gender, age, country, region))
+
+    def add_connection(self, user_id_1, user_id_2, connection_type):
+        """Adds a directed connection between two users."""
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO connections VALUES (?, ?, ?)",
+                                    (self._row_id(user_id_1), connection_type, self._row_id(user_id_2)))
+
+    def make_post(self, user_id, text, responding_to=None, time_and_date=None):
+        """Creates a post and returns its post id. responding_to is a post id or None."""
+        time_and_date = time_and_date or datetime.now(timezone.utc)
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO posts (creator, content, responding_to, time_and_date) VALUES (?, ?, ?, ?)",
+                (self._row_id(user_id), text, responding_to, _timestamp(time_and_date)))
+        return cursor.lastrowid
+
+    def add_view(self, post_id, user_id):
+        """Records that a user has seen a post."""
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO views VALUES (?, ?)", (post_id, self._row_id(user_id)))
+
+    def add_comment(self, post_id, comment):
+        """Adds a comment to a post."""
+        with self.connection:
+            self.connection.execute("INSERT INTO comments VALUES (?, ?)", (post_id, comment))
+
+    def import_data(self, users, posts):
+        """Bulk-loads classes.User / classes.Post objects in a single transaction."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO users (user_id, name, gender, age, country, region) VALUES (?, ?, ?, ?, ?, ?)",
+                ((u.user_id, u.name, u.gender, u.age, u.country, u.region) for u in users))
+            rows = dict(self.connection.execute("SELECT user_id, id FROM users"))
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO connections VALUES (?, ?, ?)",
+                ((rows[u.user_id], conn["type"], rows[conn["user"].user_id])
+                 for u in users for conn in u.connections if conn["user"].user_id in rows))
+            post_rows = {}
+            for post in posts:
+                cursor = self.connection.execute(
+                    "INSERT INTO posts (creator, content, time_and_date) VALUES (?, ?, ?)",
+                    (rows[post.creator.user_id], post.content, _timestamp(post.time_and_date)))
+                post_rows[id(post)] = cursor.lastrowid
+            self.connection.executemany(
+                "UPDATE posts SET responding_to = ? WHERE id = ?",
+                ((post_rows[id(p.responding_to)], post_rows[id(p)]) for p in posts
+                 if p.responding_to is not None and id(p.responding_to) in post_rows))
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO views VALUES (?, ?)",
+                ((post_rows[id(p)], rows[getattr(viewer, "user_id", viewer)]) for p in posts
+                 for viewer in p.seen_by if getattr(viewer, "user_id", viewer) in rows))
+            self.connection.executemany(
+                "INSERT INTO comments VALUES (?, ?)",
+                ((post_rows[id(p)], comment) for p in posts for comment in getattr(p, "comments", [])))
+
+    def _users(self, sql, parameters=()):
+        for row in self.connection.execute(sql, parameters):
+            yield User(self, *row)
+
+    def _posts(self, sql, parameters=()):
+        for (post_id,) in self.connection.execute(sql, parameters):
+            yield Post(self, post_id)
+
+    def get_user(self, user_id):
+        return next(self._users(f"SELECT {USER_COLUMNS} FROM users WHERE user_id = ?", (user_id,)), None)
+
+    def get_post(self, post_id):
+        return next(self._posts("SELECT id FROM posts WHERE id = ?", (post_id,)), None)
+
+    def iter_users(self):
+        return self._users(f"SELECT {USER_COLUMNS} FROM users ORDER BY id")
+
+    def iter_posts(self, since=None, until=None):
+        """Yields posts in time order, optionally within [since, until)."""
+        conditions = []
+        parameters = []
+        if since is not None:
+            conditions.append("time_and_date >= ?")
+            parameters.append(_timestamp(since))
+        if until is not None:
+            conditions.append("time_and_date < ?")
+            parameters.append(_timestamp(until))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._posts(f"SELECT id FROM posts {where} ORDER BY time_and_date", parameters)
+
+    def filter_users(self, min_posts=None, max_posts=None, gender=None, country=None, region=None,
+                     min_age=None, max_age=None):
+        """Yields users matching all given criteria in the order they were added.
+
+        Takes the same criteria as SocialMediaGraph.filter_users, which
+        answers from here when the graph writes through to a database.
+        """
+        conditions = []
+        parameters = []
+        for column, value in (("gender", gender), ("country", country), ("region", region)):
+            if value:
+                conditions.append(f"users.{column} = ?")
+                parameters.append(value)
+        if min_age is not None:
+            conditions.append("users.age >= ?")
+            parameters.append(min_age)
+        if max_age is not None:
+            conditions.append("users.age <= ?")
+            parameters.append(max_age)
+        post_count = "(SELECT COUNT(*) FROM posts WHERE posts.creator = users.id)"
+        if min_posts is not None:
+            conditions.append(f"{post_count} >= ?")
+            parameters.append(min_posts)
+        if max_posts is not None:
+            conditions.append(f"{post_count} <= ?")
+            parameters.append(max_posts)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._users(f"SELECT {USER_COLUMNS} FROM users {where} ORDER BY users.id", parameters)
+
+    def seen_by_age(self, post_id, min, max):
+        """Yields viewers of a post whose age is within [min, max]."""
+        return self._users(
+            f"SELECT {USER_COLUMNS} FROM views JOIN users ON users.id = views.user "
+            "WHERE views.post = ? AND users.age BETWEEN ? AND ?", (post_id, min, max))
+
+    def seen_by_country_or_region(self, post_id, country, region=None):
+        """Yields viewers of a post from a country, or from a region if given."""
+        column, value = ("country", country) if region is None else ("region", region)
+        return self._users(
+            f"SELECT {USER_COLUMNS} FROM views JOIN users ON users.id = views.user "
+            f"WHERE views.post = ? AND users.{column} = ?", (post_id, value))
+
+
+class User:
+    """A user row from SQLiteDatabase; related objects are queried on access."""
+    __slots__ = ("_db", "_row", "user_id", "name", "gender", "age", "country", "region")
+
+    def __init__(self, db, row, user_id, name=None, gender=None, age=None, country=None, region=None):
+        self._db = db
+        self._row = row
+        self.user_id = user_id
+        self.name = name
+        self.gender = gender
+        self.age = age
+        self.country = country
+        self.region = region
+
+    def __eq__(self, other):
+        return isinstance(other, User) and other._db is self._db and other._row == self._row
+
+    def __hash__(self):
+        return hash((id(self._db), self._row))
+
+    def __repr__(self):
+        return f"User({self.user_id!r})"
+
+    @property
+    def connections(self):
+        return self.connections_by_type()
+
+    @property
+    def authored_posts(self):
+        return list(self._db._posts("SELECT id FROM posts WHERE creator = ? ORDER BY id", (self._row,)))
+
+    @property
+    def read_posts(self):
+        return list(self._db._posts("SELECT post FROM views WHERE user = ?", (self._row,)))
+
+    def connections_by_type(self, connection_type=None):
+        """Returns connections filtered by type if specified."""
+        sql = (f"SELECT connections.type, {USER_COLUMNS} FROM connections "
+               "JOIN users ON users.id = connections.connected_user WHERE connections.user = ?")
+        parameters = [self._row]
+        if connection_type is not None:
+            sql += " AND connections.type = ?"
+            parameters.append(connection_type)
+        return [{"type": row[0], "user": User(self._db, *row[1:])}
+                for row in self._db.connection.execute(sql, parameters)]
+
+    def add_connection(self, connection_type, connected_user):
+        """Adds a connection to another user."""
+        self._db.add_connection(self.user_id, connected_user.user_id, connection_type)
+
+    def add_read_post(self, post):
+        """Records that the user has read a post."""
+        self._db.add_view(post.post_id, self.user_id)
+
+    def make_post(self, text, response_to=None):
+        """Creates a post by the user and returns it."""
+        parent = None if response_to is None else response_to.post_id
+        return Post(self._db, self._db.make_post(self.user_id, text, parent))
+
+
+class Post:
+    """A post row from SQLiteDatabase; columns are read on access."""
+    __slots__ = ("_db", "post_id")
+
+    def __init__(self, db, post_id):
+        self._db = db
+        self.post_id = post_id
+
+    def __eq__(self, other):
+        return isinstance(other, Post) and other._db is self._db and other.post_id == self.post_id
+
+    def __hash__(self):
+        return hash((id(self._db), self.post_id))
+
+    def __repr__(self):
+        return f"Post({self.post_id})"
+
+    def _column(self, column):
+        return self._db.connection.execute(f"SELECT {column} FROM posts WHERE id = ?", (self.post_id,)).fetchone()[0]
+
+    @property
+    def creator(self):
+        return next(self._db._users(
+            f"SELECT {USER_COLUMNS} FROM posts JOIN users ON users.id = posts.creator WHERE posts.id = ?",
+            (self.post_id,)))
+
+    @property
+    def content(self):
+        return self._column("content")
+
+    @property
+    def responding_to(self):
+        parent = self._column("responding_to")
+        return None if parent is None else Post(self._db, parent)
+
+    @property
+    def time_and_date(self):
+        timestamp = self._column("time_and_date")
+        return None if timestamp is None else datetime.fromtimestamp(timestamp, timezone.utc)
+
+    @property
+    def seen_by(self):
+        return list(self._db._users(
+            f"SELECT {USER_COLUMNS} FROM views JOIN users ON users.id = views.user WHERE views.post = ?",
+            (self.post_id,)))
+
+    @property
+    def comments(self):
+        return [comment for (comment,) in self._db.connection.execute(
+            "SELECT comment FROM comments WHERE post = ? ORDER BY rowid", (self.post_id,))]
+
+    def add_view(self, user):
+        """Adds a user's view to the post."""
+        self._db.add_view(self.post_id, user.user_id)
+
+    def add_comment(self, comment):
+        """Adds a comment to the post."""
+        self._db.add_comment(self.post_id, comment)
+
+    def seen_by_age(self, min, max):
+        return list(self._db.seen_by_age(self.post_id, min, max))
+
+    def seen_by_country_or_region(self, country, region=None):
+        return list(self._db.seen_by_country_or_region(self.post_id, country, region))
@@ -0,0 +1,89 @@
+import sys
+import threading
+
+from changelog import ChangeLog
+from database import Database
+import snapshot
+
+
+def network(log):
+    users = {user.user_id: (sorted((conn["type"], conn["user"].user_id) for conn in user.connections))
+             for user in log.users}
+    posts = {post.post_id: (post.creator.user_id, post.content, sorted(viewer.user_id for viewer in post.seen_by),
+                            list(post.comments))
+             for post in log.posts}
+    return users, posts
+
+
+def test_replay_restores_changes(tmp_path):
+    filename, log_filename = str(tmp_path / "network.json"), str(tmp_path / "network.log")
+    log = ChangeLog([], [], filename, log_filename)
+    alice, bob = log.add_user("alice", age=30), log.add_user("bob")
+    log.add_connection(alice, "friend", bob)
+    post = log.make_post(alice, "hello")
+    reply = log.make_post(bob, "hi", response_to=post)
+    log.add_view(post, bob)
+    log.add_view(post, bob)
+    log.add_comment(reply, "nice")
+    log.close()
+
+    reopened = ChangeLog.open(filename, log_filename)
+    assert network(reopened) == network(log)
+    assert len(reopened.posts_by_id[post.post_id].seen_by) == 1
+    assert reopened.posts_by_id[reply.post_id].responding_to is reopened.posts_by_id[post.post_id]
+    reopened.close()
+
+
+def test_compaction_under_concurrent_writes(tmp_path):
+    filename, log_filename = str(tmp_path / "network.json"), str(tmp_path / "network.log")
+    snapshot_filename = str(tmp_path / "network.snapshot")
+    log = ChangeLog([], [], filename, log_filename, snapshot_filename=snapshot_filename)
+    errors = []
+    done = threading.Event()
+
+    def write():
+        try:
+            first = previous = log.add_user(0)
+            first_post = log.make_post(first, "first")
+            for i in range(1, 3000):
+                user = log.add_user(i, country="US" if i % 2 else "FR")
+                log.add_connection(user, "follows", previous)
+                log.add_connection(first, "follows", user)  # Grows the containers compaction walks
+                post = log.make_post(user, f"post {i}")
+                log.add_view(post, previous)
+                log.add_view(first_post, user)
+                previous = user
+        except Exception as error:
+            errors.append(error)
+        finally:
+            done.set()
+
+    def compact():
+        try:
+            while not done.is_set():
+                log.compact()
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=write), threading.Thread(target=compact), threading.Thread(target=compact)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often so compactions overlap the writes
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+    log.compact()
+    users, posts = Database.load_data(filename)
+    assert len(users) == 3000 and len(posts) == 3000
+    store = snapshot.load_snapshot(snapshot_filename)
+    assert store.user_count == 3000 and store.post_count == 3000
+    log.close()
+
+    reopened = ChangeLog.open(filename, log_filename)
+    assert network(reopened) == network(log)
+    reopened.close()
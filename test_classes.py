@@ -0,0 +1,35 @@
+import random
+
+from classes import User, Post
+
+
+def test_type_index_and_incoming_match_a_scan():
+    rng = random.Random(0)
+    users = [User(i) for i in range(15)]
+    added = []
+    for _ in range(120):
+        user, other, connection_type = rng.choice(users), rng.choice(users), rng.choice(["friend", "follows"])
+        if user.add_connection(connection_type, other):
+            added.append((user, connection_type, other))
+    assert len(added) == sum(len(user.connections) for user in users)  # Duplicates were rejected
+    for user in users:
+        for connection_type in ("friend", "follows", "unknown"):
+            outgoing = [other for source, kind, other in added if source is user and kind == connection_type]
+            incoming = [source for source, kind, other in added if other is user and kind == connection_type]
+            assert [conn["user"] for conn in user.connections_by_type(connection_type)] == outgoing
+            assert user.connections.users(connection_type) == outgoing
+            assert [conn["user"] for conn in user.incoming_by_type(connection_type)] == incoming
+            assert user.connections.count(connection_type) == len(outgoing)
+        assert sum(user.connections.counts().values()) == len(user.connections_by_type())
+
+
+
+def test_views_and_reads_are_set_like():
+    alice, bob = User(1), User(2)
+    post = Post(alice, "hello")
+    for _ in range(3):
+        post.add_view(bob)
+        bob.add_read_post(post)
+    assert list(post.seen_by) == [bob] and list(bob.read_posts) == [post]
+    assert post.add_views([alice, bob, alice]) == 1
+    assert list(post.seen_by) == [bob, alice]
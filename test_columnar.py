@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+import columnar
+from classes import User, Post
+from columnar import ColumnarStore
+
+
+def random_network(seed=0, users=40, posts=120, connections=150, views=400):
+    rng = random.Random(seed)
+    people = [User(i, name=f"user{i}", age=rng.choice([18, 25, 40]), country=rng.choice(["US", "FR"]),
+                   region=rng.choice(["north", "south"])) for i in range(users)]
+    for _ in range(connections):
+        rng.choice(people).add_connection(rng.choice(["friend", "follows"]), rng.choice(people))
+    written = []
+    for i in range(posts):
+        creator = rng.choice(people)
+        post = Post(creator, f"post {i}", rng.choice(written) if written and rng.random() < 0.4 else None,
+                    post_id=i)
+        creator.authored_posts.append(post)
+        written.append(post)
+    for _ in range(views):
+        post, viewer = rng.choice(written), rng.choice(people)
+        post.add_view(viewer)
+        viewer.add_read_post(post)
+    return people, written
+
+
+def snapshot_of(users, posts):
+    """Describes a network by ids, whether it is made of objects or store views."""
+    ids = {}
+    for number, post in enumerate(posts):
+        ids[post] = number
+    return (
+        [(user.user_id, user.name, user.age, user.country, user.region,
+          sorted((conn["type"], conn["user"].user_id) for conn in user.connections),
+          sorted(ids[post] for post in user.authored_posts),
+          sorted(ids[post] for post in user.read_posts)) for user in users],
+        [(ids[post], post.creator.user_id, post.content,
+          None if post.responding_to is None else ids[post.responding_to],
+          sorted(viewer.user_id for viewer in post.seen_by),
+          sorted(viewer.user_id for viewer in post.seen_by_age(20, 30))) for post in posts],
+    )
+
+
+@pytest.mark.parametrize("min_merge", [1, 7, 1024])
+def test_store_matches_objects_after_incremental_writes(monkeypatch, min_merge):
+    monkeypatch.setattr(columnar, "MIN_MERGE", min_merge)
+    users, posts = random_network()
+    store = ColumnarStore.from_objects(users, posts)
+    views = {user.user_id: view for user, view in zip(users, store.users())}
+    post_views = store.posts()
+    assert snapshot_of(store.users(), post_views) == snapshot_of(users, posts)
+
+    rng = random.Random(1)
+    for step in range(600):
+        user = rng.choice(users)
+        if step % 3 == 0:
+            other = rng.choice(users)
+            connection_type = rng.choice(["friend", "follows"])
+            assert views[user.user_id].add_connection(connection_type, views[other.user_id]) == \
+                user.add_connection(connection_type, other)
+        elif step % 3 == 1:
+            number = rng.randrange(len(posts))
+            assert post_views[number].add_view(views[user.user_id]) == posts[number].seen_by.add(user)
+            user.read_posts.add(posts[number])
+        else:
+            number = rng.randrange(len(posts))
+            post = Post(user, f"reply {step}", posts[number], post_id=len(posts))
+            user.authored_posts.append(post)
+            posts.append(post)
+            post_views.append(views[user.user_id].make_post(post.content, post_views[number]))
+        if step % 50 == 0:
+            assert snapshot_of(store.users(), post_views) == snapshot_of(users, posts)
+    assert snapshot_of(store.users(), post_views) == snapshot_of(users, posts)
+
+
+def test_views_and_connections_are_set_like():
+    store = ColumnarStore()
+    alice, bob = store.user(store.add_user("alice")), store.user(store.add_user("bob"))
+    post = alice.make_post("hello")
+    bob.add_read_post(post)
+    bob.add_read_post(post)
+    assert post.add_view(bob) is False
+    assert len(post.seen_by) == 1 and len(bob.read_posts) == 1
+    store._compact()
+    assert post.add_view(bob) is False and len(post.seen_by) == 1
+    assert alice.add_connection("friend", bob) is True
+    assert alice.add_connection("friend", bob) is False
+    store._compact()
+    assert alice.add_connection("friend", bob) is False
+    assert alice.add_connection("follows", bob) is True
+    assert len(alice.connections) == 2
+
+
+def test_post_listeners_and_comments():
+    store = ColumnarStore()
+    alice = store.user(store.add_user("alice"))
+    made = []
+    store.get_user("alice").post_listeners.append(made.append)  # Kept per row, not per view
+    post = alice.make_post("hello")
+    reply = alice.make_post("hi", post)
+    assert made == [post, reply]
+    post.add_comment("nice")
+    assert post.comments == [reply, "nice"]
+    assert post.replies == [reply]
@@ -0,0 +1,59 @@
+import io
+import json
+
+import pytest
+
+from classes import User, Post
+from database import Database, _iter_records
+from test_columnar import random_network
+
+
+def described(users, posts):
+    return ([(user.user_id, user.name, user.age, sorted((conn["type"], conn["user"].user_id)
+                                                        for conn in user.connections),
+              sorted(post.post_id for post in user.authored_posts),
+              sorted(post.post_id for post in user.read_posts)) for user in users],
+            [(post.post_id, post.creator.user_id, post.content,
+              None if post.responding_to is None else post.responding_to.post_id,
+              sorted(viewer.user_id for viewer in post.seen_by), list(post.comments)) for post in posts])
+
+
+def test_save_and_load_round_trip(tmp_path):
+    users, posts = random_network(seed=5)
+    posts[0].comments = ["first", "second"]
+    filename = str(tmp_path / "network.json")
+    Database.save_data(users, posts, filename)
+    assert described(*Database.load_data(filename)) == described(users, posts)
+    assert Database.load_data(str(tmp_path / "missing.json")) == ([], [])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+def test_records_stream_across_chunk_boundaries(chunk_size):
+    data = {"users": [{"user_id": 1, "name": "a \"quoted\" name"}, {"user_id": 23456789}],
+            "version": 3, "posts": [], "more": [1.25, {"nested": [1, 2, {"x": None}]}]}
+    text = json.dumps(data, indent=1)
+    records = list(_iter_records(io.StringIO(text), chunk_size))
+    assert records == [("users", data["users"][0]), ("users", data["users"][1]), ("version", 3),
+                       ("more", 1.25), ("more", data["more"][1])]
+
+
+def test_forward_references_are_resolved(tmp_path):
+    alice, bob = User(1, "Alice"), User(2, "Bob")
+    alice.add_connection("friend", bob)
+    post = Post(alice, "hello", post_id=0)
+    reply = Post(bob, "hi", post, post_id=1)
+    alice.authored_posts.append(post)
+    bob.authored_posts.append(reply)
+    post.add_view(bob)
+    bob.add_read_post(post)
+    filename = tmp_path / "network.json"
+    Database.save_data([alice, bob], [post, reply], str(filename))
+    data = json.loads(filename.read_text())
+    # Posts first, replies before their parents, users last: everything points forward
+    filename.write_text(json.dumps({"posts": data["posts"][::-1], "users": data["users"][::-1]}))
+
+    kinds = [kind for kind, _ in Database.iter_load(str(filename))]
+    assert kinds == ["post", "post", "user", "user"]
+    users, posts = Database.load_data(str(filename))
+    assert described(sorted(users, key=lambda user: user.user_id), posts[::-1]) == \
+        described([alice, bob], [post, reply])
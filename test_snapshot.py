@@ -0,0 +1,43 @@
+from columnar import ColumnarStore
+from snapshot import load_snapshot, save_snapshot
+from test_columnar import random_network, snapshot_of
+
+
+def saved_and_loaded(tmp_path, store):
+    filename = tmp_path / "network.snap"
+    save_snapshot(store, filename)
+    return load_snapshot(filename)
+
+
+def test_round_trip_matches_store(tmp_path):
+    users, posts = random_network(seed=3)
+    store = ColumnarStore.from_objects(users, posts)
+    loaded = saved_and_loaded(tmp_path, store)
+    assert snapshot_of(loaded.users(), loaded.posts()) == snapshot_of(users, posts)
+    assert [post.seen_by_country_or_region("US") for post in loaded.posts()] == \
+        [[loaded.user(viewer._row) for viewer in post.seen_by_country_or_region("US")] for post in store.posts()]
+
+
+def test_loaded_store_answers_from_saved_tables(tmp_path):
+    users, posts = random_network(seed=4)
+    store = ColumnarStore.from_objects(users, posts)
+    store.get_user(5).make_post("after from_objects")  # Buffered in the derived adjacency
+    loaded = saved_and_loaded(tmp_path, store)
+
+    assert loaded.get_user(5).user_id == 5
+    assert loaded.get_user("5") is None  # ids keep their type
+    assert loaded.get_user(10_000) is None
+    assert loaded.posts()[-1] in loaded.get_user(5).authored_posts
+    assert loaded.post(0).seen_by_country_or_region("nowhere") == []
+    # Nothing was rebuilt: no rows dict, no decoded string codes, derived arrays are the mapped ones
+    assert loaded._rows is None and loaded.strings._codes is None
+    assert all(isinstance(targets, memoryview) for _, (targets,) in loaded._derived.values())
+
+
+def test_user_ids_of_mixed_types(tmp_path):
+    store = ColumnarStore()
+    for user_id in (1, "1", "alice", 2.5):
+        store.add_user(user_id, country="1")
+    loaded = saved_and_loaded(tmp_path, store)
+    assert [loaded.get_user(user_id).user_id for user_id in (1, "1", "alice", 2.5)] == [1, "1", "alice", 2.5]
+    assert [user.user_id for user in loaded.users()] == [1, "1", "alice", 2.5]
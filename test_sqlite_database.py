@@ -0,0 +1,45 @@
+from classes import User as ObjectUser
+from sqlite_database import SQLiteDatabase
+
+
+def test_incremental_writes_through_the_views():
+    db = SQLiteDatabase(":memory:")
+    for user_id, age, country in ((1, 20, "US"), (2, 35, "FR"), (3, 50, "US")):
+        db.add_user(user_id, f"user{user_id}", age=age, country=country)
+    alice, bob, carol = db.iter_users()
+    alice.add_connection("friend", bob)
+    alice.add_connection("friend", bob)
+    alice.add_connection("follows", carol)
+    post = alice.make_post("hello")
+    reply = bob.make_post("hi back", post)
+    for user in (bob, carol, carol):
+        user.add_read_post(post)
+    post.add_comment("nice")
+
+    assert [conn["user"] for conn in alice.connections_by_type("friend")] == [bob]
+    assert len(alice.connections) == 2
+    assert alice.authored_posts == [post] and reply.responding_to == post
+    assert post.seen_by == [bob, carol] and carol.read_posts == [post]
+    assert post.comments == ["nice"]
+    assert post.seen_by_country_or_region("US") == [carol]
+    db.close()
+
+
+def test_filter_users_matches_the_objects():
+    db = SQLiteDatabase(":memory:")
+    users = [ObjectUser(i, age=18 + 7 * i, country=["US", "FR"][i % 2], gender=["f", "m", None][i % 3])
+             for i in range(12)]
+    for user in users:
+        for _ in range(user.user_id % 4):
+            user.make_post(f"post by {user.user_id}")
+    db.import_data(users, [post for user in users for post in user.authored_posts])
+    criteria = [dict(), dict(country="US"), dict(min_posts=2), dict(min_posts=1, max_posts=2, gender="m"),
+                dict(min_age=30, max_age=60, country="FR")]
+    for options in criteria:
+        expected = [user.user_id for user in users
+                    if (options.get("country") is None or user.country == options["country"])
+                    and (options.get("gender") is None or user.gender == options["gender"])
+                    and options.get("min_posts", 0) <= len(user.authored_posts) <= options.get("max_posts", 99)
+                    and options.get("min_age", 0) <= user.age <= options.get("max_age", 999)]
+        assert [user.user_id for user in db.filter_users(**options)] == expected
+    db.close()
@@ -0,0 +1,43 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+from generate_wordcloud import render_wordcloud
+
+
+def _use_agg():
+    """Worker initializer: renders without a display."""
+    matplotlib.use("Agg")
+
+
+def _render_job(word_frequencies, output_path):
+    start = time.perf_counter()
+    wordcloud = render_wordcloud(word_frequencies, output_path)
+    return output_path, time.perf_counter() - start, wordcloud is not None
+
+
+def render_wordclouds(aggregator, jobs, workers=None):
+    """Renders a batch of word clouds to files in a process pool.
+
+    Each job is a (filters, output path) pair, where filters are the keyword
+    arguments of FrequencyAggregator.query (e.g. {"since": day_ago,
+    "country": "USA"}). The frequency tables come from the precomputed
+    aggregator in this process, so posts are never recounted, and only the
+    drawing runs in the workers, on the Agg backend (workers defaults to the
+    CPU count; 1 renders in-process). Images are drawn on standalone
+    Figures, so nothing is shown, and the format follows the extension, e.g.
+    .png or .svg.
+
+    Returns a list of (output path, seconds, written) tuples in job order;
+    written is False when no words matched the filters.
+    """
+    tables = [(aggregator.query(**filters), output_path) for filters, output_path in jobs]
+    if workers == 1 or len(tables) <= 1:
+        return [_render_job(word_frequencies, output_path) for word_frequencies, output_path in tables]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_use_agg) as pool:
+        futures = [pool.submit(_render_job, word_frequencies, output_path)
+                   for word_frequencies, output_path in tables]
+        return [future.result() for future in futures]
@@ -1,3 +1,95 @@
+class OrderedSet:
+    """Insertion-ordered set backed by a dict: O(1) add and membership."""
+    __slots__ = ("_items",)
+
+    def __init__(self, items=()):
+        self._items = dict.fromkeys(items)
+
+    def add(self, item):
+        """Adds an item; returns False if it was already present."""
+        if item in self._items:
+            return False
+        self._items[item] = None
+        return True
+
+    append = add  # Lets code written for lists keep working
+
+    def update(self, items):
+        """Adds many items; returns how many were new."""
+        before = len(self._items)
+        self._items.update(dict.fromkeys(items))
+        return len(self._items) - before
+
+    def discard(self, item):
+        self._items.pop(item, None)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"OrderedSet({list(self._items)!r})"
+
+class ConnectionSet:
+    """Ordered, de-duplicated {"type", "user"} connection dicts keyed by (type, user).
+
+    Connections are also indexed by type, so the neighbours of one type and
+    the per-type counts are available without scanning every connection.
+    """
+    __slots__ = ("_connections", "_by_type")
+
+    def __init__(self):
+        self._connections = {}
+        self._by_type = {}  # type -> {user: connection dict}
+
+    def add(self, connection_type, connected_user):
+        """Adds a connection; returns False if it already existed."""
+        key = (connection_type, connected_user)
+        if key in self._connections:
+            return False
+        connection = {"type": connection_type, "user": connected_user}
+        self._connections[key] = connection
+        self._by_type.setdefault(connection_type, {})[connected_user] = connection
+        return True
+
+    def append(self, connection):
+        """Adds a {"type", "user"} dict, as code written for lists expects."""
+        return self.add(connection["type"], connection["user"])
+
+    def of_type(self, connection_type):
+        """Returns the connection dicts of one type."""
+        return list(self._by_type.get(connection_type, {}).values())
+
+    def users(self, connection_type=None):
+        """Returns the connected users, optionally of one type only."""
+        if connection_type is None:
+            return [connected_user for _, connected_user in self._connections]
+        return list(self._by_type.get(connection_type, {}))
+
+    def count(self, connection_type=None):
+        """Returns the number of connections, optionally of one type only."""
+        if connection_type is None:
+            return len(self._connections)
+        return len(self._by_type.get(connection_type, ()))
+
+    def counts(self):
+        """Returns a {type: count} dict."""
+        return {connection_type: len(users) for connection_type, users in self._by_type.items()}
+
+    def __contains__(self, connection):
+        return (connection["type"], connection["user"]) in self._connections
+
+    def __iter__(self):
+        return iter(self._connections.values())
+
+    def __len__(self):
+        return len(self._connections)
+
 class User:
     def __init__(self, user_id, name=None, gender=None, age=None, country=None, region=None):
         self.user_id = user_id
@@ -6,45 +98,59 @@ class User:
         self.age = age
         self.country = country
         self.region = region
-        self.connections = []  # List of other User objects representing connections
+        self.connections = ConnectionSet()  # Connections to other User objects
+        self.incoming = ConnectionSet()  # Connections from other User objects to this one
         self.authored_posts = []  # List of strings, each representing a post authored by the user
-        self.read_posts = []  # List of strings, each representing a post read by the user
+        self.read_posts = OrderedSet()  # Posts read by the user
         self.comments = []  # List of strings, each representing a comment made by the user
+        self.post_listeners = []  # Called with each Post made by make_post, e.g. InvertedIndex.add_post
 
     def add_connection(self, connection_type, connected_user):
-        """Adds a connection to another user."""
-        self.connections.append({
-            "type": connection_type,
-            "user": connected_user
-        })
-        self.connections.sort()
+        """Adds a connection to another user; returns False if it already existed."""
+        if not self.connections.add(connection_type, connected_user):
+            return False
+        connected_user.incoming.add(connection_type, self)
+        return True
 
     def connections_by_type(self, connection_type=None):
         """Returns connections filtered by type if specified."""
-        if (type is None):
-            return self.connections
-        else:
-            temp = [] #do not return all connections if not none
-            for x in self.connections:
-                if x.type == type:
-                    temp.append(x)
-            return temp
+        if connection_type is None:
+            return list(self.connections)
+        return self.connections.of_type(connection_type)
+
+    def incoming_by_type(self, connection_type=None):
+        """Returns connections from other users, filtered by type if specified."""
+        if connection_type is None:
+            return list(self.incoming)
+        return self.incoming.of_type(connection_type)
 
     def add_read_post(self, post):
         """Adds a post to the list of read posts."""
-        self.read_posts.append(post)
+        self.read_posts.add(post)
+
+    def make_post(self, text, response_to=None):
+        """Creates a post by the user and tells the post listeners about it."""
+        post = Post(self, text, response_to)
+        self.authored_posts.append(post)
+        for listener in self.post_listeners:
+            listener(post)
+        return post
 
 class Post:
-    def __init__(self, creator, content, responding_to=None, time_and_date=None, seen_by=[]):
+    def __init__(self, creator, content, responding_to=None, time_and_date=None, seen_by=()):
         self.creator = creator  # User object who created the post
         self.content = content  # String representing the post's text
         self.responding_to = responding_to  # Post object this post responds to (if None, then this is not a Comment)
         self.time_and_date = time_and_date  # Time and date when the post was created (consider using datetime objects)
-        self.seen_by = seen_by
+        self.seen_by = OrderedSet(seen_by)  # User objects who have seen the post
 
     def add_view(self, user):
         """Adds a user's view to the post."""
-        (self.seen_by).append(user.user_id)
+        self.seen_by.add(user)
+
+    def add_views(self, users):
+        """Adds many users' views at once; returns the number of new viewers."""
+        return self.seen_by.update(users)
 
     def seen_by_age(self, min, max):
         temp = []
@@ -1,12 +1,24 @@
 from wordcloud import WordCloud
 from classes import User, Post
+from word_frequency import word_frequencies as count_word_frequencies
+from keyword_matcher import compile_filter
 import matplotlib.pyplot as plt
-import re
+from matplotlib.figure import Figure
 
-def generate_wordcloud(users, posts, include_keywords=None, exclude_keywords=None, user_attributes=None):
+def generate_wordcloud(users, posts, include_keywords=None, exclude_keywords=None, user_attributes=None, workers=None,
+                       whole_words=False, index=None, output_path=None):
     """
     Generate a word cloud from filtered social media posts.
 
+    posts may be any iterable, including a generator such as
+    Database.iter_posts; word counting runs in `workers` processes.
+    Keywords match substrings, or only whole words if whole_words is True.
+    An InvertedIndex over the posts answers whole-word keyword filters from
+    its posting lists, so only the matching posts are read; they are still
+    restricted to those given (posts=None means every indexed post). Raises
+    ValueError if an index is given without whole_words. With output_path,
+    the image is saved there instead of shown.
+
     Returns:
         WordCloud object if successful, None otherwise
     """
@@ -24,27 +36,47 @@ def generate_wordcloud(users, posts, include_keywords=None, exclude_keywords=Non
     else:
         filtered_users = set(users)
             
-    # Collect and filter posts while tracking word frequencies
-    word_frequencies = {}
-    for post in posts:
-        if post.creator not in filtered_users:
-            continue
-            
-        content = post.content.lower()
-        
-        # Apply keyword filters
-        if include_keywords and not any(keyword in content for keyword in include_keywords):
-            continue
-        if exclude_keywords and any(keyword in content for keyword in exclude_keywords):
-            continue
-            
-        # Count word frequencies
-        words = content.split()
-        for word in words:
-            word = re.sub(r'\W+', '', word)  # Remove non-word characters
-            if word:  # Skip empty strings
-                word_frequencies[word] = word_frequencies.get(word, 0) + 1
-    
+    # Look the keywords up in the inverted index instead of scanning every post
+    if index is not None and (include_keywords or exclude_keywords):
+        if not whole_words:
+            raise ValueError("An inverted index only matches whole words; pass whole_words=True")
+        posts = index.query(any_of=include_keywords, none_of=exclude_keywords, within=posts)
+        include_keywords = exclude_keywords = set()
+    elif posts is None:
+        posts = index.posts
+
+    # One automaton checks include and exclude keywords in a single pass
+    keyword_filter = compile_filter(include_keywords, exclude_keywords, whole_words)
+
+    # Stream the contents of matching posts into the frequency engine
+    def matching_contents():
+        for post in posts:
+            if post.creator not in filtered_users:
+                continue
+
+            content = post.content.lower()
+
+            # Apply keyword filters
+            if not keyword_filter.accepts(content):
+                continue
+
+            yield content
+
+    word_frequencies = count_word_frequencies(matching_contents(), workers=workers)
+    return render_wordcloud(word_frequencies, output_path)
+
+def render_wordcloud(word_frequencies, output_path=None):
+    """
+    Draw a word cloud from a {word: count} dict, e.g. one precomputed by
+    FrequencyAggregator.query.
+
+    With output_path, the image is written there (PNG, SVG or any other
+    format matplotlib knows from the extension) on a standalone Figure, so
+    no interactive backend or pyplot state is involved.
+
+    Returns:
+        WordCloud object if successful, None otherwise
+    """
     if not word_frequencies:
         print("No content matches the specified filters")
         return None
@@ -58,6 +90,14 @@ def generate_wordcloud(users, posts, include_keywords=None, exclude_keywords=Non
             min_font_size=10,
             max_font_size=100
         ).generate_from_frequencies(word_frequencies)
+
+        if output_path is not None:
+            figure = Figure(figsize=(12, 8))
+            axes = figure.add_subplot()
+            axes.imshow(wordcloud, interpolation='bilinear')
+            axes.axis('off')
+            figure.savefig(output_path)
+            return wordcloud
         
         plt.figure(figsize=(12, 8))
         plt.imshow(wordcloud, interpolation='bilinear')
@@ -0,0 +1,58 @@
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Removing every character that is neither a word character nor whitespace
+# before splitting gives the same words as splitting first and running
+# re.sub(r'\W+', '', word) on each token, in a single C-level pass.
+_NON_WORD = re.compile(r'[^\w\s]+')
+
+CHUNK_SIZE = 5000  # Posts per task sent to a worker process
+
+
+def tokenize(content):
+    """Returns the lowercased words of a post, with non-word characters removed."""
+    return _NON_WORD.sub('', content.lower()).split()
+
+
+def count_words(contents):
+    """Counts the words in an iterable of post contents."""
+    counts = Counter()
+    for content in contents:
+        counts.update(tokenize(content))
+    return counts
+
+
+def word_frequencies(contents, workers=None, chunk_size=CHUNK_SIZE):
+    """Counts words over an iterable (e.g. a generator) of post contents.
+
+    Contents are consumed in chunks, so the corpus never has to be in memory
+    at once. Chunks are counted in a process pool (workers defaults to the
+    CPU count) and the Counter shards are merged; input that fits in one
+    chunk is counted in-process. Returns a {word: count} dict, ready for
+    WordCloud.generate_from_frequencies.
+    """
+    contents = iter(contents)
+    first = list(islice(contents, chunk_size))
+    if len(first) < chunk_size or workers == 1:
+        total = count_words(first)
+        total.update(count_words(contents))
+        return dict(total)
+
+    workers = workers or os.cpu_count() or 1
+    total = Counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = [pool.submit(count_words, first)]
+        chunk = first
+        while chunk:
+            # Keep a bounded number of chunks in flight
+            while len(pending) >= 2 * workers:
+                total.update(pending.pop(0).result())
+            chunk = list(islice(contents, chunk_size))
+            if chunk:
+                pending.append(pool.submit(count_words, chunk))
+        for future in pending:
+            total.update(future.result())
+    return dict(total)